@@ -0,0 +1,284 @@
+"""
+api.py — Headless HTTP API for the course catalogue (ASGI, Starlette)
+Serves the same normalized catalogue and indexes as the Streamlit app —
+sort permutations, the shared filter-result cache, the tutor expertise and
+availability indexes — without any Streamlit rerun overhead.
+
+Endpoints (all GET, JSON):
+    /search           q, domain, focus, level, format, journey, platform (repeatable),
+                      min_hours, max_hours, show_no_link, sort, limit, offset
+    /facets           filter option lists and the duration range
+    /courses/{id}     one full course record
+    /recommend        goal[, level, format, max_hours, k] — local retrieval, no LLM
+    /tutors           focus and/or when ("Tuesday 3-5pm"), or day/start/end (HH:MM);
+                      a day without a time matches any availability that day
+
+Responses are deterministic for a catalogue version, so every endpoint sends
+an ETag derived from (version, path, query) and answers If-None-Match with
+304 before doing any work. CPU-bound handlers run on a bounded worker
+thread pool (config.API_WORKER_THREADS); scale out with uvicorn --workers.
+Edits to the catalogue sources or tutors.csv are picked up by a background
+watcher (catalogue_watcher.py) and swapped in without a restart.
+
+Usage:
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import hashlib
+import json
+import math
+import os
+from contextlib import asynccontextmanager
+from urllib.parse import urlencode
+
+import anyio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import config
+import shared_catalogue
+from batch_recommend import parse_request, recommend
+from catalogue import SortIndex, build_facets, canonical_filters, file_version, load_catalogue, searchable_text
+from catalogue_watcher import CatalogueWatcher, watched_paths
+from federation import load_federated
+from result_cache import compute_selection, result_cache, selection_key
+from tutor_availability import DAYS, format_window, parse_time_window
+from tutor_index import TutorIndex, read_tutors
+
+# Short sort names accepted next to the UI labels in config.SORT_OPTIONS
+SORT_ALIASES = {
+    "relevance":     "Relevance",
+    "duration_asc":  "Duration (Low to High)",
+    "duration_desc": "Duration (High to Low)",
+    "title_asc":     "Title (A-Z)",
+    "title_desc":    "Title (Z-A)",
+    "recent":        "Recently updated",
+}
+COURSE_FIELDS = ["id", "title", "domain", "focus_area", "platform", "resource_type", "level", "format",
+                 "journey_stage", "duration_hours", "length_raw", "lms_link", "short_description",
+                 "priority_skills"]
+
+
+class BadRequest(ValueError):
+    """Invalid query parameter — answered with HTTP 400."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CATALOGUE STATE — rebuilt by the watcher thread, swapped in atomically
+# ─────────────────────────────────────────────────────────────────────────────
+class CatalogueState:
+    def __init__(self, generation: int = 0, catalogue_path: str = config.DATA_FILE,
+                 tutors_path: str = "tutors.csv"):
+        self.generation = generation
+        if shared_catalogue.available():
+            self.df, self.sort_index, _ = shared_catalogue.load_shared()
+        else:
+            self.df = (load_federated(config.FEDERATION_SOURCES) if config.FEDERATION_SOURCES
+                       else load_catalogue(catalogue_path))
+            self.sort_index = SortIndex(self.df)
+        # ETags must change with either file, and agree across worker processes
+        tutors_version = file_version(tutors_path) if os.path.exists(tutors_path) else "none"
+        self.version = f"{self.df.attrs['version']}-{tutors_version}"
+        self.facets = build_facets(self.df)
+        self.text = searchable_text(self.df)
+        self.tutors = read_tutors(tutors_path)
+        self.tutor_index = TutorIndex(self.tutors, self.facets["focus_area"])
+
+
+_watcher: CatalogueWatcher | None = None
+_limiter: anyio.CapacityLimiter | None = None
+
+
+def _json_safe(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):  # numpy scalars
+        return _json_safe(value.item())
+    return value
+
+
+def _course(row: dict, fields: list[str]) -> dict:
+    return {f: _json_safe(row.get(f)) for f in fields}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HANDLERS (plain functions; run on the worker pool)
+# ─────────────────────────────────────────────────────────────────────────────
+def _float(params, name: str) -> float | None:
+    raw = params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise BadRequest(f"{name} must be a number") from None
+
+
+def _int(params, name: str, default: int, lo: int, hi: int) -> int:
+    raw = params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return max(lo, min(hi, int(raw)))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer") from None
+
+
+def search(s: CatalogueState, params) -> dict:
+    lo, hi = _float(params, "min_hours"), _float(params, "max_hours")
+    duration = None
+    if lo is not None or hi is not None:
+        full = s.facets["duration_range"] or (0.0, float("inf"))
+        duration = (lo if lo is not None else full[0], hi if hi is not None else full[1])
+    filters = canonical_filters(
+        params.get("q", ""),
+        params.getlist("domain"), params.getlist("focus"), params.getlist("level"),
+        params.getlist("format"), params.getlist("journey"), params.getlist("platform"),
+        duration, params.get("show_no_link", "true").lower() != "false", s.facets["duration_range"],
+    )
+    sort_by = SORT_ALIASES.get(params.get("sort", "relevance"), params.get("sort"))
+    if sort_by not in config.SORT_OPTIONS:
+        raise BadRequest(f"sort must be one of {sorted(SORT_ALIASES)}")
+    limit = _int(params, "limit", config.API_DEFAULT_LIMIT, 1, config.API_MAX_LIMIT)
+    offset = _int(params, "offset", 0, 0, len(s.df))
+
+    key = selection_key(filters, sort_by, s.version)
+    selection = result_cache.get_or_compute(
+        key, lambda: compute_selection(s.df, filters, sort_by, s.sort_index))
+    page = s.df.loc[selection.ids[offset:offset + limit], COURSE_FIELDS].to_dict(orient="records")
+    return {
+        "total": selection.aggregates["count"],
+        "offset": offset,
+        "limit": limit,
+        "sort": sort_by,
+        "aggregates": {k: _json_safe(v) for k, v in selection.aggregates.items()},
+        "results": [_course(row, COURSE_FIELDS) for row in page],
+    }
+
+
+def facets(s: CatalogueState, params) -> dict:
+    return s.facets
+
+
+def course(s: CatalogueState, params, course_id: int) -> dict | None:
+    df = s.df
+    if not 0 <= course_id < len(df):
+        return None
+    row = df.loc[course_id].to_dict()
+    fields = [c for c in df.columns if c not in ("skill_tags", "updated_at")]
+    record = _course(row, fields)
+    record["skill_tags"] = list(row.get("skill_tags") or [])
+    record["updated_at"] = None if row.get("updated_at") is None or row["updated_at"] != row["updated_at"] \
+        else row["updated_at"].isoformat()
+    return record
+
+
+def recommend_courses(s: CatalogueState, params) -> dict:
+    goal = params.get("goal", "").strip()
+    if not goal:
+        raise BadRequest("goal is required")
+    request = parse_request({k: params.get(k) for k in ("goal", "level", "format", "max_hours")})
+    k = _int(params, "k", config.BATCH_TOP_K, 1, 50)
+    return {"request": request, "courses": recommend(s.df, request, k, text=s.text)}
+
+
+def _clock(raw: str, name: str) -> int:
+    try:
+        hours, _, minutes = raw.partition(":")
+        value = int(hours) * 60 + int(minutes or 0)
+    except ValueError:
+        raise BadRequest(f"{name} must be HH:MM") from None
+    if not 0 <= value <= 24 * 60:
+        raise BadRequest(f"{name} must be between 00:00 and 24:00")
+    return value
+
+
+def tutors(s: CatalogueState, params) -> dict:
+    focus = params.get("focus") or None
+    window = None
+    if params.get("when"):
+        window = parse_time_window(params["when"])
+        if window is None:
+            raise BadRequest("when must name a weekday, e.g. 'Tuesday 3-5pm'")
+    elif params.get("day"):
+        day = params["day"][:3].title()
+        if day not in DAYS:
+            raise BadRequest(f"day must be one of {DAYS}")
+        if params.get("start") or params.get("end"):
+            window = (DAYS.index(day), _clock(params.get("start") or "00:00", "start"),
+                      _clock(params.get("end") or "24:00", "end"))
+        else:
+            window = (DAYS.index(day), None, None)  # any time that day
+    matches = s.tutor_index.find(focus, window)
+    return {
+        "focus": focus,
+        "window": format_window(*window) if window else None,
+        "tutors": [{"tutor_id": tid, "score": round(score, 2), **s.tutor_index.profiles[tid]}
+                   for tid, score in matches],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ASGI PLUMBING
+# ─────────────────────────────────────────────────────────────────────────────
+def _etag(request: Request, version: str) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{version}|{request.url.path}|{query}".encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def endpoint(handler, path_int: str | None = None):
+    async def route(request: Request) -> Response:
+        # One snapshot per request: a hot swap mid-request cannot pair an old ETag with a new body
+        state = _watcher.current
+        etag = _etag(request, state.version)
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.API_CACHE_MAX_AGE}"}
+        if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        args = [state, request.query_params]
+        if path_int:
+            try:
+                args.append(int(request.path_params[path_int]))
+            except ValueError:
+                return JSONResponse({"error": f"{path_int} must be an integer"}, status_code=400)
+        try:
+            body = await anyio.to_thread.run_sync(lambda: handler(*args), limiter=_limiter)
+        except BadRequest as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+        if body is None:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return Response(json.dumps(body, ensure_ascii=False, default=str), media_type="application/json",
+                        headers=headers)
+    return route
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _watcher, _limiter
+    _limiter = anyio.CapacityLimiter(config.API_WORKER_THREADS)
+    if _watcher is None:
+        _watcher = await anyio.to_thread.run_sync(
+            lambda: CatalogueWatcher(CatalogueState, watched_paths()).start())
+    yield
+    _watcher.stop()
+
+
+app = Starlette(
+    routes=[
+        Route("/search", endpoint(search)),
+        Route("/facets", endpoint(facets)),
+        Route("/courses/{course_id}", endpoint(course, "course_id")),
+        Route("/recommend", endpoint(recommend_courses)),
+        Route("/tutors", endpoint(tutors)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("api:app", host="0.0.0.0", port=8000, workers=config.API_PROCESSES)
@@ -4,15 +4,25 @@ Streamlit MVP for curated course discovery and TA assignment.
 Run:  streamlit run app.py
 """
 import os
+import time
 
-from chatbot import render_chatbot
-import re
-import textwrap
 import pandas as pd
 import streamlit as st
-from dotenv import load_dotenv
-from datetime import datetime
-from theme_styles import get_theme_css
+import streamlit.components.v1 as components
+from datetime import date, datetime, timedelta
+
+import config
+from catalogue import canonical_filters
+from catalogue_watcher import CatalogueWatcher
+from event_log import log_event, session_id
+from exporter import available_formats, build_export, export_extension, export_mime
+from learning_path import LearningPathPlanner, format_path
+from result_cache import result_cache, selection_key
+from similar_courses import SimilarityGraph
+from theme_styles import STYLESHEET_HASH, get_theme_bootstrap_html, get_theme_toggle_html
+from tutor_assignment import RosterError, assign_tutors, load_summary, read_roster
+from tutor_availability import DAYS, format_window
+from tutor_index import TutorIndex
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PAGE CONFIG
@@ -24,16 +34,14 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# ─────────────────────────────────────────────────────────────────────────────
-# THEME TOGGLE INITIALIZATION
-# ─────────────────────────────────────────────────────────────────────────────
-if 'theme' not in st.session_state:
-    st.session_state.theme = 'dark'  # Default to dark theme
-
 # ─────────────────────────────────────────────────────────────────────────────
 # APPLY THEME CSS
 # ─────────────────────────────────────────────────────────────────────────────
-st.markdown(get_theme_css(st.session_state.theme), unsafe_allow_html=True)
+# The stylesheet is static (CSS variables for both palettes) and lives in the
+# page <head> once injected, so it is only sent again if its hash changes.
+if st.session_state.get("theme_css_hash") != STYLESHEET_HASH:
+    components.html(get_theme_bootstrap_html(), height=0)
+    st.session_state.theme_css_hash = STYLESHEET_HASH
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -43,163 +51,61 @@ st.markdown(get_theme_css(st.session_state.theme), unsafe_allow_html=True)
 if 'show_chatbot_page' not in st.session_state:
     st.session_state.show_chatbot_page = False
 
+# Created before either page renders, so explorer and assistant events share it
+session_id(st.session_state)
+
+
+# Buttons flip state in on_click callbacks: the click already triggers one
+# rerun, so no extra st.rerun() round-trip is needed.
+def _refresh_data():
+    catalogue_watcher().refresh()
+    st.toast("Reloading course data in the background…")
+
+
+def _toggle_chatbot_page():
+    st.session_state.show_chatbot_page = not st.session_state.show_chatbot_page
+
+
 with st.sidebar:
     st.markdown("---")
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        st.markdown("### 🎨 Theme")
-    with col2:
-        if st.button("🌓", help="Toggle theme", key="theme_toggle"):
-            st.session_state.theme = 'light' if st.session_state.theme == 'dark' else 'dark'
-            st.rerun()
-    
-    current_theme = "Dark Mode" if st.session_state.theme == 'dark' else "Light Mode"
-    st.caption(f"Current: {current_theme}")
+    st.markdown("### 🎨 Theme")
+    # Client-side toggle: flips <html data-theme> in the browser, no rerun
+    components.html(get_theme_toggle_html(), height=42)
     
     # Cache refresh button
     st.markdown("---")
-    if st.button("🔄 Refresh Data", help="Clear cache and reload course data", use_container_width=True):
-        st.cache_data.clear()
-        st.success("Cache cleared! Reloading...")
-        st.rerun()
+    st.button("🔄 Refresh Data", help="Rebuild the catalogue from the source files (in the background)",
+              use_container_width=True, on_click=_refresh_data)
 
     # Chatbot toggle button
     st.markdown("---")
     chatbot_label = "📚 Back to Courses" if st.session_state.show_chatbot_page else "💬 Course Assistant"
-    if st.button(chatbot_label, key="chatbot_sidebar_toggle", use_container_width=True):
-        st.session_state.show_chatbot_page = not st.session_state.show_chatbot_page
-        st.rerun()
+    st.button(chatbot_label, key="chatbot_sidebar_toggle", use_container_width=True,
+              on_click=_toggle_chatbot_page)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DATA LOADING & NORMALIZATION
 # ─────────────────────────────────────────────────────────────────────────────
 
-RAW_COLS = {
-    "Competency domain":         "domain",
-    "Focus Areas":               "focus_area",
-    "Resource title":            "title",
-    "URL":                       "lms_link",
-    "Platform / host":           "platform",
-    "Resource type":             "resource_type",
-    "Stated learning outcomes":  "full_description",
-    "Stated prerequisites":      "prerequisites",
-    "Length (mins)":             "length_raw",
-    "Indicated level":           "level",
-    "Intended audience":         "audience",
-    "Format type (passive / interactive)": "format",
-    "Publication date":          "publication_date",
-    "Last updated":              "last_updated",
-    "Captions / transcripts":    "captions",
-    "Mobile accessible":         "mobile_accessible",
-    "Skill area":                "priority_skills",
-    "Student journey stage":     "journey_stage",
-    "Comments":                  "comments",
-}
-
-
-def _parse_duration_hours(raw: str) -> float | None:
-    """Convert heterogeneous duration strings → approximate hours (float)."""
-    if not isinstance(raw, str) or not raw.strip():
-        return None
-    s = raw.lower().strip()
-
-    # patterns: "16 hours", "5 hours a day for 3 days", "12 weeks", "1 year",
-    #           "one semester", "35 videos roughly 50 mins each",
-    #           "16 videos roughly 4–17 min each", "5hrs", "5hours", "4 hrs"
-    patterns = [
-        (r"(\d+(?:\.\d+)?)\s*hours?\s*a\s*day\s*for\s*(\d+)\s*days?", lambda m: float(m.group(1)) * int(m.group(2))),
-        (r"(\d+(?:\.\d+)?)\s*hrs?\b", lambda m: float(m.group(1))),
-        (r"(\d+(?:\.\d+)?)\s*hours?\b", lambda m: float(m.group(1))),
-        (r"(\d+)\s*videos?\s*roughly\s*([\d.]+)\s*[-–]\s*([\d.]+)\s*min",
-         lambda m: int(m.group(1)) * (float(m.group(2)) + float(m.group(3))) / 2 / 60),
-        (r"(\d+)\s*videos?\s*roughly\s*([\d.]+)\s*min", lambda m: int(m.group(1)) * float(m.group(2)) / 60),
-        (r"(\d+(?:\.\d+)?)\s*min(?:utes?)?\b", lambda m: float(m.group(1)) / 60),
-        (r"(\d+)\s*weeks?\b", lambda m: float(m.group(1)) * 5),     # ~5 hrs/week light estimate
-        (r"one\s+semester|a\s+semester", lambda m: 45.0),
-        (r"half\s+a\s+semester", lambda m: 22.5),
-        (r"(\d+)\s*months?\b", lambda m: float(m.group(1)) * 10),
-        (r"(\d+)\s*years?\b", lambda m: float(m.group(1)) * 120),
-    ]
-    for pattern, fn in patterns:
-        m = re.search(pattern, s)
-        if m:
-            try:
-                return round(fn(m), 1)
-            except Exception:
-                continue
-    return None
-
-
-@st.cache_data(show_spinner="Loading course catalogue…", ttl=3600)  # Cache for 1 hour
-def load_data(path: str = "Online_curation.csv") -> pd.DataFrame:
-    raw = pd.read_csv(path, dtype=str)
-
-    # Forward-fill the hierarchical domain & focus area columns
-    raw["Competency domain"] = raw["Competency domain"].replace("", pd.NA).ffill()
-    raw["Focus Areas"] = raw["Focus Areas"].replace("", pd.NA).ffill()
-
-    # Rename
-    raw = raw.rename(columns=RAW_COLS)
-
-    # Drop rows with no title
-    df = raw.dropna(subset=["title"]).copy()
-    df = df[df["title"].str.strip() != ""].copy()
-    df = df.reset_index(drop=True)
-    df["id"] = df.index
-
-    # Clean text columns
-    for col in ["domain", "focus_area", "level", "format", "journey_stage",
-                 "priority_skills", "platform", "resource_type"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().replace({"nan": "", "N/A": "", "Not Stated": ""})
-
-    # Short description: first 250 chars of learning outcomes
-    df["short_description"] = df["full_description"].fillna("").apply(
-        lambda s: textwrap.shorten(s.replace("\n", " ").strip(), width=250, placeholder="…")
-    )
-
-    # Parse duration
-    df["duration_hours"] = df["length_raw"].apply(_parse_duration_hours)
-
-    # Normalize skill tags (may be long sentences — truncate for tags)
-    def _skill_tags(s) -> list[str]:
-        # Handle non-string types
-        if pd.isna(s) or not s:
-            return []
-        s = str(s)
-        if s.strip() in ("", "nan", "None"):
-            return []
-        # If it looks like a sentence (contains comma-separated brief things), split on comma
-        parts = [p.strip() for p in s.split(",") if p.strip()]
-        # Truncate very long parts to ~50 chars for display
-        return [str(p)[:60] + ("…" if len(str(p)) > 60 else "") for p in parts]
-
-    df["skill_tags"] = df["priority_skills"].fillna("").apply(_skill_tags)
+@st.cache_resource(show_spinner="Loading course catalogue…")
+def catalogue_watcher() -> CatalogueWatcher:
+    """Catalogue, tutors and every derived index, rebuilt in the background when
+    the source files change and swapped in atomically (see catalogue_watcher.py)."""
+    return CatalogueWatcher().start()
 
-    return df
 
+# One snapshot per rerun: a swap mid-run never mixes two catalogue versions
+snapshot = catalogue_watcher().current
+df = snapshot.df
+facets = snapshot.facets
+backend = snapshot.backend
+similar_graph = snapshot.similar_graph
+path_planner = snapshot.path_planner
+tutors_df, tutor_index = snapshot.tutors, snapshot.tutor_index
 
-df = load_data()
-
-# ─────────────────────────────────────────────────────────────────────────────
-# LOAD TUTOR DATA
-# ─────────────────────────────────────────────────────────────────────────────
-@st.cache_data(show_spinner="Loading tutor data…")
-def load_tutors(path: str = "tutors.csv") -> pd.DataFrame:
-    try:
-        tutors = pd.read_csv(path, dtype=str)
-        tutors = tutors.fillna("")
-        # Parse expertise tags into lists
-        tutors["expertise_list"] = tutors["expertise_tags"].apply(
-            lambda x: [tag.strip() for tag in str(x).split(",") if tag.strip()]
-        )
-        return tutors
-    except FileNotFoundError:
-        # Return empty dataframe if file doesn't exist
-        return pd.DataFrame(columns=["tutor_id", "tutor_name", "expertise_tags", 
-                                     "availability_summary", "booking_link", "expertise_list"])
-
-tutors_df = load_tutors()
+if st.session_state.get("catalogue_generation", snapshot.generation) != snapshot.generation:
+    st.toast("Course catalogue updated.")
+st.session_state.catalogue_generation = snapshot.generation
 
 # ─────────────────────────────────────────────────────────────────────────────
 # SESSION STATE FOR TUTOR BOOKING FLOW
@@ -210,6 +116,22 @@ if 'show_tutor_section' not in st.session_state:
 # ─────────────────────────────────────────────────────────────────────────────
 # SIDEBAR FILTERS
 # ─────────────────────────────────────────────────────────────────────────────
+# Filters run at app scope: a filter change is the one interaction that
+# affects every region below. Option lists come from the cached facets.
+FILTER_KEYS = ["filter_search", "filter_domains", "filter_focus", "filter_levels",
+               "filter_formats", "filter_journey", "filter_platforms", "filter_duration",
+               "filter_show_no_link"]
+
+
+def _clear_search():
+    st.session_state.filter_search = ""
+
+
+def _clear_filters():
+    for key in FILTER_KEYS:
+        st.session_state.pop(key, None)
+
+
 with st.sidebar:
     st.markdown("## 🔍 Filters")
     st.caption("Narrow the course catalogue")
@@ -217,38 +139,32 @@ with st.sidebar:
     # Search with clear button
     col1, col2 = st.columns([4, 1])
     with col1:
-        search_q = st.text_input("Search title / description", placeholder="e.g. Python, statistics…", label_visibility="visible")
+        search_q = st.text_input("Search title / description", placeholder="e.g. Python, statistics…",
+                                 label_visibility="visible", key="filter_search")
     with col2:
         st.markdown("<div style='margin-top: 1.8rem;'></div>", unsafe_allow_html=True)
-        if st.button("🗑️", help="Clear search"):
-            search_q = ""
+        st.button("🗑️", help="Clear search", on_click=_clear_search)
 
     st.markdown("---")
     st.markdown("### 📚 Course Attributes")
 
-    domains = sorted({d for d in df["domain"].unique() if d})
-    sel_domains = st.multiselect("Competency Domain", domains, help="Filter by subject area")
-
-    focus_areas = sorted({f for f in df["focus_area"].unique() if f})
-    sel_focus = st.multiselect("Focus Areas", focus_areas, help="Filter by focus area within domain")
-
-    levels = sorted({l for l in df["level"].unique() if l})
-    sel_levels = st.multiselect("Level", levels, help="Beginner, Intermediate, Advanced")
-
-    formats = sorted({f for f in df["format"].unique() if f})
-    sel_formats = st.multiselect("Format", formats, help="Interactive or Passive")
-
-    journey_opts = sorted({j for j in df["journey_stage"].unique() if j})
-    sel_journey = st.multiselect("Student Journey Stage", journey_opts, help="Pre-arrival, Ongoing study, etc.")
-
-    platforms = sorted({p for p in df["platform"].unique() if p})
-    sel_platforms = st.multiselect("Platform / Host", platforms, help="OLI, DataQuest, etc.")
+    sel_domains = st.multiselect("Competency Domain", facets["domain"], help="Filter by subject area",
+                                 key="filter_domains")
+    sel_focus = st.multiselect("Focus Areas", facets["focus_area"], help="Filter by focus area within domain",
+                               key="filter_focus")
+    sel_levels = st.multiselect("Level", facets["level"], help="Beginner, Intermediate, Advanced",
+                                key="filter_levels")
+    sel_formats = st.multiselect("Format", facets["format"], help="Interactive or Passive",
+                                 key="filter_formats")
+    sel_journey = st.multiselect("Student Journey Stage", facets["journey_stage"],
+                                 help="Pre-arrival, Ongoing study, etc.", key="filter_journey")
+    sel_platforms = st.multiselect("Platform / Host", facets["platform"], help="OLI, DataQuest, etc.",
+                                   key="filter_platforms")
 
     # Duration slider — only if we have parsed values
-    dur_df = df["duration_hours"].dropna()
-    if not dur_df.empty:
-        dur_min_v = float(dur_df.min())
-        dur_max_v = float(dur_df.max())
+    sel_dur = None
+    if facets["duration_range"] is not None:
+        dur_min_v, dur_max_v = facets["duration_range"]
         if dur_min_v < dur_max_v:
             sel_dur = st.slider(
                 "Duration (hours)",
@@ -256,97 +172,43 @@ with st.sidebar:
                 max_value=dur_max_v,
                 value=(dur_min_v, dur_max_v),
                 step=0.5,
-                help="Filter by course duration"
+                help="Filter by course duration",
+                key="filter_duration",
             )
-        else:
-            sel_dur = None
-    else:
-        sel_dur = None
 
     st.markdown("---")
-    show_no_link = st.checkbox("Show courses without links", value=True)
+    show_no_link = st.checkbox("Show courses without links", value=True, key="filter_show_no_link")
     
     # Clear all filters button
     st.markdown("---")
-    if st.button("🔄 Clear All Filters", use_container_width=True):
-        st.rerun()
+    st.button("🔄 Clear All Filters", use_container_width=True, on_click=_clear_filters)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CONDITIONAL: CHATBOT PAGE vs COURSE EXPLORER
 # ─────────────────────────────────────────────────────────────────────────────
 if st.session_state.show_chatbot_page:
-    render_chatbot(df, theme=st.session_state.theme)
+    # Imported lazily: most sessions never open the assistant, and the Groq
+    # SDK / client setup should not slow down (or break) explorer startup.
+    from chatbot import render_chatbot
+    render_chatbot(df, tutor_index, path_planner, backend)
     st.stop()
 
 # ─────────────────────────────────────────────────────────────────────────────
 # FILTERING LOGIC
 # ─────────────────────────────────────────────────────────────────────────────
-mask = pd.Series(True, index=df.index)
-
-if search_q:
-    q_low = search_q.lower()
-    mask &= (
-        df["title"].str.lower().str.contains(q_low, na=False)
-        | df["short_description"].str.lower().str.contains(q_low, na=False)
-        | df["full_description"].fillna("").str.lower().str.contains(q_low, na=False)
-    )
-
-if sel_domains:
-    mask &= df["domain"].isin(sel_domains)
-
-if sel_focus:
-    mask &= df["focus_area"].isin(sel_focus)
-
-if sel_levels:
-    mask &= df["level"].isin(sel_levels)
-
-if sel_formats:
-    mask &= df["format"].str.lower().isin([f.lower() for f in sel_formats])
-
-if sel_journey:
-    mask &= df["journey_stage"].isin(sel_journey)
-
-if sel_platforms:
-    mask &= df["platform"].isin(sel_platforms)
-
-if sel_dur is not None:
-    lo, hi = sel_dur
-    # Include rows without parsed duration unless explicitly filtered
-    dur_mask = df["duration_hours"].isna() | df["duration_hours"].between(lo, hi)
-    mask &= dur_mask
-
-if not show_no_link:
-    mask &= df["lms_link"].notna() & (df["lms_link"].str.strip() != "")
-
-filtered = df[mask].copy()
+# Canonical selection: equivalent filter states share one result-cache entry.
+filters = canonical_filters(search_q, sel_domains, sel_focus, sel_levels, sel_formats, sel_journey,
+                            sel_platforms, sel_dur, show_no_link, facets["duration_range"])
 
 # ─────────────────────────────────────────────────────────────────────────────
 # HEADER WITH TUTOR BUTTON
 # ─────────────────────────────────────────────────────────────────────────────
-# Custom button styling
 button_label = "🎓 Get Peer Tutor Support" if not st.session_state.show_tutor_section else "📚 Back to Courses"
-button_gradient = "linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%)" if st.session_state.theme == 'dark' else "linear-gradient(135deg, #3b82f6 0%, #6366f1 100%)"
-button_hover_shadow = "0 8px 24px rgba(99, 102, 241, 0.4)" if st.session_state.theme == 'dark' else "0 8px 24px rgba(59, 130, 246, 0.3)"
-
-st.markdown(f"""
-<style>
-.stButton > button[kind="primary"] {{
-    background: {button_gradient} !important;
-    border: none !important;
-    border-radius: 12px !important;
-    padding: 0.75rem 1.5rem !important;
-    font-weight: 600 !important;
-    font-size: 0.95rem !important;
-    letter-spacing: 0.3px !important;
-    transition: all 0.3s ease !important;
-    box-shadow: 0 4px 12px rgba(99, 102, 241, 0.2) !important;
-}}
-.stButton > button[kind="primary"]:hover {{
-    transform: translateY(-2px) !important;
-    box-shadow: {button_hover_shadow} !important;
-}}
-</style>
-""", unsafe_allow_html=True)
+
+
+def _toggle_tutor_section():
+    st.session_state.show_tutor_section = not st.session_state.show_tutor_section
+
 
 col_header, col_button = st.columns([4, 1])
 with col_header:
@@ -358,14 +220,15 @@ with col_header:
     """, unsafe_allow_html=True)
 with col_button:
     st.markdown("<div style='margin-top: 1.5rem;'></div>", unsafe_allow_html=True)
-    if st.button(button_label, use_container_width=True, type="primary", key="tutor_toggle_main"):
-        st.session_state.show_tutor_section = not st.session_state.show_tutor_section
-        st.rerun()
+    st.button(button_label, use_container_width=True, type="primary", key="tutor_toggle_main",
+              on_click=_toggle_tutor_section)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PEER TUTOR BOOKING SECTION
 # ─────────────────────────────────────────────────────────────────────────────
-if st.session_state.show_tutor_section:
+@st.fragment
+def tutor_booking(focus_areas: list[str], tutors: pd.DataFrame, tutor_index: TutorIndex):
+    """Tutor search region — picking a focus area reruns only this fragment."""
     st.markdown("---")
     st.markdown("## 👥 Peer Tutor Booking")
     st.markdown("""
@@ -375,63 +238,38 @@ if st.session_state.show_tutor_section:
     </div>
     """, unsafe_allow_html=True)
     
-    # Get all unique Focus Areas from course data
-    all_focus_areas = sorted({f for f in df["focus_area"].unique() if f and f.strip()})
-    
     # Skill gap selection
     col1, col2 = st.columns([2, 3])
     with col1:
         selected_focus = st.selectbox(
             "Select Focus Area for Support",
-            [""] + all_focus_areas,
+            [""] + focus_areas,
             help="Choose the focus area where you need tutoring support"
         )
-    
-    if selected_focus:
-        # Filter tutors by expertise matching selected focus area
-        matching_tutors = tutors_df[
-            tutors_df["expertise_list"].apply(
-                lambda exp_list: any(selected_focus.lower() in exp.lower() for exp in exp_list)
+    with col2:
+        # Optional time window: only tutors free for the whole window are listed
+        day_col, time_col = st.columns([1, 2])
+        with day_col:
+            selected_day = st.selectbox("Day", ["Any day"] + DAYS, key="tutor_day")
+        with time_col:
+            hours = list(range(6, 24))
+            start_h, end_h = st.select_slider(
+                "Time window", options=hours, value=(15, 17), key="tutor_hours",
+                format_func=lambda h: f"{h % 12 or 12}{'am' if h < 12 else 'pm'}",
+                disabled=selected_day == "Any day",
             )
-        ]
-        
+    window = None if selected_day == "Any day" else (DAYS.index(selected_day), start_h * 60, end_h * 60)
+
+    if selected_focus or window:
+        # Index lookups: expertise match (best first) ∩ availability interval index
+        matched_ids = [tutor_id for tutor_id, _ in tutor_index.find(selected_focus or None, window)]
+        matching_tutors = tutors.set_index("tutor_id", drop=False).loc[matched_ids]
+        query_label = " · ".join(filter(None, [selected_focus, window and format_window(*window)]))
+
         if len(matching_tutors) > 0:
-            st.markdown(f"### 🎯 Found {len(matching_tutors)} tutor(s) for: **{selected_focus}**")
+            st.markdown(f"### 🎯 Found {len(matching_tutors)} tutor(s) for: **{query_label}**")
             st.markdown("---")
             
-            # Enhanced styling for tutor section
-            st.markdown(f"""
-            <style>
-            /* Tutor booking button styling */
-            .stLinkButton > a {{
-                background: {button_gradient} !important;
-                color: white !important;
-                border: none !important;
-                border-radius: 10px !important;
-                padding: 0.65rem 1.25rem !important;
-                font-weight: 600 !important;
-                font-size: 0.9rem !important;
-                text-decoration: none !important;
-                display: inline-block !important;
-                width: 100% !important;
-                text-align: center !important;
-                transition: all 0.3s ease !important;
-                box-shadow: 0 3px 10px rgba(99, 102, 241, 0.2) !important;
-            }}
-            .stLinkButton > a:hover {{
-                transform: translateY(-2px) !important;
-                box-shadow: {button_hover_shadow} !important;
-            }}
-            /* Enhanced tutor cards */
-            .course-card {{
-                transition: all 0.3s ease !important;
-            }}
-            .course-card:hover {{
-                transform: translateY(-6px) !important;
-            }}
-            </style>
-            """, unsafe_allow_html=True)
-            
             # Display tutor cards in grid
             cols_per_row = 3
             rows = [matching_tutors.iloc[i:i + cols_per_row] for i in range(0, len(matching_tutors), cols_per_row)]
@@ -442,11 +280,11 @@ if st.session_state.show_tutor_section:
                     with col:
                         # Tutor card
                         tutor_card_html = f"""
-                        <div class="course-card" style="min-height: 280px;">
+                        <div class="course-card tutor-card" style="min-height: 280px;">
                             <div class="card-title">👤 {tutor['tutor_name']}</div>
                             <div class="card-meta">Peer Tutor</div>
                             <div style="margin: 0.75rem 0;">
-                                <strong style="font-size: 0.8rem; color: {'#94a3b8' if st.session_state.theme == 'dark' else '#64748b'};">Expertise:</strong><br>
+                                <strong class="tutor-label">Expertise:</strong><br>
                                 <div style="margin-top: 0.5rem;">
                                     {"".join(f'<span class="badge badge-skill" style="font-size:0.65rem;">{exp.strip()}</span>' for exp in tutor['expertise_tags'].split(',')[:4])}
                                 </div>
@@ -467,35 +305,70 @@ if st.session_state.show_tutor_section:
                                 type="primary"
                             )
                         else:
-                            st.button("📅 Booking Unavailable", disabled=True, use_container_width=True)
+                            st.button("📅 Booking Unavailable", disabled=True, use_container_width=True,
+                                      key=f"booking_unavailable_{tutor['tutor_id']}")
                         
                         st.markdown("<div style='margin-bottom:1.5rem;'></div>", unsafe_allow_html=True)
         else:
-            st.warning(f"No tutors found with expertise in **{selected_focus}**. Try selecting a different focus area.")
+            st.warning(f"No tutors found for **{query_label}**. Try a different focus area or time window.")
     else:
-        st.info("👆 Select a focus area above to see available tutors")
+        st.info("👆 Select a focus area or a day above to see available tutors")
     
+    # Bulk assignment (term start): roster CSV in, optimal capacity-aware matches out
+    with st.expander("📋 Bulk assignment from a roster"):
+        st.caption("CSV columns: student, focus_areas (';'-separated), "
+                   "optional preferred_tutors (ids or names).")
+        roster_file = st.file_uploader("Roster CSV", type=["csv"], key="bulk_roster")
+        capacity = st.number_input("Students per tutor", min_value=1, max_value=500,
+                                   value=config.TUTOR_DEFAULT_CAPACITY, key="bulk_capacity",
+                                   help="Used for tutors without a capacity column in tutors.csv")
+        if roster_file is not None and st.button("Assign tutors", key="bulk_assign", type="primary"):
+            try:
+                roster = read_roster(roster_file)
+            except RosterError as exc:
+                st.error(str(exc))
+            else:
+                with st.spinner(f"Assigning {len(roster)} students…"):
+                    st.session_state.bulk_assignments = (
+                        assign_tutors(roster, tutors, tutor_index, int(capacity)), int(capacity))
+        # Kept in session state so downloading (which reruns) keeps the results on screen
+        if roster_file is not None and "bulk_assignments" in st.session_state:
+            assignments, used_capacity = st.session_state.bulk_assignments
+            placed = int((assignments["status"] == "assigned").sum())
+            st.success(f"Assigned {placed} of {len(assignments)} students.")
+            st.dataframe(load_summary(assignments, tutors, used_capacity), hide_index=True,
+                         use_container_width=True)
+            st.dataframe(assignments, hide_index=True, use_container_width=True)
+            st.download_button(
+                "📥 Download assignments",
+                assignments.to_csv(index=False),
+                file_name=f"tutor_assignments_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+            )
+
     st.markdown("---")
     if st.button("← Back to Course Explorer", use_container_width=False):
         st.session_state.show_tutor_section = False
-        st.rerun()
+        st.rerun(scope="app")  # leaving the fragment swaps the whole page region
     st.markdown("---")
 
+
+if st.session_state.show_tutor_section:
+    tutor_booking(facets["focus_area"], tutors_df, tutor_index)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # COURSE EXPLORER SECTION (Only show when tutor section is hidden)
 # ─────────────────────────────────────────────────────────────────────────────
-if not st.session_state.show_tutor_section:
-    # ─────────────────────────────────────────────────────────────────────────────
-    # QUICK STATS
-    # ─────────────────────────────────────────────────────────────────────────────
-    from collections import Counter
-    
-    # Get top Focus Areas from the filtered dataset
-    focus_area_counts = filtered["focus_area"].value_counts()
-    top_focus_areas = focus_area_counts.head(5).index.tolist()
+DOMAIN_COLORS = [
+    "#1d4ed8", "#6d28d9", "#0e7490", "#065f46", "#92400e",
+    "#be185d", "#b45309", "#1e3a5f", "#4a044e", "#134e4a",
+]
+
 
-    # Duration coverage
-    dur_count = int(df["duration_hours"].notna().sum())
+def render_stats(df: pd.DataFrame, agg: dict):
+    """Quick stats row for the whole catalogue and the current selection."""
+    # Top Focus Areas of the selection come precomputed with the cached result
+    top_focus_areas = agg["top_focus_areas"]
 
     stats_html = f"""
 <div class="stat-row">
@@ -512,7 +385,7 @@ if not st.session_state.show_tutor_section:
     <div class="stat-label">Platforms</div>
   </div>
   <div class="stat-card">
-    <div class="stat-value">{len(filtered)}</div>
+    <div class="stat-value">{agg["count"]}</div>
     <div class="stat-label">Showing Now</div>
   </div>
   <div class="stat-card" style="min-width:260px; text-align:left;">
@@ -526,127 +399,93 @@ if not st.session_state.show_tutor_section:
     st.markdown(stats_html, unsafe_allow_html=True)
     st.markdown("---")
 
-    # ─────────────────────────────────────────────────────────────────────────────
-    # RESULT COUNT & SORTING
-    # ─────────────────────────────────────────────────────────────────────────────
-    if filtered.empty:
-        st.warning("No courses match your filters. Try widening your search.")
-        st.stop()
 
-    # Sorting and view options
-    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-    with col1:
-        st.markdown(
-            f"<p style='color:#94a3b8; font-size:.85rem; margin-top: 0.5rem;'>Showing <b style='color:#f1f5f9'>{len(filtered)}</b> of {len(df)} courses</p>",
-            unsafe_allow_html=True,
-        )
-    with col2:
-        sort_by = st.selectbox(
-            "Sort by",
-            ["Relevance", "Duration (Low to High)", "Duration (High to Low)", "Title (A-Z)", "Title (Z-A)"],
-            label_visibility="collapsed"
-        )
-    with col3:
-        view_mode = st.selectbox("View", ["Grid", "List"], label_visibility="collapsed")
-    with col4:
-        # Export to CSV
-        csv_data = filtered[["title", "domain", "platform", "level", "format", "duration_hours", "lms_link", "short_description"]].to_csv(index=False)
-        st.download_button(
-            label="📥 Export",
-            data=csv_data,
-            file_name=f"courses_export_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
-
-    # Apply sorting
-    if sort_by == "Duration (Low to High)":
-        filtered = filtered.sort_values("duration_hours", na_position='last')
-    elif sort_by == "Duration (High to Low)":
-        filtered = filtered.sort_values("duration_hours", ascending=False, na_position='last')
-    elif sort_by == "Title (A-Z)":
-        filtered = filtered.sort_values("title")
-    elif sort_by == "Title (Z-A)":
-        filtered = filtered.sort_values("title", ascending=False)
-
-    st.markdown("---")
-
-# ─────────────────────────────────────────────────────────────────────────────
-    # ─────────────────────────────────────────────────────────────────────────────
-    # CARD GRID — 3 columns or list view
-    # ─────────────────────────────────────────────────────────────────────────────
-    DOMAIN_COLORS = [
-        "#1d4ed8", "#6d28d9", "#0e7490", "#065f46", "#92400e",
-        "#be185d", "#b45309", "#1e3a5f", "#4a044e", "#134e4a",
-    ]
-    domain_list = sorted({d for d in df["domain"].unique() if d})
-    domain_color_map = {d: DOMAIN_COLORS[i % len(DOMAIN_COLORS)] for i, d in enumerate(domain_list)}
-
-    if view_mode == "Grid":
-        COLS = 3
-        rows = [filtered.iloc[i: i + COLS] for i in range(0, len(filtered), COLS)]
+def _log_course_click(course_id: int, title: str, source: str):
+    log_event("course_click", session=st.session_state.session_id, course_id=course_id, title=title,
+              source=source)
+
+
+def course_link(label: str, link: str, course_id: int, title: str, source: str, key: str | None = None, **button):
+    """LMS link button that records a "course_click" event when it is followed."""
+    st.link_button(label, link, key=key or f"link_{source}_{course_id}", on_click=_log_course_click,
+                   args=(course_id, title, source), **button)
+
+
+def render_similar(df: pd.DataFrame, graph: SimilarityGraph, course_id: int):
+    """"Similar courses" list for one card — a slice of the precomputed kNN graph."""
+    neighbours = graph.neighbours(course_id, config.SIMILAR_SHOWN)
+    if not neighbours:
+        return
+    st.markdown("**Similar courses:**")
+    for other_id, _score in neighbours:
+        other = df.loc[other_id]
+        title = str(other["title"])
+        link = other.get("lms_link")
+        meta = " · ".join(str(v) for v in (other.get("platform"), other.get("level")) if isinstance(v, str) and v)
+        label = f"{title} ({meta})" if meta else title
+        if isinstance(link, str) and link.startswith("http"):
+            course_link(label, link, int(other_id), title, "similar", key=f"link_similar_{course_id}_{other_id}",
+                        type="tertiary")
+        else:
+            st.markdown(f"- {label}")
+
+
+def render_card(row: pd.Series, domain_color_map: dict, df: pd.DataFrame, graph: SimilarityGraph):
+    """One course card plus its on-demand details expander."""
+    domain_val = row.get("domain", "") or ""
+    level_val  = row.get("level", "")  or ""
+    fmt_val    = row.get("format", "")  or ""
+    journey    = row.get("journey_stage", "") or ""
+    platform   = row.get("platform", "") or ""
+    link       = row.get("lms_link", "")  or ""
+    dur_h      = row.get("duration_hours")
+    res_type   = row.get("resource_type", "") or ""
+    desc       = row.get("short_description", "") or ""
+    full_desc  = row.get("full_description", "") or ""
+    prereqs    = row.get("prerequisites", "") or ""
+    skills     = row.get("skill_tags", []) or []
+    title      = row.get("title", "(Untitled)")
+    
+    # Ensure all string fields are actually strings
+    domain_val = str(domain_val) if pd.notna(domain_val) else ""
+    level_val = str(level_val) if pd.notna(level_val) else ""
+    fmt_val = str(fmt_val) if pd.notna(fmt_val) else ""
+    journey = str(journey) if pd.notna(journey) else ""
+    platform = str(platform) if pd.notna(platform) else ""
+    link = str(link) if pd.notna(link) else ""
+    res_type = str(res_type) if pd.notna(res_type) else ""
+    desc = str(desc) if pd.notna(desc) else ""
+    full_desc = str(full_desc) if pd.notna(full_desc) else ""
+    prereqs = str(prereqs) if pd.notna(prereqs) else ""
+    title = str(title) if pd.notna(title) else "(Untitled)"
+
+    # Domain color
+    d_color = domain_color_map.get(domain_val, "#374151")
+    d_fg = "#bfdbfe"
+
+    # Duration display
+    if dur_h is not None and pd.notna(dur_h):
+        if dur_h >= 100:
+            dur_display = f"~{int(dur_h/10)*10}h est."
+        else:
+            dur_display = f"{dur_h}h"
     else:
-        COLS = 1
-        rows = [filtered.iloc[i: i + COLS] for i in range(0, len(filtered), COLS)]
-
-    for row_batch in rows:
-        cols = st.columns(COLS)
-        for col, (_, row) in zip(cols, row_batch.iterrows()):
-            with col:
-                domain_val = row.get("domain", "") or ""
-                level_val  = row.get("level", "")  or ""
-                fmt_val    = row.get("format", "")  or ""
-                journey    = row.get("journey_stage", "") or ""
-                platform   = row.get("platform", "") or ""
-                link       = row.get("lms_link", "")  or ""
-                dur_h      = row.get("duration_hours")
-                res_type   = row.get("resource_type", "") or ""
-                desc       = row.get("short_description", "") or ""
-                full_desc  = row.get("full_description", "") or ""
-                prereqs    = row.get("prerequisites", "") or ""
-                skills     = row.get("skill_tags", []) or []
-                title      = row.get("title", "(Untitled)")
-                
-                # Ensure all string fields are actually strings
-                domain_val = str(domain_val) if pd.notna(domain_val) else ""
-                level_val = str(level_val) if pd.notna(level_val) else ""
-                fmt_val = str(fmt_val) if pd.notna(fmt_val) else ""
-                journey = str(journey) if pd.notna(journey) else ""
-                platform = str(platform) if pd.notna(platform) else ""
-                link = str(link) if pd.notna(link) else ""
-                res_type = str(res_type) if pd.notna(res_type) else ""
-                desc = str(desc) if pd.notna(desc) else ""
-                full_desc = str(full_desc) if pd.notna(full_desc) else ""
-                prereqs = str(prereqs) if pd.notna(prereqs) else ""
-                title = str(title) if pd.notna(title) else "(Untitled)"
-
-                # Domain color
-                d_color = domain_color_map.get(domain_val, "#374151")
-                d_fg = "#bfdbfe"
-
-                # Duration display
-                if dur_h is not None:
-                    if dur_h >= 100:
-                        dur_display = f"~{int(dur_h/10)*10}h est."
-                    else:
-                        dur_display = f"{dur_h}h"
-                else:
-                    dur_display = row.get("length_raw", "") or "Duration TBD"
-
-                # Build badge HTML
-                badges = ""
-                if domain_val and domain_val.strip():
-                    badges += f'<span class="badge badge-domain">{str(domain_val)[:30]}</span>'
-                if level_val and level_val.strip():
-                    badges += f'<span class="badge badge-level">{str(level_val)}</span>'
-                if fmt_val and fmt_val.strip():
-                    badges += f'<span class="badge badge-format">{str(fmt_val)}</span>'
-                if journey and journey.strip():
-                    badges += f'<span class="badge badge-journey">{str(journey)}</span>'
-                if platform and platform.strip():
-                    badges += f'<span class="badge badge-platform">{str(platform)[:20]}</span>'
-
-                card_html = f"""
+        dur_display = row.get("length_raw", "") or "Duration TBD"
+
+    # Build badge HTML
+    badges = ""
+    if domain_val and domain_val.strip():
+        badges += f'<span class="badge badge-domain">{str(domain_val)[:30]}</span>'
+    if level_val and level_val.strip():
+        badges += f'<span class="badge badge-level">{str(level_val)}</span>'
+    if fmt_val and fmt_val.strip():
+        badges += f'<span class="badge badge-format">{str(fmt_val)}</span>'
+    if journey and journey.strip():
+        badges += f'<span class="badge badge-journey">{str(journey)}</span>'
+    if platform and platform.strip():
+        badges += f'<span class="badge badge-platform">{str(platform)[:20]}</span>'
+
+    card_html = f"""
 <div class="course-card">
   <div class="card-title">{title}</div>
   <div>{badges}</div>
@@ -654,77 +493,85 @@ if not st.session_state.show_tutor_section:
   <div class="card-description">{desc or '<em style="color:#64748b">No description available.</em>'}</div>
 </div>
 """
-                st.markdown(card_html, unsafe_allow_html=True)
+    st.markdown(card_html, unsafe_allow_html=True)
 
-                # ── Clickable card with dialog ────────────────────────────────
-                if st.button("View Details", key=f"view_{row['id']}", use_container_width=True, type="primary"):
-                    with st.expander("📖 Course Details", expanded=True):
-                        st.markdown(f"### {title}")
-                        
-                        # Course metadata in columns
-                        meta_col1, meta_col2 = st.columns(2)
-                        with meta_col1:
-                            if domain_val and domain_val.strip():
-                                st.markdown(f"**Domain:** {domain_val}")
-                            if platform and platform.strip():
-                                st.markdown(f"**Platform:** {platform}")
-                            if level_val and level_val.strip():
-                                st.markdown(f"**Level:** {level_val}")
-                        with meta_col2:
-                            if fmt_val and fmt_val.strip():
-                                st.markdown(f"**Format:** {fmt_val}")
-                            if dur_display:
-                                st.markdown(f"**Duration:** {dur_display}")
-                            if journey and journey.strip():
-                                st.markdown(f"**Journey Stage:** {journey}")
-                        
-                        st.markdown("---")
-                        
-                        # Learning outcomes
-                        if full_desc and isinstance(full_desc, str) and full_desc.strip() and full_desc not in ("nan", "None"):
-                            st.markdown("**Learning Outcomes:**")
-                            st.markdown(full_desc[:800] + ("…" if len(full_desc) > 800 else ""))
-                        
-                        # Prerequisites
-                        if prereqs and isinstance(prereqs, str) and prereqs.strip() and prereqs not in ("nan", "N/A", "None", ""):
-                            st.markdown("**Prerequisites:**")
-                            st.markdown(prereqs[:300])
-                        
-                        # Skills - only show if they're actual skills, not long descriptions
-                        if skills and len(skills) > 0:
-                            # Filter out very long skill descriptions (likely the competency text)
-                            clean_skills = [s for s in skills if len(s) < 100]
-                            if clean_skills:
-                                st.markdown("**Skills Covered:**")
-                                st.markdown(", ".join(clean_skills[:10]))  # Limit to 10 skills
-                        
-                        st.markdown("---")
-                        
-                        # Course link
-                        if link and link.strip() and link not in ("nan", "None", ""):
-                            st.link_button("🔗 Open Course", link, use_container_width=True)
-                        else:
-                            st.info("No course link available.")
+    # ── Clickable card with dialog ────────────────────────────────
+    if st.button("View Details", key=f"view_{row['id']}", use_container_width=True, type="primary"):
+        log_event("course_details", session=st.session_state.session_id, course_id=int(row["id"]), title=title)
+        with st.expander("📖 Course Details", expanded=True):
+            st.markdown(f"### {title}")
+            
+            # Course metadata in columns
+            meta_col1, meta_col2 = st.columns(2)
+            with meta_col1:
+                if domain_val and domain_val.strip():
+                    st.markdown(f"**Domain:** {domain_val}")
+                if platform and platform.strip():
+                    st.markdown(f"**Platform:** {platform}")
+                if level_val and level_val.strip():
+                    st.markdown(f"**Level:** {level_val}")
+            with meta_col2:
+                if fmt_val and fmt_val.strip():
+                    st.markdown(f"**Format:** {fmt_val}")
+                if dur_display:
+                    st.markdown(f"**Duration:** {dur_display}")
+                if journey and journey.strip():
+                    st.markdown(f"**Journey Stage:** {journey}")
+            
+            st.markdown("---")
+            
+            # Learning outcomes
+            if full_desc and isinstance(full_desc, str) and full_desc.strip() and full_desc not in ("nan", "None"):
+                st.markdown("**Learning Outcomes:**")
+                st.markdown(full_desc[:800] + ("…" if len(full_desc) > 800 else ""))
+            
+            # Prerequisites
+            if prereqs and isinstance(prereqs, str) and prereqs.strip() and prereqs not in ("nan", "N/A", "None", ""):
+                st.markdown("**Prerequisites:**")
+                st.markdown(prereqs[:300])
+            
+            # Skills - only show if they're actual skills, not long descriptions
+            if skills and len(skills) > 0:
+                # Filter out very long skill descriptions (likely the competency text)
+                clean_skills = [s for s in skills if len(s) < 100]
+                if clean_skills:
+                    st.markdown("**Skills Covered:**")
+                    st.markdown(", ".join(clean_skills[:10]))  # Limit to 10 skills
+
+            render_similar(df, graph, int(row["id"]))
+            
+            st.markdown("---")
+            
+            # Course link
+            if link and link.strip() and link not in ("nan", "None", ""):
+                course_link("🔗 Open Course", link, int(row["id"]), title, "details", use_container_width=True)
+            else:
+                st.info("No course link available.")
 
-                st.markdown("<div style='margin-bottom:1.2rem;'></div>", unsafe_allow_html=True)
+            # Provenance of federated records (see federation.py)
+            sources = row.get("sources")
+            if isinstance(sources, str) and sources:
+                st.caption(f"Sources: {sources}")
 
-    # ─────────────────────────────────────────────────────────────────────────────
-    # FOOTER
-    # ─────────────────────────────────────────────────────────────────────────────
+    st.markdown("<div style='margin-bottom:1.2rem;'></div>", unsafe_allow_html=True)
+
+
+def render_insights(df: pd.DataFrame, agg: dict):
+    """Footer insights about the filtered selection."""
     st.markdown("---")
 
     # Quick insights about filtered data
-    if len(filtered) > 0:
-        avg_duration = filtered["duration_hours"].mean()
-        most_common_platform = filtered["platform"].mode()[0] if not filtered["platform"].mode().empty else "N/A"
-        most_common_level = filtered["level"].mode()[0] if not filtered["level"].mode().empty else "N/A"
+    if agg["count"] > 0:
+        avg_duration = agg["avg_duration"]
+        most_common_platform = agg["top_platform"]
+        most_common_level = agg["top_level"]
         
         insight_col1, insight_col2, insight_col3 = st.columns(3)
         with insight_col1:
             st.markdown(f"""
             <div class="info-box">
                 <strong>📊 Average Duration</strong><br>
-                {f'{avg_duration:.1f} hours' if pd.notna(avg_duration) else 'N/A'}
+                {f'{avg_duration:.1f} hours' if avg_duration is not None else 'N/A'}
             </div>
             """, unsafe_allow_html=True)
         with insight_col2:
@@ -745,8 +592,143 @@ if not st.session_state.show_tutor_section:
         st.markdown(
             "<p style='text-align:center; color:#475569; font-size:.8rem; margin-top: 2rem;'>"
             "Course Explorer MVP · Student Success Support · CMU · "
-            f"Catalogue: {len(df)} resources across {df['domain'].nunique()} domains"
+            f"Catalogue: {len(df)} resources across {df['domain'].nunique()} domains · "
+            f"Result cache hit rate: {result_cache.stats()['hit_rate']:.0%}"
             "</p>",
             unsafe_allow_html=True,
         )
-# Chatbot is now rendered conditionally via sidebar toggle (see line ~262)
\ No newline at end of file
+
+
+def _log_search(key: str, filters: dict, sort_by: str, results: int, seconds: float, backend_name: str):
+    """One "search" event per new selection — not per rerun of the same one."""
+    if st.session_state.get("logged_selection") == key:
+        return
+    st.session_state.logged_selection = key
+    log_event("search", session=st.session_state.session_id, query=filters["search"], sort=sort_by,
+              results=results,
+              facets={k: v for k, v in filters.items() if k != "search" and v not in ([], None, True)},
+              latency_ms=round(seconds * 1000, 2), backend=backend_name)
+
+
+@st.fragment
+def results_grid(df: pd.DataFrame, filters: dict, domains: list[str], backend, graph: SimilarityGraph):
+    """Results region — sort, view, export and "View Details" rerun only this fragment.
+
+    Filtering, sorting and the aggregates run in the storage backend; only
+    the rows of the pages shown are fetched from it.
+    """
+    # The sort widget is drawn below the stats, but its value is part of the
+    # cache key, so read it from session state first.
+    sort_by = st.session_state.get("results_sort", config.SORT_OPTIONS[0])
+    key = selection_key(filters, sort_by, f"{backend.name}:{df.attrs['version']}")
+    started = time.perf_counter()
+    selection = result_cache.get_or_compute(key, lambda: backend.select(filters, sort_by))
+    agg = selection.aggregates
+    _log_search(key, filters, sort_by, agg["count"], time.perf_counter() - started, backend.name)
+
+    render_stats(df, agg)
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # RESULT COUNT & SORTING
+    # ─────────────────────────────────────────────────────────────────────────────
+    if agg["count"] == 0:
+        st.warning("No courses match your filters. Try widening your search.")
+        return
+
+    # A new selection starts again from its first page
+    if st.session_state.get("results_pages_key") != key:
+        st.session_state.results_pages_key = key
+        st.session_state.results_pages = 1
+    shown = st.session_state.results_pages * config.RESULTS_PAGE_SIZE
+    filtered = backend.rows(selection.ids[:shown])
+
+    # Sorting and view options
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        st.markdown(
+            f"<p style='color:#94a3b8; font-size:.85rem; margin-top: 0.5rem;'>Showing <b style='color:#f1f5f9'>{agg['count']}</b> of {len(df)} courses</p>",
+            unsafe_allow_html=True,
+        )
+    with col2:
+        st.selectbox("Sort by", config.SORT_OPTIONS, label_visibility="collapsed", key="results_sort")
+    with col3:
+        view_mode = st.selectbox("View", ["Grid", "List"], label_visibility="collapsed")
+    with col4:
+        # Export is built only on request, then kept on disk per selection/format
+        with st.popover("📥 Export", use_container_width=True):
+            fmt = st.selectbox("Format", available_formats(), key="export_format")
+            if st.button("Prepare export", key="export_prepare", use_container_width=True):
+                st.session_state.export_ready = (key, fmt)
+            if st.session_state.get("export_ready") == (key, fmt):
+                with open(build_export(df, selection.ids, key, fmt), "rb") as fh:
+                    st.download_button(
+                        label="⬇️ Download",
+                        data=fh,
+                        file_name=f"courses_export_{datetime.now().strftime('%Y%m%d')}{export_extension(fmt)}",
+                        mime=export_mime(fmt),
+                        use_container_width=True
+                    )
+
+    st.markdown("---")
+
+    # ─────────────────────────────────────────────────────────────────────────────
+    # CARD GRID — 3 columns or list view
+    # ─────────────────────────────────────────────────────────────────────────────
+    domain_color_map = {d: DOMAIN_COLORS[i % len(DOMAIN_COLORS)] for i, d in enumerate(domains)}
+
+    COLS = 3 if view_mode == "Grid" else 1
+    rows = [filtered.iloc[i: i + COLS] for i in range(0, len(filtered), COLS)]
+
+    for row_batch in rows:
+        cols = st.columns(COLS)
+        for col, (_, row) in zip(cols, row_batch.iterrows()):
+            with col:
+                render_card(row, domain_color_map, df, graph)
+
+    if shown < agg["count"]:
+        st.button(f"Load more ({agg['count'] - shown} remaining)", key="results_load_more",
+                  use_container_width=True, on_click=_load_more_results)
+
+    render_insights(df, agg)
+
+
+def _load_more_results():
+    st.session_state.results_pages += 1
+
+
+@st.fragment
+def learning_path_section(planner: LearningPathPlanner):
+    """Goal + time budget → ordered course plan; submitting reruns only this section."""
+    with st.expander("🧭 Plan a learning path"):
+        with st.form("learning_path_form", border=False):
+            col_target, col_hours, col_deadline = st.columns([3, 1, 1])
+            with col_target:
+                target = st.text_input("What do you want to learn?", placeholder="e.g. machine learning",
+                                       key="path_target")
+            with col_hours:
+                weekly = st.number_input("Hours per week", min_value=1.0, max_value=40.0, step=0.5,
+                                         value=float(config.PATH_DEFAULT_WEEKLY_HOURS), key="path_weekly")
+            with col_deadline:
+                deadline = st.date_input("Deadline", key="path_deadline",
+                                         value=date.today() + timedelta(weeks=config.PATH_DEFAULT_WEEKS),
+                                         min_value=date.today() + timedelta(weeks=1))
+            submitted = st.form_submit_button("Plan my path", type="primary")
+        if target.strip():
+            weeks = max(1, (deadline - date.today()).days // 7)
+            started = time.perf_counter()
+            path = planner.plan(target, weekly, weeks)
+            if submitted:
+                log_event("path_plan", session=st.session_state.session_id, target=target, weekly_hours=weekly,
+                          weeks=weeks, results=len(path["steps"]),
+                          latency_ms=round((time.perf_counter() - started) * 1000, 2))
+            # Titles are plain text here; the buttons below log which courses get opened
+            st.markdown(format_path(path, links=False))
+            for n, step in enumerate(path["steps"], 1):
+                if step["lms_link"].startswith("http"):
+                    course_link(f"{n}. {step['title']}", step["lms_link"], step["id"], step["title"], "path",
+                                type="tertiary")
+
+
+if not st.session_state.show_tutor_section:
+    learning_path_section(path_planner)
+    results_grid(df, filters, facets["domain"], backend, similar_graph)
@@ -0,0 +1,324 @@
+"""
+batch_recommend.py — Headless course recommendations for a whole cohort
+Reads a roster of student goals, retrieves courses locally for each student
+(keyword relevance as in the assistant's pre-filter, plus level / format /
+duration constraints) across a process pool, and writes one recommendation
+file per student plus a metrics.json with throughput figures.
+
+The catalogue is loaded once in the parent; on fork-based platforms worker
+processes inherit it read-only (copy-on-write), elsewhere each worker loads
+it once in its initializer. Optional LLM re-ranking runs in the parent,
+where every call goes through the shared rate-limit scheduler at
+"background" priority, so a batch never starves interactive sessions.
+
+Roster CSV columns (case-insensitive):
+    student / student_id / student_name   required
+    goal                                  required, free text ("beginner python for data analysis")
+    level, format, max_hours              optional explicit constraints
+
+Usage:
+    python batch_recommend.py roster.csv -o recommendations/ [--workers 4] [--top-k 5] [--llm-rerank]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import load_catalogue, query_terms, relevance_scores, searchable_text
+
+_STUDENT_COLUMNS = ["student", "student_id", "student_name"]
+_LEVELS = {
+    "beginner":     ["beginner", "introductory", "introduction", "intro", "foundational", "basic", "101"],
+    "intermediate": ["intermediate"],
+    "advanced":     ["advanced", "expert", "deep dive", "deep-dive"],
+}
+_FORMATS = ["interactive", "passive"]
+_DURATION = r"(?:(?:under|less than|within|at most|max(?:imum)?|in|about|around)\s*)?(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?)\b"
+# Goal phrasing that is not a topic ("learn data science")
+_GOAL_STOPWORDS = {"learn", "study", "understand", "become", "to", "into", "of", "my", "how", "at",
+                   "by", "from", "than", "less", "within", "most", "max", "maximum", "hours", "hour",
+                   "hrs", "minutes", "mins"}
+_OUTPUT_FIELDS = ["id", "title", "domain", "platform", "level", "format", "duration_hours", "lms_link"]
+
+# Read-only catalogue (and its lower-cased search text) shared by the worker processes
+_CATALOGUE: pd.DataFrame | None = None
+_TEXT: dict[str, pd.Series] | None = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REQUEST PARSING
+# ─────────────────────────────────────────────────────────────────────────────
+def _cell(row: dict, key: str) -> str:
+    value = row.get(key)
+    return "" if value is None or pd.isna(value) else str(value).strip()
+
+
+def parse_request(row: dict) -> dict:
+    """Roster row → keywords and constraints (explicit columns win over the goal text)."""
+    goal = _cell(row, "goal")
+    g = goal.lower()
+
+    level = _cell(row, "level").lower() or next(
+        (lvl for lvl, words in _LEVELS.items() if any(re.search(rf"\b{re.escape(w)}\b", g) for w in words)), "")
+    fmt = _cell(row, "format").lower() or next((f for f in _FORMATS if f in g), "")
+
+    max_hours = None
+    explicit = _cell(row, "max_hours")
+    if explicit:
+        try:
+            max_hours = float(explicit)
+        except ValueError:
+            pass
+    else:
+        m = re.search(r"(?:under|less than|within|at most|max(?:imum)?)\s*(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?)\b", g)
+        if m:
+            max_hours = float(m.group(1)) / (60 if m.group(2).startswith("m") else 1)
+
+    # Keywords come from what is left once the constraint phrases are taken out
+    topic = re.sub(_DURATION, " ", g)
+    for word in [w for words in _LEVELS.values() for w in words] + _FORMATS:
+        topic = re.sub(rf"\b{re.escape(word)}\b", " ", topic)
+    keywords = [w for w in query_terms(topic) if w not in _GOAL_STOPWORDS and not w.isdigit()]
+    return {"goal": goal, "keywords": keywords, "level": level, "format": fmt, "max_hours": max_hours}
+
+
+def read_roster(path: str) -> list[dict]:
+    roster = pd.read_csv(path, dtype=str)
+    roster.columns = [c.strip().lower().replace(" ", "_") for c in roster.columns]
+    student_col = next((c for c in _STUDENT_COLUMNS if c in roster.columns), None)
+    if student_col is None or "goal" not in roster.columns:
+        raise ValueError("Roster needs a student column and a goal column.")
+    roster = roster.rename(columns={student_col: "student"})
+    return roster.to_dict(orient="records")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOCAL RETRIEVAL (runs in worker processes)
+# ─────────────────────────────────────────────────────────────────────────────
+def recommend(df: pd.DataFrame, request: dict, top_k: int, pool_size: int | None = None,
+              text: dict[str, pd.Series] | None = None) -> list[dict]:
+    """Top courses for one request: constraint filter, then weighted keyword relevance.
+
+    Rows that explicitly contradict a level/format constraint are dropped;
+    rows that do not state one stay eligible but rank after those that match.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    bonus = np.zeros(len(df), dtype=np.int32)
+    for col, wanted in (("level", request["level"]), ("format", request["format"])):
+        if not wanted:
+            continue
+        values = df[col].fillna("").str.lower()
+        matches = values.str.contains(wanted, regex=False).to_numpy()
+        keep &= matches | (values == "").to_numpy()
+        bonus += matches
+    if request["max_hours"] is not None:
+        hours = df["duration_hours"].to_numpy(dtype=float)
+        keep &= ~(hours > request["max_hours"])  # unknown durations stay eligible
+
+    scores = (relevance_scores(df, request["keywords"], text) if request["keywords"]
+              else np.zeros(len(df), np.int32))
+    if request["keywords"]:
+        keep &= scores > 0
+
+    candidates = np.flatnonzero(keep)
+    # Relevance first, constraint matches break ties, catalogue order last (stable)
+    order = candidates[np.lexsort((-bonus[candidates], -scores[candidates]))]
+    picked = df.iloc[order[: pool_size or top_k]]
+    out = []
+    for row, score in zip(picked[_OUTPUT_FIELDS].to_dict(orient="records"), scores[order[: pool_size or top_k]]):
+        row["duration_hours"] = None if pd.isna(row["duration_hours"]) else row["duration_hours"]
+        row["score"] = int(score)
+        out.append(row)
+    return out
+
+
+def _load_shared(catalogue_path: str):
+    global _CATALOGUE, _TEXT
+    _CATALOGUE = load_catalogue(catalogue_path)
+    _TEXT = searchable_text(_CATALOGUE)
+
+
+def _init_worker(catalogue_path: str):
+    if _CATALOGUE is None:  # already inherited when the pool forks
+        _load_shared(catalogue_path)
+
+
+def _recommend_chunk(chunk: list[dict], top_k: int, pool_size: int) -> list[tuple[dict, dict, list[dict]]]:
+    results = []
+    seen: dict[str, list[dict]] = {}  # cohorts repeat goals; answer each distinct request once
+    for row in chunk:
+        request = parse_request(row)
+        key = json.dumps(request, sort_keys=True)
+        if key not in seen:
+            seen[key] = recommend(_CATALOGUE, request, top_k, pool_size, _TEXT)
+        results.append((row, request, [dict(course) for course in seen[key]]))
+    return results
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OPTIONAL LLM RE-RANKING (parent process, rate-limited, background priority)
+# ─────────────────────────────────────────────────────────────────────────────
+_RERANK_PROMPT = (
+    "You rank course recommendations for a student. Given the student's goal and a numbered "
+    "list of candidate courses, return ONLY a JSON array of the candidate numbers, best first. "
+    "Include every number exactly once."
+)
+
+
+def _parse_ranking(raw: str, n: int) -> list[int] | None:
+    try:
+        ranking = json.loads(re.sub(r"```(?:json)?|```", "", raw).strip())
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(ranking, list):
+        return None
+    seen = []
+    for item in ranking:
+        if isinstance(item, int) and 1 <= item <= n and item - 1 not in seen:
+            seen.append(item - 1)
+    return seen or None
+
+
+def rerank(request: dict, candidates: list[dict], top_k: int) -> tuple[list[dict], bool]:
+    """LLM-ordered candidates (or the local order when the LLM is unavailable)."""
+    import llm_client
+
+    if len(candidates) <= 1:
+        return candidates[:top_k], False
+    listing = "\n".join(f"{i + 1}. {c['title']} ({c['level'] or 'level n/a'}, {c['platform'] or 'platform n/a'})"
+                        for i, c in enumerate(candidates))
+    messages = [
+        {"role": "system", "content": _RERANK_PROMPT},
+        {"role": "user", "content": f'Goal: "{request["goal"]}"\n\nCandidates:\n{listing}'},
+    ]
+    try:
+        raw = llm_client.complete("rerank", messages, temperature=0, max_tokens=100, coalesce=True,
+                                  priority="background",
+                                  validate=lambda text: _parse_ranking(text, len(candidates)) is not None)
+    except llm_client.LLMUnavailable:
+        llm_client.record_fallback("rerank")
+        return candidates[:top_k], False
+    ranking = _parse_ranking(raw, len(candidates))
+    if ranking is None:
+        llm_client.record_fallback("rerank")
+        return candidates[:top_k], False
+    rest = [i for i in range(len(candidates)) if i not in ranking]
+    return [candidates[i] for i in ranking + rest][:top_k], True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OUTPUT
+# ─────────────────────────────────────────────────────────────────────────────
+def _safe_name(student: str, used: set[str]) -> str:
+    base = re.sub(r"[^\w.-]+", "_", student).strip("._") or "student"
+    name, n = base, 1
+    while name in used:
+        n += 1
+        name = f"{base}_{n}"
+    used.add(name)
+    return name
+
+
+def _write_student(out_dir: str, name: str, fmt: str, row: dict, request: dict, courses: list[dict]):
+    if fmt == "csv":
+        pd.DataFrame(courses, columns=_OUTPUT_FIELDS + ["score"]).to_csv(
+            os.path.join(out_dir, f"{name}.csv"), index=False)
+    else:
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as fh:
+            json.dump({"student": row["student"], "request": request, "courses": courses},
+                      fh, ensure_ascii=False, indent=2)
+
+
+def run(roster_path: str, out_dir: str, catalogue_path: str = config.DATA_FILE,
+        workers: int | None = None, top_k: int = config.BATCH_TOP_K,
+        chunk_size: int = config.BATCH_CHUNK_SIZE, llm_rerank: bool = False, fmt: str = "json") -> dict:
+    """Recommend for every roster row; returns the metrics written to metrics.json."""
+    started = time.perf_counter()
+    rows = read_roster(roster_path)
+    _load_shared(catalogue_path)
+    loaded = time.perf_counter()
+
+    # With re-ranking, retrieve a larger candidate pool for the LLM to order
+    pool_size = top_k * config.BATCH_RERANK_POOL_FACTOR if llm_rerank else top_k
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or config.BATCH_WORKERS or None,
+                             initializer=_init_worker, initargs=(catalogue_path,)) as pool:
+        for chunk_results in pool.map(_recommend_chunk, chunks, [top_k] * len(chunks),
+                                      [pool_size] * len(chunks)):
+            results.extend(chunk_results)
+    retrieved = time.perf_counter()
+
+    reranked = 0
+    if llm_rerank:
+        # Threads only wait on the scheduler / network; admission is rate-limited there
+        with ThreadPoolExecutor(max_workers=config.BATCH_RERANK_THREADS) as threads:
+            ordered = list(threads.map(lambda r: rerank(r[1], r[2], top_k), results))
+        reranked = sum(1 for _, used_llm in ordered if used_llm)
+        results = [(row, request, courses) for (row, request, _), (courses, _) in zip(results, ordered)]
+    ranked = time.perf_counter()
+
+    os.makedirs(out_dir, exist_ok=True)
+    used: set[str] = set()
+    for row, request, courses in results:
+        _write_student(out_dir, _safe_name(str(row["student"]), used), fmt, row, request, courses)
+    finished = time.perf_counter()
+
+    total = finished - started
+    metrics = {
+        "students":          len(results),
+        "without_matches":   sum(1 for _, _, courses in results if not courses),
+        "workers":           workers or config.BATCH_WORKERS or os.cpu_count(),
+        "chunk_size":        chunk_size,
+        "llm_reranked":      reranked,
+        "seconds": {
+            "load":     round(loaded - started, 3),
+            "retrieve": round(retrieved - loaded, 3),
+            "rerank":   round(ranked - retrieved, 3),
+            "write":    round(finished - ranked, 3),
+            "total":    round(total, 3),
+        },
+        "students_per_second": round(len(results) / total, 1) if total else None,
+    }
+    if llm_rerank:
+        import llm_client
+        metrics["llm"] = llm_client.stats()
+    with open(os.path.join(out_dir, "metrics.json"), "w", encoding="utf-8") as fh:
+        json.dump(metrics, fh, indent=2)
+    return metrics
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Recommend courses for every student in a roster.")
+    parser.add_argument("roster", help="Roster CSV (student, goal[, level, format, max_hours])")
+    parser.add_argument("-o", "--output", default="recommendations")
+    parser.add_argument("--catalogue", default=config.DATA_FILE)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--top-k", type=int, default=config.BATCH_TOP_K)
+    parser.add_argument("--chunk-size", type=int, default=config.BATCH_CHUNK_SIZE)
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--llm-rerank", action="store_true",
+                        help="Re-rank each shortlist with the LLM (rate-limited, background priority)")
+    args = parser.parse_args(argv)
+
+    try:
+        metrics = run(args.roster, args.output, args.catalogue, args.workers, args.top_k,
+                      args.chunk_size, args.llm_rerank, args.format)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    print(f"✅ {metrics['students']} students in {metrics['seconds']['total']}s "
+          f"({metrics['students_per_second']}/s) → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
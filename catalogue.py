@@ -0,0 +1,435 @@
+"""
+catalogue.py — Course catalogue build for Course Explorer
+Loads the curation CSV, normalizes it into the explorer's column schema and
+precomputes the sort indexes used by the results grid. Pure pandas/numpy —
+app.py wraps these functions in Streamlit caches.
+
+Usage:
+    from catalogue import load_catalogue, SortIndex
+    df = load_catalogue("Online_curation.csv")
+    order = SortIndex(df).order(df["id"].to_numpy(), "Title (A-Z)")
+"""
+import hashlib
+import os
+import re
+import textwrap
+import unicodedata
+from concurrent.futures import Executor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COLUMN MAP
+# ─────────────────────────────────────────────────────────────────────────────
+RAW_COLS = {
+    "Competency domain":         "domain",
+    "Focus Areas":               "focus_area",
+    "Resource title":            "title",
+    "URL":                       "lms_link",
+    "Platform / host":           "platform",
+    "Resource type":             "resource_type",
+    "Stated learning outcomes":  "full_description",
+    "Stated prerequisites":      "prerequisites",
+    "Length (mins)":             "length_raw",
+    "Indicated level":           "level",
+    "Intended audience":         "audience",
+    "Format type (passive / interactive)": "format",
+    "Publication date":          "publication_date",
+    "Last updated":              "last_updated",
+    "Captions / transcripts":    "captions",
+    "Mobile accessible":         "mobile_accessible",
+    "Skill area":                "priority_skills",
+    "Student journey stage":     "journey_stage",
+    "Comments":                  "comments",
+}
+
+# Hierarchical columns: blank cells inherit the value from the rows above
+HIERARCHY_COLS = ["Competency domain", "Focus Areas"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIELD PARSERS
+# ─────────────────────────────────────────────────────────────────────────────
+def _parse_duration_hours(raw: str) -> float | None:
+    """Convert heterogeneous duration strings → approximate hours (float)."""
+    if not isinstance(raw, str) or not raw.strip():
+        return None
+    s = raw.lower().strip()
+
+    # patterns: "16 hours", "5 hours a day for 3 days", "12 weeks", "1 year",
+    #           "one semester", "35 videos roughly 50 mins each",
+    #           "16 videos roughly 4–17 min each", "5hrs", "5hours", "4 hrs"
+    patterns = [
+        (r"(\d+(?:\.\d+)?)\s*hours?\s*a\s*day\s*for\s*(\d+)\s*days?", lambda m: float(m.group(1)) * int(m.group(2))),
+        (r"(\d+(?:\.\d+)?)\s*hrs?\b", lambda m: float(m.group(1))),
+        (r"(\d+(?:\.\d+)?)\s*hours?\b", lambda m: float(m.group(1))),
+        (r"(\d+)\s*videos?\s*roughly\s*([\d.]+)\s*[-–]\s*([\d.]+)\s*min",
+         lambda m: int(m.group(1)) * (float(m.group(2)) + float(m.group(3))) / 2 / 60),
+        (r"(\d+)\s*videos?\s*roughly\s*([\d.]+)\s*min", lambda m: int(m.group(1)) * float(m.group(2)) / 60),
+        (r"(\d+(?:\.\d+)?)\s*min(?:utes?)?\b", lambda m: float(m.group(1)) / 60),
+        (r"(\d+)\s*weeks?\b", lambda m: float(m.group(1)) * 5),     # ~5 hrs/week light estimate
+        (r"one\s+semester|a\s+semester", lambda m: 45.0),
+        (r"half\s+a\s+semester", lambda m: 22.5),
+        (r"(\d+)\s*months?\b", lambda m: float(m.group(1)) * 10),
+        (r"(\d+)\s*years?\b", lambda m: float(m.group(1)) * 120),
+    ]
+    for pattern, fn in patterns:
+        m = re.search(pattern, s)
+        if m:
+            try:
+                return round(fn(m), 1)
+            except Exception:
+                continue
+    return None
+
+
+_SEASONS = {"spring": "March", "summer": "June", "fall": "September", "autumn": "September", "winter": "January"}
+_DATE_FORMATS = ["%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y", "%B %Y", "%b %Y",
+                 "%Y-%m-%d", "%m/%d/%Y", "%Y"]
+
+
+def _parse_date(raw) -> datetime | None:
+    """Parse free-text dates: "May 7, 2009", "April 13th, 2021", "Sept 2017", "Fall 2017", "2016"."""
+    if not isinstance(raw, str) or not raw.strip():
+        return None
+    s = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", raw.strip(), flags=re.IGNORECASE)
+    s = re.sub(r"\bsept\b", "Sep", s, flags=re.IGNORECASE)
+    season = re.match(r"(spring|summer|fall|autumn|winter)\s+(\d{4})", s, flags=re.IGNORECASE)
+    if season:
+        s = f"{_SEASONS[season.group(1).lower()]} {season.group(2)}"
+    for fmt in _DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        # Typos like "0202" are not dates (and overflow pandas' datetime range)
+        return parsed if 1900 <= parsed.year <= 2100 else None
+    return None
+
+
+def _skill_tags(s) -> list[str]:
+    """Normalize skill tags (may be long sentences — truncate for tags)."""
+    # Handle non-string types
+    if pd.isna(s) or not s:
+        return []
+    s = str(s)
+    if s.strip() in ("", "nan", "None"):
+        return []
+    # If it looks like a sentence (contains comma-separated brief things), split on comma
+    parts = [p.strip() for p in s.split(",") if p.strip()]
+    # Truncate very long parts to ~50 chars for display
+    return [str(p)[:60] + ("…" if len(str(p)) > 60 else "") for p in parts]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LOAD & NORMALIZE
+# ─────────────────────────────────────────────────────────────────────────────
+def normalize_catalogue(raw: pd.DataFrame, workers: int | None = None,
+                        pool: Executor | None = None) -> pd.DataFrame:
+    """Raw curation CSV frame (string dtype) → explorer schema with derived columns.
+
+    Large frames compute the per-row derived columns on `workers` processes
+    (default: config.NORMALIZE_WORKERS, then CPU count). Callers normalizing
+    many frames pass one `pool` to reuse instead of starting one per call.
+    """
+    # Forward-fill the hierarchical domain & focus area columns
+    for col in HIERARCHY_COLS:
+        raw[col] = raw[col].replace("", pd.NA).ffill()
+
+    # Rename
+    raw = raw.rename(columns=RAW_COLS)
+
+    # Drop rows with no title
+    df = raw.dropna(subset=["title"]).copy()
+    df = df[df["title"].str.strip() != ""].copy()
+    df = df.reset_index(drop=True)
+    df["id"] = df.index
+
+    # Clean text columns
+    for col in ["domain", "focus_area", "level", "format", "journey_stage",
+                 "priority_skills", "platform", "resource_type"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().replace({"nan": "", "N/A": "", "Not Stated": ""})
+
+    derived = _derive_parallel(df[DERIVE_INPUT_COLS], workers, pool)
+    for col in derived.columns:
+        df[col] = derived[col]
+
+    return df
+
+
+DERIVE_INPUT_COLS = ["full_description", "length_raw", "publication_date", "last_updated", "priority_skills"]
+
+
+def _derive_columns(part: pd.DataFrame) -> pd.DataFrame:
+    """Per-row derived columns — independent rows, so safe to compute per partition."""
+    out = pd.DataFrame(index=part.index)
+
+    # Short description: first 250 chars of learning outcomes
+    out["short_description"] = part["full_description"].fillna("").apply(
+        lambda s: textwrap.shorten(s.replace("\n", " ").strip(), width=250, placeholder="…")
+    )
+
+    # Parse duration
+    out["duration_hours"] = part["length_raw"].apply(_parse_duration_hours)
+
+    # Most recent of publication / last-updated dates (NaT when neither parses)
+    published = pd.to_datetime(part["publication_date"].apply(_parse_date))
+    updated = pd.to_datetime(part["last_updated"].apply(_parse_date))
+    out["updated_at"] = updated.where(updated.notna() & ~(published > updated), published)
+
+    out["skill_tags"] = part["priority_skills"].fillna("").apply(_skill_tags)
+    return out
+
+
+def normalize_workers(workers: int | None = None) -> int:
+    return workers or config.NORMALIZE_WORKERS or os.cpu_count() or 1
+
+
+def _derive_parallel(inputs: pd.DataFrame, workers: int | None = None,
+                     pool: Executor | None = None) -> pd.DataFrame:
+    """`_derive_columns` fanned out over contiguous partitions on a process pool.
+
+    Small inputs take the sequential path (pool start-up would dominate).
+    Partitions are merged back in submission order, so the result is
+    identical to the sequential one. Without a caller's `pool`, one is
+    started for this call only.
+    """
+    workers = normalize_workers(workers)
+    if workers <= 1 or len(inputs) < config.NORMALIZE_PARALLEL_MIN_ROWS:
+        return _derive_columns(inputs)
+
+    n_parts = min(workers * 4, max(1, len(inputs) // 1000))
+    bounds = np.linspace(0, len(inputs), n_parts + 1, dtype=int)
+    parts = [inputs.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+    if pool is not None:
+        return pd.concat(list(pool.map(_derive_columns, parts)))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as own_pool:
+        return pd.concat(list(own_pool.map(_derive_columns, parts)))
+
+
+def file_version(path: str) -> str:
+    """Content hash of a source file — identifies one catalogue build."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def load_catalogue(path: str = "Online_curation.csv") -> pd.DataFrame:
+    """Read and normalize the catalogue; `df.attrs["version"]` holds the source hash."""
+    if os.path.getsize(path) >= config.INGEST_STREAM_MIN_MB * 1024 * 1024:
+        from ingest import ingest_catalogue  # chunked, bounded-memory path for large sources
+        return ingest_catalogue(path)
+    df = normalize_catalogue(pd.read_csv(path, dtype=str))
+    df.attrs["version"] = file_version(path)
+    return df
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FACETS
+# ─────────────────────────────────────────────────────────────────────────────
+FACET_COLS = ["domain", "focus_area", "level", "format", "journey_stage", "platform"]
+
+
+def build_facets(df: pd.DataFrame) -> dict:
+    """Sorted option list per facet column, plus the parsed duration range."""
+    facets = {col: sorted({v for v in df[col].unique() if v}) for col in FACET_COLS}
+    dur = df["duration_hours"].dropna()
+    facets["duration_range"] = (float(dur.min()), float(dur.max())) if not dur.empty else None
+    return facets
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RELEVANCE
+# ─────────────────────────────────────────────────────────────────────────────
+# Title hits weigh 3, every other searchable column 1 (same scheme as the
+# assistant's pre-filter).
+RELEVANCE_COLUMNS = ["title", "domain", "focus_area", "full_description", "priority_skills",
+                     "audience", "short_description", "comments"]
+
+
+_QUERY_STOPWORDS = {
+    "find", "show", "me", "a", "an", "some", "courses", "course", "resource",
+    "on", "about", "for", "the", "in", "that", "are", "is", "i", "want", "need",
+    "looking", "something", "any", "good", "best", "top", "recommend", "please",
+    "can", "you", "give", "get", "like", "and", "or", "with", "have", "beginner",
+    "intermediate", "advanced", "short", "long", "quick", "under", "over",
+}
+
+
+def query_terms(text: str) -> list[str]:
+    """Simple tokenisation of a free-text request into search terms."""
+    return [w for w in re.findall(r"\b\w+\b", str(text).lower())
+            if w not in _QUERY_STOPWORDS and len(w) > 1]
+
+
+def searchable_text(df: pd.DataFrame) -> dict[str, pd.Series]:
+    """Lower-cased relevance columns; precompute once when scoring many queries."""
+    return {col: df[col].fillna("").astype(str).str.lower()
+            for col in RELEVANCE_COLUMNS if col in df.columns}
+
+
+def relevance_scores(df: pd.DataFrame, terms: list[str],
+                     text: dict[str, pd.Series] | None = None) -> np.ndarray:
+    """Lexical score per row: weighted count of (column, term) substring hits."""
+    text = text if text is not None else searchable_text(df)
+    scores = np.zeros(len(df), dtype=np.int32)
+    for col, values in text.items():
+        weight = 3 if col == "title" else 1
+        for term in terms:
+            scores += weight * values.str.contains(term, regex=False).to_numpy(dtype=np.int32)
+    return scores
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PRESORTED PERMUTATIONS
+# ─────────────────────────────────────────────────────────────────────────────
+# Sort option → (key, descending). Rows without a value always sort last.
+SORT_KEYS = {
+    "Duration (Low to High)": ("duration", False),
+    "Duration (High to Low)": ("duration", True),
+    "Title (A-Z)":            ("title", False),
+    "Title (Z-A)":            ("title", True),
+    "Recently updated":       ("recency", True),
+}
+
+
+def _collation_key(title: str) -> str:
+    """Accent- and case-insensitive key so "Écoles" sorts with "Ecoles", not after "Z"."""
+    decomposed = unicodedata.normalize("NFKD", str(title))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+
+def _numeric_order(values: np.ndarray, descending: bool) -> np.ndarray:
+    """Stable argsort with NaN last in both directions."""
+    keyed = -values if descending else values
+    return np.argsort(keyed, kind="stable")  # NaN sorts to the end
+
+
+class SortIndex:
+    """Stable catalogue permutations for every sort key, built once per catalogue.
+
+    Ordering a filtered subset is a gather over the precomputed permutation —
+    no comparisons at request time.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        duration = df["duration_hours"].to_numpy(dtype=float)
+        recency = df["updated_at"].map(lambda ts: ts.timestamp() if pd.notna(ts) else np.nan)
+        recency = recency.to_numpy(dtype=float)
+        keys = [_collation_key(t) for t in df["title"]]
+        title_asc = np.array(sorted(range(self.size), key=keys.__getitem__), dtype=np.int64)
+        title_desc = np.array(sorted(range(self.size), key=keys.__getitem__, reverse=True), dtype=np.int64)
+
+        self._perms = {
+            ("duration", False): _numeric_order(duration, False),
+            ("duration", True):  _numeric_order(duration, True),
+            ("title", False):    title_asc,
+            ("title", True):     title_desc,
+            ("recency", True):   _numeric_order(recency, True),
+        }
+
+    @property
+    def permutations(self) -> dict[tuple[str, bool], np.ndarray]:
+        return self._perms
+
+    @classmethod
+    def from_permutations(cls, size: int, perms: dict[tuple[str, bool], np.ndarray]) -> "SortIndex":
+        """Index over permutations built elsewhere (e.g. memory-mapped, see shared_catalogue.py)."""
+        index = cls.__new__(cls)
+        index.size = size
+        index._perms = perms
+        return index
+
+    def order(self, ids: np.ndarray, sort_by: str) -> np.ndarray:
+        """Row ids from `ids`, arranged in `sort_by` order (unknown keys keep `ids` order)."""
+        key = SORT_KEYS.get(sort_by)
+        if key is None:
+            return ids
+        perm = self._perms[key]
+        member = np.zeros(self.size, dtype=bool)
+        member[ids] = True
+        return perm[member[perm]]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FILTERING & AGGREGATES
+# ─────────────────────────────────────────────────────────────────────────────
+def canonical_filters(search: str = "", domains=(), focus=(), levels=(), formats=(), journey=(),
+                      platforms=(), duration=None, show_no_link: bool = True,
+                      duration_range=None) -> dict:
+    """Normalize a filter selection so equivalent selections compare (and hash) equal.
+
+    Search is case-folded and trimmed, selections are sorted, and a duration
+    slider left at the full catalogue range counts as no duration filter.
+    """
+    if duration is not None:
+        duration = [float(duration[0]), float(duration[1])]
+        if duration_range is not None and duration == [float(v) for v in duration_range]:
+            duration = None
+    return {
+        "search":       (search or "").strip().lower(),
+        "domains":      sorted(domains),
+        "focus":        sorted(focus),
+        "levels":       sorted(levels),
+        "formats":      sorted({f.lower() for f in formats}),
+        "journey":      sorted(journey),
+        "platforms":    sorted(platforms),
+        "duration":     duration,
+        "show_no_link": bool(show_no_link),
+    }
+
+
+def filter_ids(df: pd.DataFrame, filters: dict) -> np.ndarray:
+    """Row ids (catalogue order) matching a canonical filter selection."""
+    mask = pd.Series(True, index=df.index)
+
+    q_low = filters["search"]
+    if q_low:
+        mask &= (
+            df["title"].str.lower().str.contains(q_low, na=False, regex=False)
+            | df["short_description"].str.lower().str.contains(q_low, na=False, regex=False)
+            | df["full_description"].fillna("").str.lower().str.contains(q_low, na=False, regex=False)
+        )
+
+    for col, key in [("domain", "domains"), ("focus_area", "focus"), ("level", "levels"),
+                     ("journey_stage", "journey"), ("platform", "platforms")]:
+        if filters[key]:
+            mask &= df[col].isin(filters[key])
+
+    if filters["formats"]:
+        mask &= df["format"].str.lower().isin(filters["formats"])
+
+    if filters["duration"] is not None:
+        lo, hi = filters["duration"]
+        # Include rows without parsed duration unless explicitly filtered
+        mask &= df["duration_hours"].isna() | df["duration_hours"].between(lo, hi)
+
+    if not filters["show_no_link"]:
+        mask &= df["lms_link"].notna() & (df["lms_link"].str.strip() != "")
+
+    return df.loc[mask, "id"].to_numpy()
+
+
+def selection_aggregates(selection: pd.DataFrame) -> dict:
+    """Stats and insight figures for a filtered selection."""
+    platform_mode = selection["platform"].mode()
+    level_mode = selection["level"].mode()
+    avg_duration = selection["duration_hours"].mean()
+    return {
+        "count":           len(selection),
+        "top_focus_areas": selection["focus_area"].value_counts().head(5).index.tolist(),
+        "avg_duration":    None if pd.isna(avg_duration) else float(avg_duration),
+        "top_platform":    platform_mode.iloc[0] if not platform_mode.empty else "N/A",
+        "top_level":       level_mode.iloc[0] if not level_mode.empty else "N/A",
+    }
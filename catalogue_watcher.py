@@ -0,0 +1,167 @@
+"""
+catalogue_watcher.py — Background rebuild and atomic hot-swap of the catalogue
+A daemon thread polls the catalogue sources and tutors.csv. When a file has
+changed and stopped changing (same size and mtime on two consecutive polls,
+so a half-written upload is never read), it loads the catalogue and builds
+every derived index — facets, sort permutations, storage backend, similar-
+courses graph, learning-path planner, tutor index — off the request path.
+
+The finished snapshot replaces the previous one with a single reference
+assignment, and its generation number goes up by one. A request reads
+`watcher.current` once and uses that snapshot throughout, so it never waits
+on a rebuild and never mixes two versions. A failed rebuild keeps the
+current snapshot serving and is retried when the files change again.
+
+Usage:
+    from catalogue_watcher import CatalogueWatcher
+    watcher = CatalogueWatcher().start()       # first build is synchronous
+    snapshot = watcher.current                  # .df, .sort_index, .backend, ...
+    watcher.refresh()                           # rebuild now, in the background
+"""
+
+import os
+import threading
+import time
+import traceback
+from typing import Callable
+
+import pandas as pd
+
+import config
+import shared_catalogue
+from catalogue import SortIndex, build_facets, load_catalogue
+from federation import load_federated
+from learning_path import LearningPathPlanner
+from similar_courses import SimilarityGraph, load_or_build_graph
+from storage import open_backend
+from tutor_index import TutorIndex, read_tutors
+
+
+def watched_paths(tutors_path: str = "tutors.csv") -> list[str]:
+    """Every file the catalogue snapshot is built from."""
+    sources = [s["path"] for s in config.FEDERATION_SOURCES] or [config.DATA_FILE]
+    return [*sources, tutors_path]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SNAPSHOT
+# ─────────────────────────────────────────────────────────────────────────────
+class CatalogueSnapshot:
+    """One fully built catalogue and its indexes. Never modified after build."""
+
+    def __init__(self, df: pd.DataFrame, tutors: pd.DataFrame, generation: int = 0,
+                 sort_index: SortIndex | None = None, similar_graph: SimilarityGraph | None = None):
+        self.generation = generation
+        self.df = df
+        self.version = df.attrs["version"]
+        self.facets = build_facets(df)
+        self.sort_index = sort_index or SortIndex(df)
+        self.backend = open_backend(config.STORAGE_BACKEND, df, sort_index=self.sort_index)
+        self.similar_graph = similar_graph or load_or_build_graph(df)
+        self.path_planner = LearningPathPlanner(df)
+        self.tutors = tutors
+        self.tutor_index = TutorIndex(tutors, self.facets["focus_area"])
+
+
+def build_snapshot(generation: int = 0, catalogue_path: str = config.DATA_FILE,
+                   tutors_path: str = "tutors.csv") -> CatalogueSnapshot:
+    if shared_catalogue.available():
+        # Attach to the copy other server processes share (see shared_catalogue.py)
+        df, sort_index, graph = shared_catalogue.load_shared()
+        return CatalogueSnapshot(df, read_tutors(tutors_path), generation, sort_index, graph)
+    df = (load_federated(config.FEDERATION_SOURCES) if config.FEDERATION_SOURCES
+          else load_catalogue(catalogue_path))
+    return CatalogueSnapshot(df, read_tutors(tutors_path), generation)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WATCHER
+# ─────────────────────────────────────────────────────────────────────────────
+class CatalogueWatcher:
+    """Holds the current snapshot and rebuilds it in the background on file changes.
+
+    `build(generation)` returns the new snapshot; anything with a
+    `generation` attribute works (api.py builds its own state object).
+    """
+
+    def __init__(self, build: Callable[[int], object] = build_snapshot, paths: list[str] | None = None,
+                 interval: float = config.WATCH_INTERVAL_SECONDS):
+        self.build = build
+        self.paths = paths if paths is not None else watched_paths()
+        self.interval = interval
+        self.current = None
+        self.last_error: str | None = None
+        self.last_swap: float | None = None
+        self._built_signature = None
+        self._failed_signature = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._forced = False
+        self._thread: threading.Thread | None = None
+
+    def _signature(self) -> tuple:
+        signature = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                signature.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _rebuild(self, signature: tuple):
+        generation = (self.current.generation + 1) if self.current is not None else 0
+        started = time.perf_counter()
+        try:
+            snapshot = self.build(generation)
+        except Exception:
+            self.last_error = traceback.format_exc()
+            self._failed_signature = signature
+            print(f"⚠️ Catalogue rebuild failed; still serving generation "
+                  f"{getattr(self.current, 'generation', None)}\n{self.last_error}")
+            return
+        self.current = snapshot  # the swap: one reference assignment
+        self._built_signature = signature
+        self._failed_signature = None
+        self.last_error = None
+        self.last_swap = time.time()
+        print(f"🔄 Catalogue generation {generation} live ({time.perf_counter() - started:.1f}s build)")
+
+    def start(self) -> "CatalogueWatcher":
+        """Build the first snapshot (blocking) and start polling."""
+        if self.current is None:
+            signature = self._signature()
+            self.current = self.build(0)
+            self._built_signature = signature
+        if self._thread is None and config.WATCH_ENABLED:
+            self._thread = threading.Thread(target=self._run, name="catalogue-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def refresh(self):
+        """Rebuild from the current files on the watcher thread, even if unchanged."""
+        if self._thread is None:
+            self._rebuild(self._signature())
+            return
+        self._forced = True
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        previous = self._built_signature
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            signature = self._signature()
+            if self._forced:
+                self._forced = False
+                self._rebuild(signature)
+            elif (signature == previous and signature != self._built_signature
+                  and signature != self._failed_signature):
+                self._rebuild(signature)
+            previous = signature
@@ -1,28 +1,32 @@
 """
 chatbot_1.py — Course Discovery Chatbot (Native Streamlit UI)
 Full-page chatbot that renders in the main body area.
-Backend uses Groq (llama-3.3-70b-versatile).
+Backend uses Groq through llm_client, which picks a model per stage (small
+models for routing/keywords, llama-3.3-70b-versatile for chat) and adds
+latency budgets, retries and a circuit breaker with local fallbacks.
 
 Usage in app_1.py:
     from chatbot_1 import render_chatbot
-    render_chatbot(df, theme=st.session_state.theme)
+    render_chatbot(df)
+
+Styling (including dark/light colours) comes from the shared stylesheet in
+theme_styles.py.
 """
 
 import json
 import os
 import re
-from dotenv import load_dotenv
+import time
 import pandas as pd
 import streamlit as st
-from groq import Groq
-
-load_dotenv()
 
-# ─────────────────────────────────────────────────────────────────────────────
-# GROQ CLIENT
-# ─────────────────────────────────────────────────────────────────────────────
-client = Groq()
-MODEL  = "llama-3.3-70b-versatile"
+import llm_client
+from catalogue import query_terms, relevance_scores
+from event_log import log_event, session_id
+from learning_path import format_path, is_path_request, parse_path_request
+from llm_client import LLMUnavailable
+from llm_scheduler import scheduler
+from tutor_availability import format_window, parse_time_window
 
 # ─────────────────────────────────────────────────────────────────────────────
 # COLUMN MAP
@@ -143,9 +147,9 @@ def _parse_duration_to_mins(raw: str) -> float | None:
 def _extract_keywords(question: str) -> list[str]:
     """Use LLM to extract the core search keywords from the user's question."""
     try:
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        raw = llm_client.complete(
+            "keywords",
+            [
                 {
                     "role": "system",
                     "content": (
@@ -161,35 +165,47 @@ def _extract_keywords(question: str) -> list[str]:
             ],
             temperature=0,
             max_tokens=100,
+            coalesce=True,
+            validate=lambda raw: _parse_keywords(raw) is not None,
         )
-        raw = completion.choices[0].message.content.strip()
-        clean = re.sub(r"```(?:json)?|```", "", raw).strip()
-        keywords = json.loads(clean)
-        if isinstance(keywords, list):
-            return [str(k).lower().strip() for k in keywords if k]
-    except Exception:
+        keywords = _parse_keywords(raw)
+        if keywords is not None:
+            return keywords
+    except LLMUnavailable:
         pass
 
-    # Fallback: simple tokenisation
-    STOPWORDS_SIMPLE = {
-        "find","show","me","a","an","some","courses","course","resource",
-        "on","about","for","the","in","that","are","is","i","want","need",
-        "looking","something","any","good","best","top","recommend","please",
-        "can","you","give","get","like","and","or","with","have","beginner",
-        "intermediate","advanced","short","long","quick","under","over",
-    }
-    return [w for w in re.findall(r'\b\w+\b', question.lower())
-            if w not in STOPWORDS_SIMPLE and len(w) > 1]
+    llm_client.record_fallback("keywords")
+    return _local_keywords(question)
+
+
+def _parse_keywords(raw: str) -> list[str] | None:
+    """Parse the extractor's JSON array; None if the output is not a usable list."""
+    clean = re.sub(r"```(?:json)?|```", "", raw).strip()
+    try:
+        keywords = json.loads(clean)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(keywords, list):
+        return None
+    keywords = [str(k).lower().strip() for k in keywords if k]
+    return keywords or None
+
+
+def _local_keywords(question: str) -> list[str]:
+    """Fallback: simple tokenisation, used whenever the LLM path is unavailable."""
+    return query_terms(question)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # SMART PRE-FILTER
 # ─────────────────────────────────────────────────────────────────────────────
-def _pre_filter(question: str, df: pd.DataFrame, max_results: int = 20) -> pd.DataFrame:
+def _pre_filter(question: str, df: pd.DataFrame, max_results: int = 20, backend=None) -> pd.DataFrame:
     """
     1. Use LLM to extract core keywords from the question.
     2. Search those keywords across key columns.
     3. Return top-scored rows, or full catalogue as fallback.
+
+    With a storage backend (see storage.py) the search runs in its database.
     """
     # ── Extract keywords via LLM ──────────────────────────────────────────────
     keywords = _extract_keywords(question)
@@ -197,31 +213,13 @@ def _pre_filter(question: str, df: pd.DataFrame, max_results: int = 20) -> pd.Da
     if not keywords:
         return df.head(max_results)
 
-    # ── Columns to search ─────────────────────────────────────────────────────
-    search_cols = [c for c in [
-    "title", "domain", "focus_area", "full_description",
-    "priority_skills", "audience", "short_description",
-    "skill_tags", "comments"
-] if c in df.columns]
-    title_col = "title" if "title" in df.columns else None
-
-    # ── Score each row ────────────────────────────────────────────────────────
-    def score_row(row):
-     s = 0
-     for col in search_cols:
-        try:
-            cell_text = str(row[col]).lower() if pd.notna(row[col]) else ""
-        except Exception:
-            cell_text = ""
-        for kw in keywords:
-            if kw in cell_text:
-                s += 3 if col == title_col else 1
-     return s
-
-    scores = df.apply(score_row, axis=1)
-    matched = df[scores > 0].copy()
-    matched["_score"] = scores[scores > 0]
-    matched = matched.sort_values("_score", ascending=False).drop(columns=["_score"])
+    if backend is not None:
+        return backend.pre_filter([kw.lower() for kw in keywords], max_results)
+
+    # ── Score each row (vectorized; title hits weigh 3, other columns 1) ──────
+    scores = relevance_scores(df, [kw.lower() for kw in keywords])
+    order = (-scores).argsort(kind="stable")
+    matched = df.iloc[order[scores[order] > 0]]
 
     print(f"[pre_filter] Matched {len(matched)} rows out of {len(df)}")
     print(matched['title'].head(2))
@@ -285,8 +283,8 @@ JSON schema (return exactly this shape):
     "reason": "Why this fits the student request."
   }
 ]"""
-def _search_courses(question: str, df: pd.DataFrame, history: list) -> dict:
-    relevant = _pre_filter(question, df, max_results=20)
+def _search_courses(question: str, df: pd.DataFrame, history: list, backend=None) -> dict:
+    relevant = _pre_filter(question, df, max_results=20, backend=backend)
     if relevant.empty:
         relevant = df.head(20)
 
@@ -340,14 +338,7 @@ def _search_courses_old(question: str, df: pd.DataFrame, history: list) -> dict:
             messages.append({"role": role, "content": content})
     messages.append({"role": "user", "content": user_msg})
 
-    completion = client.chat.completions.create(
-        model=MODEL,
-        messages=messages,
-        temperature=0.2,
-        max_tokens=1500,
-    )
-
-    raw = completion.choices[0].message.content.strip()
+    raw = llm_client.complete("ranking", messages, temperature=0.2, max_tokens=1500)
 
     try:
         clean   = re.sub(r"```(?:json)?|```", "", raw).strip()
@@ -425,17 +416,15 @@ def _classify_intent(question: str, history: list) -> str:
             {"role": "system", "content": _ROUTER_PROMPT},
             {"role": "user", "content": question}
         ]
-        completion = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            temperature=0,
-            max_tokens=10,
-        )
-        intent = completion.choices[0].message.content.strip().lower()
+        intent = llm_client.complete(
+            "router", messages, temperature=0, max_tokens=10, coalesce=True,
+            validate=lambda raw: raw.strip().strip(".\"'").lower() in ("course_search", "general"),
+        ).lower()
         return "course_search" if "course" in intent else "general"
-    except Exception:
-        # Default to general on failure
-        return "general"
+    except LLMUnavailable:
+        # Any single course signal is enough to keep the user on the search path
+        llm_client.record_fallback("router")
+        return "course_search" if signal_count else "general"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -451,6 +440,12 @@ Key duties:
 
 Be encouraging and professional. Keep responses under 3-4 sentences."""
 
+_GENERAL_FALLBACK = (
+    "I'm having trouble reaching the assistant service right now, so I can't answer "
+    "general questions at the moment. I can still search the course catalogue for you — "
+    "try something like *\"beginner Python course\"*."
+)
+
 
 def _general_chat(question: str, history: list) -> str:
     """Handle general (non-course) questions via LLM."""
@@ -464,100 +459,82 @@ def _general_chat(question: str, history: list) -> str:
             messages.append({"role": role, "content": content.get("message", "")})
     messages.append({"role": "user", "content": question})
 
-    completion = client.chat.completions.create(
-        model=MODEL,
-        messages=messages,
-        temperature=0.7,
-        max_tokens=800,
-    )
-    return completion.choices[0].message.content.strip()
+    try:
+        return llm_client.complete("general", messages, temperature=0.7, max_tokens=800)
+    except LLMUnavailable:
+        llm_client.record_fallback("general")
+        return _GENERAL_FALLBACK
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TUTOR SEARCH — answered locally from the tutor index (no LLM call)
+# ─────────────────────────────────────────────────────────────────────────────
+def _is_tutor_query(question: str) -> bool:
+    return bool(re.search(r"\btutor(s|ing)?\b", question, re.IGNORECASE))
+
+
+def _search_tutors(question: str, tutor_index) -> str:
+    """Tutors for the focus area and time window mentioned in the question."""
+    focus = tutor_index.focus_in_text(question)
+    window = parse_time_window(question)
+    if focus is None and window is None:
+        return ("I can find peer tutors by topic and time — try something like "
+                "*\"Who's free Tuesday 3-5pm for Data Science?\"*")
+
+    matches = tutor_index.find(focus, window)
+    label = " · ".join(filter(None, [focus, window and format_window(*window)]))
+    if not matches:
+        return f"I couldn't find a tutor for **{label}**. Try another day or time window."
+
+    lines = [f"Here are the peer tutors for **{label}**:"]
+    for tutor_id, _ in matches[:5]:
+        profile = tutor_index.profiles[tutor_id]
+        booking = f" — [Book a session]({profile['booking_link']})" if profile["booking_link"] else ""
+        lines.append(f"- **{profile['name'].strip()}** ({profile['availability']}){booking}")
+    return "\n".join(lines)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LEARNING PATHS — answered locally from the planner (no LLM call)
+# ─────────────────────────────────────────────────────────────────────────────
+def _plan_learning_path(question: str, planner) -> str:
+    """Ordered, budgeted course plan for the goal and time stated in the question."""
+    target, weekly, weeks = parse_path_request(question)
+    if not target:
+        return ("Tell me what you'd like to learn and how much time you have — e.g. "
+                "*\"A learning path to data visualization, 4 hours a week for 6 weeks\"*")
+    return f"Here's a learning path for **{target}**:\n\n" + format_path(planner.plan(target, weekly, weeks))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # RENDER — Full-page chatbot in the main body area
 # ─────────────────────────────────────────────────────────────────────────────
-def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
-    """Render the course discovery chatbot in the main body area."""
+@st.fragment
+def render_chatbot(df: pd.DataFrame, tutor_index=None, planner=None, backend=None):
+    """Render the course discovery chatbot in the main body area.
+
+    With a TutorIndex, questions about tutors ("who's free Tuesday 3-5pm
+    for Data Science?") are answered from its availability index. With a
+    LearningPathPlanner, study-plan requests ("a path to machine learning,
+    5 hours a week for 8 weeks") are answered locally as well. With a
+    storage backend, the course-search pre-filter queries its database.
+
+    Runs as a fragment: sending a message or clearing the chat reruns only
+    the chat panel, not the explorer script around it.
+    """
 
     # Session state
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
 
-    is_dark = theme == "dark"
-    bg       = "#0f1117" if is_dark else "#ffffff"
-    card_bg  = "#1a1d2e" if is_dark else "#f1f5f9"
-    text_c   = "#ffffff" if is_dark else "#1e293b"
-    border_c = "#374151" if is_dark else "#e2e8f0"
-    accent   = "#6366f1"
-    accent2  = "#8b5cf6"
-
-    # ── Custom CSS for chat styling ───────────────────────────────
-    st.markdown(f"""
-    <style>
-    /* Chat message text always white in dark mode */
-    .stChatMessage p, .stChatMessage span, .stChatMessage div {{
-        color: {text_c} !important;
-    }}
-    /* Course card styling */
-    .course-card {{
-        background: {card_bg};
-        border: 1px solid {border_c};
-        border-radius: 12px;
-        padding: 16px;
-        margin: 8px 0;
-        transition: border-color 0.2s;
-    }}
-    .course-card:hover {{
-        border-color: {accent};
-    }}
-    .course-card h4 {{
-        color: {text_c} !important;
-        margin: 0 0 8px 0;
-        font-size: 1rem;
-    }}
-    .course-card .badges {{
-        display: flex;
-        flex-wrap: wrap;
-        gap: 6px;
-        margin-bottom: 8px;
-    }}
-    .course-card .badge {{
-        display: inline-block;
-        padding: 2px 10px;
-        border-radius: 20px;
-        font-size: 0.75rem;
-        font-weight: 500;
-    }}
-    .badge-level {{ background: {"#1e3a5f" if is_dark else "#dbeafe"}; color: {"#93c5fd" if is_dark else "#1d4ed8"}; }}
-    .badge-duration {{ background: {"#1e2e22" if is_dark else "#dcfce7"}; color: {"#86efac" if is_dark else "#166534"}; }}
-    .badge-format {{ background: {"#2d1b4e" if is_dark else "#f3e8ff"}; color: {"#c4b5fd" if is_dark else "#7c3aed"}; }}
-    .badge-platform {{ background: {"#1c2538" if is_dark else "#e0f2fe"}; color: {"#7dd3fc" if is_dark else "#0369a1"}; }}
-    .course-card .reason {{
-        color: {"#94a3b8" if is_dark else "#64748b"};
-        font-size: 0.85rem;
-        font-style: italic;
-        margin: 8px 0;
-    }}
-    .course-card a {{
-        color: {accent};
-        text-decoration: none;
-        font-weight: 600;
-    }}
-    .course-card a:hover {{
-        color: {accent2};
-        text-decoration: underline;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
     # ── Header ────────────────────────────────────────────────────
     col_title, col_clear = st.columns([6, 1])
     with col_title:
-        st.markdown(f"""
+        st.markdown("""
         <div style="display:flex; align-items:center; gap:12px; margin-bottom:1rem;">
             <span style="font-size:2rem;">🎓</span>
             <div>
-                <h2 style="margin:0; color:{text_c};">Student Success Assistant</h2>
+                <h2 class="chat-title">Student Success Assistant</h2>
                 <p style="margin:0; color:#94a3b8; font-size:.85rem;">
                     Ask me anything — or describe a course you're looking for
                 </p>
@@ -567,17 +544,17 @@ def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
     with col_clear:
         if st.button("🗑️ Clear", key="chatbot_clear_btn", use_container_width=True):
             st.session_state.chat_history = []
-            st.rerun()
+            st.rerun(scope="fragment")
 
     st.divider()
 
     # ── Chat History ──────────────────────────────────────────────
     if not st.session_state.chat_history:
         # Empty state
-        st.markdown(f"""
-        <div style="text-align:center; padding: 3rem 1rem; color:{text_c};">
+        st.markdown("""
+        <div style="text-align:center; padding: 3rem 1rem; color:var(--chat-text);">
             <div style="font-size: 3rem; margin-bottom: 1rem;">💬</div>
-            <h3 style="color:{text_c}; margin: 0 0 .5rem 0;">Start a conversation</h3>
+            <h3 style="color:var(--chat-text); margin: 0 0 .5rem 0;">Start a conversation</h3>
             <p style="color:#94a3b8; font-size:.9rem; max-width:400px; margin:0 auto;">
                 I can help with general questions or find courses for you.<br><br>
                 <em>"Hello!"</em> · <em>"What is ML?"</em><br>
@@ -622,6 +599,14 @@ def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
                     else:
                         st.markdown(str(content))
 
+    # ── Back-pressure notice ──────────────────────────────────────
+    pressure = scheduler.pressure()
+    if pressure["level"] != "ok":
+        st.caption(
+            f"⏳ The assistant is busy right now (~{pressure['est_wait']:.0f}s queue). "
+            "Answers may be slower or fall back to a quick keyword search."
+        )
+
     # ── Chat Input ────────────────────────────────────────────────
     user_input = st.chat_input(
         placeholder="e.g. Find   NLP courses or recommend me  Python under course...",
@@ -630,6 +615,7 @@ def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
 
     if user_input and user_input.strip():
         question = user_input.strip()
+        started = time.perf_counter()
 
         # Add user message
         st.session_state.chat_history.append({
@@ -646,18 +632,35 @@ def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
             elif isinstance(m.get("content"), dict):
                 llm_history.append({"role": m["role"], "content": m["content"].get("message", "")})
 
-        # Classify intent: course search or general chat?
-        with st.spinner("💭 Thinking..."):
-            try:
-                intent = _classify_intent(question, llm_history)
-            except Exception:
-                intent = "general"
+        # Classify intent: tutor search, learning path, course search or general chat?
+        if tutor_index is not None and _is_tutor_query(question):
+            intent = "tutor_search"
+        elif planner is not None and is_path_request(question):
+            intent = "learning_path"
+        else:
+            with st.spinner("💭 Thinking..."):
+                try:
+                    intent = _classify_intent(question, llm_history)
+                except Exception:
+                    intent = "general"
 
-        if intent == "course_search":
+        if intent == "tutor_search":
+            st.session_state.chat_history.append({
+                "role": "assistant",
+                "content": _search_tutors(question, tutor_index),
+                "msg_type": "text"
+            })
+        elif intent == "learning_path":
+            st.session_state.chat_history.append({
+                "role": "assistant",
+                "content": _plan_learning_path(question, planner),
+                "msg_type": "text"
+            })
+        elif intent == "course_search":
             # Route to course search agent
             with st.spinner("🔍 Searching courses..."):
                 try:
-                    result = _search_courses(question, df, llm_history)
+                    result = _search_courses(question, df, llm_history, backend)
                    
                 except Exception as e:
                     result = {"type": "text", "content": f"Sorry, I encountered an error: {str(e)}"}
@@ -688,4 +691,8 @@ def render_chatbot(df: pd.DataFrame, theme: str = "dark"):
                 "msg_type": "text"
             })
 
-        st.rerun()
+        reply = st.session_state.chat_history[-1]
+        log_event("chat", session=session_id(st.session_state), intent=intent, question=question,
+                  results=len(reply["content"].get("courses", [])) if reply["msg_type"] == "course_results" else None,
+                  latency_ms=round((time.perf_counter() - started) * 1000, 1))
+        st.rerun(scope="fragment")
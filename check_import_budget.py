@@ -0,0 +1,72 @@
+"""
+check_import_budget.py — Startup import-time budget for the explorer
+Imports everything app.py imports at module level (in a fresh interpreter
+with -X importtime) and fails if the total exceeds the budget or if a module
+that must stay lazy — the chatbot / Groq stack — is pulled in at startup.
+Run:  python check_import_budget.py
+"""
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+import config
+
+APP_FILE = Path(__file__).with_name("app.py")
+
+
+def top_level_imports(path: Path) -> list[str]:
+    """Module names imported at the top level of `path` (not inside if/def blocks)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules: list[str]) -> tuple[float, set[str]]:
+    """Return (total cumulative ms, every module name loaded) for importing `modules`."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_FILE.parent, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.strip().splitlines()[-1])
+
+    total_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        loaded.add(name.strip())
+        if not name[1:].startswith(" "):  # top-level entry: its time includes children
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+
+def main() -> int:
+    modules = top_level_imports(APP_FILE)
+    total_ms, loaded = measure(modules)
+    eager = sorted(m for m in config.STARTUP_LAZY_MODULES if m in loaded)
+
+    print(f"Top-level imports: {', '.join(modules)}")
+    print(f"Import time: {total_ms:.0f} ms (budget {config.STARTUP_IMPORT_BUDGET_MS} ms)")
+    ok = True
+    if total_ms > config.STARTUP_IMPORT_BUDGET_MS:
+        print("❌ Startup imports exceed the budget")
+        ok = False
+    if eager:
+        print(f"❌ Lazy modules loaded at startup: {', '.join(eager)}")
+        ok = False
+    if ok:
+        print("✅ Startup import budget OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,83 @@ APP_SUBTITLE = "Curated resources aligned to program competencies · For TA-assi
 
 DATA_FILE = "Online_curation.csv"
 
+# Sources at least this large are ingested in chunks (see ingest.py) into a
+# Parquet snapshot stored next to the source, instead of one read_csv
+INGEST_STREAM_MIN_MB = 64
+INGEST_CHUNK_ROWS = 50_000
+INGEST_SNAPSHOT_DIR = ".snapshots"
+
+# Per-row normalization (descriptions, durations, dates, skill tags) runs on a
+# process pool for frames of at least this many rows; workers None = CPU count
+NORMALIZE_PARALLEL_MIN_ROWS = 20_000
+NORMALIZE_WORKERS = None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STORAGE BACKEND (storage.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Where filtering, search, sorting and the stats aggregates run:
+# "pandas" (in memory), "sqlite" (FTS5 full-text index) or "duckdb" (needs
+# the duckdb package). SQL databases are built per catalogue version in
+# INGEST_SNAPSHOT_DIR.
+STORAGE_BACKEND = "pandas"
+
+# Courses rendered per page of results ("Load more" fetches the next page)
+RESULTS_PAGE_SIZE = 48
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HOT RELOAD (catalogue_watcher.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Poll the catalogue sources and tutors.csv every WATCH_INTERVAL_SECONDS; a
+# changed file is rebuilt once it has been stable for one interval
+WATCH_ENABLED = True
+WATCH_INTERVAL_SECONDS = 5.0
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SHARED CATALOGUE (shared_catalogue.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Server processes on one host share one memory-mapped copy of the catalogue
+# and its index arrays (needs pyarrow); the first process to load a version
+# publishes it under INGEST_SNAPSHOT_DIR/shared
+SHARED_CATALOGUE = True
+
+# Published versions kept on disk (oldest are removed first)
+SHARED_KEEP_VERSIONS = 3
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CATALOGUE FEDERATION (federation.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Sources merged into one catalogue, highest priority first. Optional keys:
+# "columns" maps source headers onto curation headers, "platform" fills a
+# missing host. Empty = load DATA_FILE only.
+FEDERATION_SOURCES = [
+    {"name": "curation",  "path": "Online_curation.csv"},
+    {"name": "backup",    "path": "Online_curation_backup.csv"},
+    {"name": "linkedin",  "path": "LinkedIn - LinkedIn Learning.csv", "platform": "LinkedIn Learning"},
+]
+
+# MinHash/LSH near-duplicate detection: 128 permutations in 32 bands of 4
+# rows puts the candidate threshold near 0.4; candidates are confirmed at
+# FEDERATION_DUP_THRESHOLD estimated Jaccard (or an identical URL)
+FEDERATION_NUM_PERM = 128
+FEDERATION_LSH_BANDS = 32
+FEDERATION_DUP_THRESHOLD = 0.6
+FEDERATION_OUTCOME_WORDS = 60
+FEDERATION_MAX_BUCKET = 200
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STARTUP BUDGET (checked by check_import_budget.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Maximum cumulative import time of app.py's top-level imports (milliseconds)
+STARTUP_IMPORT_BUDGET_MS = 2500
+
+# Modules that must only load on demand (e.g. when the assistant is opened)
+STARTUP_LAZY_MODULES = ["chatbot", "llm_client", "groq"]
+
 # ─────────────────────────────────────────────────────────────────────────────
 # UI SETTINGS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -87,6 +164,12 @@ EXPORT_COLUMNS = [
     "journey_stage"
 ]
 
+# Rows written per chunk while streaming an export to disk
+EXPORT_CHUNK_ROWS = 500
+
+# Finished export files kept on disk (oldest are removed first)
+EXPORT_CACHE_MAX_FILES = 64
+
 # ─────────────────────────────────────────────────────────────────────────────
 # FEATURE FLAGS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -123,5 +206,175 @@ SORT_OPTIONS = [
     "Duration (Low to High)",
     "Duration (High to Low)",
     "Title (A-Z)",
-    "Title (Z-A)"
+    "Title (Z-A)",
+    "Recently updated"
 ]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TUTOR MATCHING
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Minimum focus-area ↔ expertise-tag similarity (0–1) for a tutor to be listed
+TUTOR_MATCH_THRESHOLD = 0.5
+
+# Students per tutor for bulk assignment when tutors.csv has no capacity column
+TUTOR_DEFAULT_CAPACITY = 15
+
+# Bulk assignment links each request group to its best-matching tutors only:
+# at least this many, and enough to hold twice the group (preferred tutors always)
+TUTOR_ASSIGN_CANDIDATES = 20
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SIMILAR COURSES (similar_courses.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Neighbours stored per course, and shown in a card's "Similar courses" list
+SIMILAR_K = 10
+SIMILAR_SHOWN = 5
+
+# Vocabulary cap and weight of facet overlap vs. text cosine (0–1)
+SIMILAR_MAX_FEATURES = 20000
+SIMILAR_FACET_WEIGHT = 0.2
+
+# Share of changed courses above which the graph is rebuilt from scratch
+# (vocabulary and IDF refit) instead of updated incrementally
+SIMILAR_REBUILD_FRACTION = 0.25
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LEARNING PATHS (learning_path.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Defaults when a request doesn't say how much time there is
+PATH_DEFAULT_WEEKLY_HOURS = 5
+PATH_DEFAULT_WEEKS = 8
+
+# Hours assumed for courses whose length could not be parsed
+PATH_UNKNOWN_HOURS = 5.0
+
+# Relevant courses considered per plan, Beginner foundations per course, and
+# a foundation's value relative to the course that needs it
+PATH_CANDIDATES = 12
+PATH_FOUNDATIONS_PER_COURSE = 1
+PATH_FOUNDATION_VALUE = 0.5
+
+# Plans kept per catalogue (LRU)
+PATH_CACHE_ENTRIES = 256
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESULT CACHE (shared by all sessions in the process)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Filtered selections kept (LRU) — whichever bound is hit first evicts
+RESULT_CACHE_MAX_ENTRIES = 512
+RESULT_CACHE_MAX_MB = 16
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ANALYTICS EVENT LOG (event_log.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Searches, opened course details, chat turns and LLM latencies are queued in
+# memory and written in batches by a background thread
+EVENTS_ENABLED = True
+EVENTS_DIR = "logs"
+EVENTS_SINK = "jsonl"          # "jsonl" or "sqlite"
+EVENTS_FLUSH_SECONDS = 2.0
+EVENTS_BATCH_SIZE = 500
+
+# Events waiting beyond this are dropped (and counted) rather than blocking
+EVENTS_QUEUE_MAX = 100_000
+
+# JSONL files rotate at this size; older files beyond the newest N are removed
+EVENTS_ROTATE_MB = 50
+EVENTS_KEEP_FILES = 30
+
+# log_analyzer.py: rows per top list, heavy-hitter counters kept, t-digest
+# compression (higher = more accurate percentiles) and HyperLogLog precision
+# (2**p registers, ~1.04/sqrt(2**p) relative error)
+ANALYZER_TOP_K = 20
+ANALYZER_HEAVY_HITTERS = 1000
+ANALYZER_TDIGEST_COMPRESSION = 100
+ANALYZER_HLL_PRECISION = 12
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BATCH RECOMMENDATIONS (batch_recommend.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Worker processes (None = CPU count) and roster rows per task
+BATCH_WORKERS = None
+BATCH_CHUNK_SIZE = 50
+
+# Courses written per student; with --llm-rerank the LLM orders a shortlist
+# of BATCH_TOP_K × BATCH_RERANK_POOL_FACTOR local candidates
+BATCH_TOP_K = 5
+BATCH_RERANK_POOL_FACTOR = 3
+BATCH_RERANK_THREADS = 8
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP API (api.py)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# uvicorn worker processes and, per process, threads running handlers
+API_PROCESSES = 2
+API_WORKER_THREADS = 8
+
+# Page size for /search (default and hard cap)
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 200
+
+# Cache-Control max-age (seconds); clients revalidate with If-None-Match
+API_CACHE_MAX_AGE = 60
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LLM SETTINGS (Course Assistant)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Large model: default for unlisted stages and the escalation target when a
+# smaller stage model returns output that fails validation.
+LLM_MODEL = "llama-3.3-70b-versatile"
+
+# Per-stage models — short, structured stages run on a small fast model
+LLM_STAGE_MODELS = {
+    "router":   "llama-3.1-8b-instant",
+    "keywords": "llama-3.1-8b-instant",
+    "general":  "llama-3.3-70b-versatile",
+    "ranking":  "llama-3.3-70b-versatile",
+    "rerank":   "llama-3.1-8b-instant",
+}
+
+# Total latency budget per pipeline stage (seconds), retries included.
+# When a stage runs out of budget the assistant falls back to local logic.
+LLM_STAGE_BUDGETS = {
+    "router":   3.0,
+    "keywords": 4.0,
+    "general":  15.0,
+    "ranking":  20.0,
+    "rerank":   30.0,   # batch jobs: long budget, waits behind interactive traffic
+}
+LLM_DEFAULT_BUDGET = 10.0
+
+# Retries on 429 / 5xx / connection errors (full-jitter exponential backoff)
+LLM_MAX_RETRIES = 2
+LLM_BACKOFF_BASE = 0.25
+LLM_BACKOFF_CAP = 2.0
+
+# Circuit breaker: open after N consecutive failures, probe again after cooldown
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_COOLDOWN = 30.0
+
+# Provider rate limits shared by every session in the process. Callers queue by
+# priority (interactive > routing > background) behind request/token buckets.
+LLM_RATE_LIMIT_RPM = 30
+LLM_RATE_LIMIT_TPM = 12000
+LLM_RATE_LIMIT_BURST_SECONDS = 10
+LLM_STAGE_PRIORITIES = {
+    "general":  "interactive",
+    "ranking":  "interactive",
+    "router":   "routing",
+    "keywords": "routing",
+    "rerank":   "background",
+}
+
+# Pooled keep-alive HTTP connections shared by every session in the process
+LLM_POOL_MAX_CONNECTIONS = 20
+LLM_POOL_MAX_KEEPALIVE = 10
+LLM_POOL_KEEPALIVE_EXPIRY = 30.0
@@ -0,0 +1,180 @@
+"""
+event_log.py — Non-blocking analytics event log
+Records what students do: search queries with their facet selections and
+result counts, opened course details, chat turns with their intent, and LLM
+call latencies per stage. A request thread only appends a dict to an
+in-memory deque (append/popleft are atomic, so there is no lock). A daemon
+thread drains the deque every EVENTS_FLUSH_SECONDS, or sooner once
+EVENTS_BATCH_SIZE events are waiting, and writes them in one batch to:
+
+  • "jsonl"  — logs/events-YYYYMMDD.jsonl, rotated at EVENTS_ROTATE_MB
+               (events-YYYYMMDD-1.jsonl, -2, …), newest EVENTS_KEEP_FILES kept
+  • "sqlite" — logs/events.sqlite, table events(ts, type, session, data)
+
+If the queue is full (EVENTS_QUEUE_MAX) new events are counted as dropped
+instead of waiting, and write errors are reported, never raised: logging
+never adds latency to a rerun or breaks one.
+
+Usage:
+    from event_log import log_event, session_id
+    log_event("search", session=session_id(st.session_state), query="python", results=12, latency_ms=3.1)
+
+    python event_log.py             # queue/flush counters and the files written
+"""
+
+import atexit
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+import config
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SINKS (called under EventLog's flush lock)
+# ─────────────────────────────────────────────────────────────────────────────
+class _JsonlSink:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self) -> str:
+        day = datetime.now().strftime("%Y%m%d")
+        path = os.path.join(self.directory, f"events-{day}.jsonl")
+        if os.path.exists(path) and os.path.getsize(path) >= config.EVENTS_ROTATE_MB * 1024 * 1024:
+            n = 1
+            while os.path.exists(os.path.join(self.directory, f"events-{day}-{n}.jsonl")):
+                n += 1
+            os.replace(path, os.path.join(self.directory, f"events-{day}-{n}.jsonl"))
+            self._prune()
+        return path
+
+    def _prune(self):
+        files = sorted(glob.glob(os.path.join(self.directory, "events-*.jsonl")), key=os.path.getmtime)
+        for old in files[:-config.EVENTS_KEEP_FILES]:
+            os.remove(old)
+
+    def write(self, batch: list[dict]):
+        os.makedirs(self.directory, exist_ok=True)
+        lines = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in batch)
+        with open(self._path(), "a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+class _SQLiteSink:
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, "events.sqlite")
+        self._con = None
+
+    def write(self, batch: list[dict]):
+        if self._con is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._con = sqlite3.connect(self.path, check_same_thread=False)
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute("CREATE TABLE IF NOT EXISTS events (ts REAL, type TEXT, session TEXT, data TEXT)")
+            self._con.execute("CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (type, ts)")
+        rows = [(e["ts"], e["type"], e.get("session"), json.dumps(e, ensure_ascii=False, default=str))
+                for e in batch]
+        with self._con:
+            self._con.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", rows)
+
+
+_SINKS = {"jsonl": _JsonlSink, "sqlite": _SQLiteSink}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EVENT LOG
+# ─────────────────────────────────────────────────────────────────────────────
+class EventLog:
+    """Process-wide event queue plus its background flusher (started on first event)."""
+
+    def __init__(self, directory: str = config.EVENTS_DIR, sink: str = config.EVENTS_SINK):
+        self.sink = _SINKS[sink](directory)
+        self._queue: deque = deque()
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # flusher thread vs. explicit/at-exit flushes
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def log(self, kind: str, **fields):
+        if len(self._queue) >= config.EVENTS_QUEUE_MAX:
+            self.dropped += 1
+            return
+        self._queue.append({"ts": round(time.time(), 3), "type": kind, **fields})
+        if self._thread is None:
+            self._start()
+        elif len(self._queue) >= config.EVENTS_BATCH_SIZE:
+            self._wake.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                atexit.register(self.flush)
+                self._thread = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(config.EVENTS_FLUSH_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything queued so far (flusher thread, or at exit)."""
+        with self._flush_lock:
+            while self._queue:
+                batch = []
+                while len(batch) < config.EVENTS_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.popleft())
+                    except IndexError:
+                        break
+                try:
+                    self.sink.write(batch)
+                    self.written += len(batch)
+                except (OSError, sqlite3.Error) as exc:
+                    self.errors += 1
+                    print(f"⚠️ Event log: dropped {len(batch)} events ({exc})")
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queue), "written": self.written, "dropped": self.dropped,
+                "errors": self.errors}
+
+
+_event_log: EventLog | None = None
+
+
+def get_event_log() -> EventLog:
+    global _event_log
+    if _event_log is None:
+        _event_log = EventLog()
+    return _event_log
+
+
+def session_id(state) -> str:
+    """Anonymous id tying one browser session's events together, kept in `state`
+    (st.session_state) and created by whichever page asks first."""
+    if "session_id" not in state:
+        state["session_id"] = uuid.uuid4().hex[:12]
+    return state["session_id"]
+
+
+def log_event(kind: str, **fields):
+    """Queue one event; returns immediately. No-op when EVENTS_ENABLED is off."""
+    if config.EVENTS_ENABLED:
+        get_event_log().log(kind, **fields)
+
+
+if __name__ == "__main__":
+    log = get_event_log()
+    log.log("ping", source="event_log.py")
+    log.flush()
+    print(f"✅ {log.stats()} → {os.path.abspath(config.EVENTS_DIR)}")
@@ -0,0 +1,152 @@
+"""
+exporter.py — On-demand course exports for Course Explorer
+Exports are only built when someone asks for one. Rows are written to disk
+in chunks (bounded memory) and the finished file is kept per filter-state
+hash and format, so repeat downloads of the same selection are served from
+the artifact instead of being rebuilt.
+
+Parquet needs pyarrow and XLSX needs openpyxl; both are optional and their
+formats are simply not offered when the package is missing.
+
+Usage:
+    from exporter import available_formats, build_export
+    path = build_export(df, ids, selection_hash, "CSV (gzip)")
+"""
+
+import gzip
+import importlib.util
+import os
+import tempfile
+import threading
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Format label → (file extension, MIME type, optional dependency)
+EXPORT_FORMATS = {
+    "CSV":          (".csv",     "text/csv",             None),
+    "CSV (gzip)":   (".csv.gz",  "application/gzip",     None),
+    "Parquet":      (".parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "Excel (XLSX)": (".xlsx",    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "JSON Lines":   (".jsonl",   "application/x-ndjson", None),
+}
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "course_explorer_exports")
+_lock = threading.Lock()
+
+
+def available_formats() -> list[str]:
+    """Formats whose optional dependency is installed (checked without importing it)."""
+    return [label for label, (_, _, dep) in EXPORT_FORMATS.items()
+            if dep is None or importlib.util.find_spec(dep) is not None]
+
+
+def _chunks(df: pd.DataFrame, ids: np.ndarray, columns: list[str]) -> Iterator[pd.DataFrame]:
+    step = config.EXPORT_CHUNK_ROWS
+    for start in range(0, len(ids), step):
+        yield df.loc[ids[start:start + step], columns]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WRITERS — each streams chunks into `path`
+# ─────────────────────────────────────────────────────────────────────────────
+def _write_csv(chunks, columns, path, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8", newline="") as fh:
+        pd.DataFrame(columns=columns).to_csv(fh, index=False)
+        for chunk in chunks:
+            chunk.to_csv(fh, index=False, header=False)
+
+
+def _write_jsonl(chunks, columns, path):
+    with open(path, "w", encoding="utf-8") as fh:
+        for chunk in chunks:
+            # lines=True already ends every record, the chunk's last one included, with "\n"
+            fh.write(chunk.to_json(orient="records", lines=True, force_ascii=False))
+
+
+def _write_parquet(chunks, columns, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.float64() if c == "duration_hours" else pa.string()) for c in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_xlsx(chunks, columns, path):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)  # rows are flushed as they are appended
+    ws = wb.create_sheet("Courses")
+    ws.append(columns)
+    for chunk in chunks:
+        for row in chunk.itertuples(index=False):
+            ws.append([None if pd.isna(v) else v for v in row])
+    wb.save(path)
+
+
+def _write(fmt: str, chunks, columns: list[str], path: str):
+    if fmt == "CSV":
+        _write_csv(chunks, columns, path)
+    elif fmt == "CSV (gzip)":
+        _write_csv(chunks, columns, path, compress=True)
+    elif fmt == "Parquet":
+        _write_parquet(chunks, columns, path)
+    elif fmt == "Excel (XLSX)":
+        _write_xlsx(chunks, columns, path)
+    elif fmt == "JSON Lines":
+        _write_jsonl(chunks, columns, path)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ARTIFACT CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+def _prune():
+    """Keep only the newest EXPORT_CACHE_MAX_FILES artifacts."""
+    files = [os.path.join(EXPORT_DIR, f) for f in os.listdir(EXPORT_DIR) if not f.endswith(".part")]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for stale in files[config.EXPORT_CACHE_MAX_FILES:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def build_export(df: pd.DataFrame, ids: np.ndarray, selection_hash: str, fmt: str) -> str:
+    """Path of the export artifact for a selection, building it on first request."""
+    ext, _, _ = EXPORT_FORMATS[fmt]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"{selection_hash}{ext}")
+    if os.path.exists(path):
+        os.utime(path)  # mark as recently used for pruning
+        return path
+
+    columns = [c for c in config.EXPORT_COLUMNS if c in df.columns]
+    # Write under a unique name and rename atomically, so concurrent sessions
+    # never serve a half-written file.
+    fd, part = tempfile.mkstemp(suffix=".part", dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        _write(fmt, _chunks(df, ids, columns), columns, part)
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+    with _lock:
+        _prune()
+    return path
+
+
+def export_mime(fmt: str) -> str:
+    return EXPORT_FORMATS[fmt][1]
+
+
+def export_extension(fmt: str) -> str:
+    return EXPORT_FORMATS[fmt][0]
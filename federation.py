@@ -0,0 +1,265 @@
+"""
+federation.py — Multi-source catalogue federation with near-duplicate detection
+Merges several provider exports into one catalogue. Each source's headers are
+mapped onto the curation schema (catalogue.RAW_COLS), and the same course
+listed by different sources — often with slightly different titles or URLs —
+is folded into a single record.
+
+Near-duplicates are found with MinHash signatures over title + learning
+outcome shingles and banded LSH, so candidate pairs come from hash-bucket
+collisions (roughly linear in the number of courses) instead of a pairwise
+comparison; rows sharing a normalized URL are candidates as well.
+Candidates are confirmed on estimated Jaccard similarity or a matching URL.
+A row linked directly to a row of a higher-priority source folds into it
+(never through a chain of links); blanks are filled from the rows folded
+in, and every contributing row is recorded in the `sources` column.
+
+Usage:
+    from federation import load_federated
+    df = load_federated(config.FEDERATION_SOURCES)
+
+    python federation.py            # merge report for config.FEDERATION_SOURCES
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import HIERARCHY_COLS, RAW_COLS, file_version, normalize_catalogue
+
+# Header variants seen in provider exports → curation column
+COLUMN_ALIASES = {
+    "title":               "Resource title",
+    "course title":        "Resource title",
+    "course name":         "Resource title",
+    "name":                "Resource title",
+    "url":                 "URL",
+    "link":                "URL",
+    "course url":          "URL",
+    "platform":            "Platform / host",
+    "provider":            "Platform / host",
+    "host":                "Platform / host",
+    "type":                "Resource type",
+    "description":         "Stated learning outcomes",
+    "learning outcomes":   "Stated learning outcomes",
+    "prerequisites":       "Stated prerequisites",
+    "duration":            "Length (mins)",
+    "length":              "Length (mins)",
+    "level":               "Indicated level",
+    "difficulty":          "Indicated level",
+    "audience":            "Intended audience",
+    "format":              "Format type (passive / interactive)",
+    "published":           "Publication date",
+    "release date":        "Publication date",
+    "updated":             "Last updated",
+    "skills":              "Skill area",
+    "domain":              "Competency domain",
+    "focus area":          "Focus Areas",
+    "journey stage":       "Student journey stage",
+}
+
+_P = (1 << 31) - 1  # Mersenne prime for the MinHash permutations
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SOURCES
+# ─────────────────────────────────────────────────────────────────────────────
+def read_source(source: dict) -> pd.DataFrame:
+    """One source as raw curation columns, hierarchy filled, untitled rows dropped.
+
+    `source` is {"name", "path"[, "columns": {source header: curation header}][, "platform"]}.
+    """
+    raw = pd.read_csv(source["path"], dtype=str)
+    known = {c.lower(): c for c in RAW_COLS}
+    rename = {}
+    for col in raw.columns:
+        key = col.strip().lower()
+        target = source.get("columns", {}).get(col) or known.get(key) or COLUMN_ALIASES.get(key)
+        if target:
+            rename[col] = target
+    raw = raw.rename(columns=rename)
+    for col in RAW_COLS:
+        if col not in raw.columns:
+            raw[col] = pd.NA
+    if source.get("platform"):
+        raw["Platform / host"] = raw["Platform / host"].fillna(source["platform"])
+
+    # Fill the hierarchy per source so it never leaks across source boundaries
+    for col in HIERARCHY_COLS:
+        raw[col] = raw[col].replace("", pd.NA).ffill()
+    raw["_source"] = source["name"]
+    raw["_source_row"] = raw.index
+    titled = raw["Resource title"].fillna("").str.strip() != ""
+    return raw[titled].reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MINHASH / LSH
+# ─────────────────────────────────────────────────────────────────────────────
+def _shingles(title: str, outcomes: str) -> set[str]:
+    """Character 5-grams of the title plus word bigrams of the outcomes."""
+    title = re.sub(r"[^a-z0-9 ]+", " ", str(title).lower())
+    title = " ".join(title.split())
+    grams = {title[i:i + 5] for i in range(max(1, len(title) - 4))}
+    words = re.findall(r"[a-z0-9]+", str(outcomes).lower())[:config.FEDERATION_OUTCOME_WORDS]
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+
+def minhash_signatures(docs: list[set[str]], num_perm: int = config.FEDERATION_NUM_PERM,
+                       seed: int = 1) -> np.ndarray:
+    """(len(docs), num_perm) MinHash signature matrix."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _P, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, _P, size=(num_perm, 1), dtype=np.uint64)
+    sigs = np.full((len(docs), num_perm), _P, dtype=np.uint64)
+    for i, doc in enumerate(docs):
+        if not doc:
+            continue
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) % _P for s in doc), dtype=np.uint64, count=len(doc))
+        sigs[i] = ((a * x + b) % _P).min(axis=1)
+    return sigs
+
+
+def lsh_candidates(sigs: np.ndarray, bands: int = config.FEDERATION_LSH_BANDS) -> set[tuple[int, int]]:
+    """Index pairs that share at least one band bucket."""
+    rows = sigs.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = sigs[:, band * rows:(band + 1) * rows]
+        for i, key in enumerate(map(bytes, block)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if 1 < len(members) <= config.FEDERATION_MAX_BUCKET:
+                pairs.update((p, q) for j, p in enumerate(members) for q in members[j + 1:])
+    return pairs
+
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|u|trk|ref|src|source)$")
+
+
+def _url_key(url) -> str:
+    """Scheme-, www- and tracking-parameter-free URL (ids in the query are kept)."""
+    if pd.isna(url) or not str(url).strip():
+        return ""
+    parts = urlsplit(str(url).strip().lower())
+    host = parts.netloc.removeprefix("www.")
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k))
+    key = f"{host}{parts.path.rstrip('/')}"
+    return f"{key}?{urlencode(query)}" if query else key
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FEDERATION
+# ─────────────────────────────────────────────────────────────────────────────
+def federate(frames: list[pd.DataFrame]) -> tuple[pd.DataFrame, dict]:
+    """Merge source frames (highest priority first) into one raw curation frame.
+
+    Returns the merged frame — RAW_COLS plus `sources` provenance — and a
+    report with the candidate, duplicate and output counts.
+    """
+    allrows = pd.concat(frames, ignore_index=True)
+    rank = allrows["_source"].map({f["_source"].iloc[0]: r for r, f in enumerate(frames) if len(f)})
+    rank = rank.to_numpy()
+
+    docs = [_shingles(t, o) for t, o in zip(allrows["Resource title"],
+                                            allrows["Stated learning outcomes"].fillna(""))]
+    sigs = minhash_signatures(docs)
+    candidates = lsh_candidates(sigs)
+
+    # Identical course URLs are candidates too, whatever the text says
+    urls = allrows["URL"].map(_url_key).to_numpy()
+    by_url = defaultdict(list)
+    for i, key in enumerate(urls):
+        if "/" in key:
+            by_url[key].append(i)
+    for members in by_url.values():
+        if 1 < len(members) <= config.FEDERATION_MAX_BUCKET:
+            candidates.update((p, q) for j, p in enumerate(members) for q in members[j + 1:])
+
+    def similarity(i: int, j: int) -> float:
+        """Link strength: estimated Jaccard, above every text match for the same URL."""
+        return float((sigs[i] == sigs[j]).mean()) + (1.0 if urls[i] and urls[i] == urls[j] else 0.0)
+
+    # Only cross-source pairs are folded: one source may list a course under
+    # several focus areas on purpose.
+    links = defaultdict(dict)
+    for i, j in candidates:
+        if rank[i] == rank[j]:
+            continue
+        score = similarity(i, j)
+        if score >= config.FEDERATION_DUP_THRESHOLD:
+            links[i][j] = links[j][i] = score
+    duplicates = sum(len(v) for v in links.values()) // 2
+
+    # Rows in priority order: a row linked directly to an already kept (primary)
+    # row of a higher-priority source folds into the one it matches best, and into
+    # other primaries only if those are linked to that one too. Links are never
+    # followed transitively, so two different courses cannot chain together
+    # through a third source's rows.
+    attached = defaultdict(list)            # primary → rows folded into it
+    keep = []
+    for m in sorted(range(len(allrows)), key=lambda m: (rank[m], m)):
+        linked = sorted(((score, p) for p, score in links[m].items() if p in attached and rank[p] < rank[m]),
+                        key=lambda item: (-item[0], rank[item[1]], item[1]))
+        if not linked:
+            attached[m] = []
+            keep.append(m)
+            continue
+        best = linked[0][1]
+        for _, p in linked:
+            if p == best or similarity(p, best) >= config.FEDERATION_DUP_THRESHOLD:
+                attached[p].append(m)
+
+    records = allrows[list(RAW_COLS)].to_dict(orient="records")
+    provenance = [f"{s}:{r}" for s, r in zip(allrows["_source"], allrows["_source_row"])]
+    merged_sources = []
+    for p in keep:
+        others = attached[p]               # already in priority order
+        for m in others:
+            for col, value in records[m].items():
+                if pd.isna(records[p][col]) or not str(records[p][col]).strip():
+                    records[p][col] = value
+        merged_sources.append("; ".join(provenance[m] for m in [p, *others]))
+
+    order = np.argsort(keep, kind="stable")
+    merged = pd.DataFrame([records[keep[k]] for k in order], columns=list(RAW_COLS))
+    merged["sources"] = [merged_sources[k] for k in order]
+    report = {
+        "input_rows": len(allrows),
+        "candidate_pairs": len(candidates),
+        "duplicate_links": duplicates,
+        "output_rows": len(merged),
+        "merged_records": int((merged["sources"].str.count(";") > 0).sum()),
+    }
+    return merged, report
+
+
+def federated_version(sources: list[dict] = config.FEDERATION_SOURCES) -> str:
+    """Version of the federated catalogue: a hash over every source's content."""
+    combined = "|".join(f"{s['name']}={file_version(s['path'])}" for s in sources)
+    return hashlib.sha1(combined.encode("utf-8")).hexdigest()[:12]
+
+
+def load_federated(sources: list[dict] = config.FEDERATION_SOURCES) -> pd.DataFrame:
+    """Federated, normalized catalogue; `df.attrs["version"]` hashes every source."""
+    merged, report = federate([read_source(s) for s in sources])
+    df = normalize_catalogue(merged)
+    df.attrs["version"] = federated_version(sources)
+    df.attrs["federation"] = report
+    return df
+
+
+if __name__ == "__main__":
+    df = load_federated()
+    report = df.attrs["federation"]
+    print(f"✅ {report['input_rows']} rows from {len(config.FEDERATION_SOURCES)} sources → "
+          f"{report['output_rows']} courses ({report['merged_records']} merged across sources, "
+          f"{report['candidate_pairs']} candidate pairs)")
@@ -0,0 +1,167 @@
+"""
+ingest.py — Chunked, bounded-memory catalogue ingestion
+Large merged catalogues are read in fixed-size chunks instead of one
+`read_csv` followed by several whole-frame passes. The forward-fill state of
+the hierarchical columns (domain, focus area) is carried across chunk
+boundaries, each chunk is normalized on its own, and the result is appended
+as a row group to a Parquet snapshot — so peak memory during ingestion is a
+few chunks, however large the source.
+
+Snapshots are keyed by the source file hash and reused while the source is
+unchanged. Parquet needs pyarrow; without it the normalized chunks are
+concatenated in memory instead (still a single streaming pass).
+
+Usage:
+    from ingest import ingest_catalogue
+    df = ingest_catalogue("merged_catalogue.csv")
+
+    python ingest.py merged_catalogue.csv --chunk-rows 100000
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import pandas as pd
+
+import config
+from catalogue import HIERARCHY_COLS, file_version, normalize_catalogue, normalize_workers
+
+
+def iter_normalized_chunks(path: str, chunk_rows: int = config.INGEST_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Normalized catalogue chunks with ids continuing across chunks.
+
+    One process pool, started with the first chunk large enough to use it,
+    normalizes every chunk; it is shut down when the iteration ends.
+    """
+    carry = {col: None for col in HIERARCHY_COLS}
+    next_id = 0
+    workers = normalize_workers()
+    pool = None
+    try:
+        for raw in pd.read_csv(path, dtype=str, chunksize=chunk_rows):
+            # Seed the first row from the previous chunk so the ffill continues
+            for col in HIERARCHY_COLS:
+                values = raw[col].replace("", pd.NA)
+                if carry[col] is not None and pd.isna(values.iloc[0]):
+                    values.iloc[0] = carry[col]
+                raw[col] = values.ffill()
+                last = raw[col].iloc[-1]
+                carry[col] = None if pd.isna(last) else last
+
+            if pool is None and workers > 1 and len(raw) >= config.NORMALIZE_PARALLEL_MIN_ROWS:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            df = normalize_catalogue(raw, workers, pool)
+            df.index += next_id
+            df["id"] = df.index
+            next_id += len(df)
+            if len(df):
+                yield df
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def snapshot_path(path: str, version: str) -> str:
+    snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(path)), config.INGEST_SNAPSHOT_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(snapshot_dir, f"{stem}-{version}.parquet")
+
+
+def _arrow_schema(df: pd.DataFrame):
+    """Fixed schema so sparse chunks (all-null columns) match the first one."""
+    import pyarrow as pa
+
+    special = {
+        "id":             pa.int64(),
+        "duration_hours": pa.float64(),
+        "updated_at":     pa.timestamp("ns"),
+        "skill_tags":     pa.list_(pa.string()),
+    }
+    return pa.schema([(col, special.get(col, pa.string())) for col in df.columns])
+
+
+def write_snapshot(path: str, out_path: str, version: str,
+                   chunk_rows: int = config.INGEST_CHUNK_ROWS) -> int:
+    """Stream `path` into a Parquet snapshot (one row group per chunk); returns rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    writer, rows = None, 0
+    try:
+        for chunk in iter_normalized_chunks(path, chunk_rows):
+            if writer is None:
+                schema = _arrow_schema(chunk).with_metadata({"catalogue_version": version})
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError(f"{path} has no catalogue rows")
+    os.replace(tmp_path, out_path)
+    return rows
+
+
+def read_snapshot(out_path: str) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(out_path)
+    df = table.to_pandas()
+    # Arrow hands lists back as arrays; the rest of the app expects lists
+    df["skill_tags"] = [list(tags) if tags is not None else [] for tags in df["skill_tags"]]
+    df.attrs["version"] = table.schema.metadata[b"catalogue_version"].decode()
+    return df
+
+
+def ingest_catalogue(path: str, chunk_rows: int = config.INGEST_CHUNK_ROWS) -> pd.DataFrame:
+    """Normalized catalogue built chunk-by-chunk; reuses a current snapshot if there is one."""
+    version = file_version(path)
+    if importlib.util.find_spec("pyarrow") is None:
+        df = pd.concat(list(iter_normalized_chunks(path, chunk_rows)))
+        df.attrs["version"] = version
+        return df
+
+    out_path = snapshot_path(path, version)
+    if not os.path.exists(out_path):
+        write_snapshot(path, out_path, version, chunk_rows)
+    return read_snapshot(out_path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def _peak_rss_mb() -> float | None:
+    """Peak resident memory of this process (Linux reports KiB); None where the
+    Unix-only resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a columnar snapshot of a catalogue CSV.")
+    parser.add_argument("source", nargs="?", default=config.DATA_FILE)
+    parser.add_argument("--chunk-rows", type=int, default=config.INGEST_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    version = file_version(args.source)
+    out_path = snapshot_path(args.source, version)
+    start = time.perf_counter()
+    rows = write_snapshot(args.source, out_path, version, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    peak_mb = _peak_rss_mb()
+    peak = f" (peak RSS {peak_mb:.0f} MB)" if peak_mb is not None else ""
+    print(f"✅ {rows:,} courses → {out_path} in {elapsed:.1f}s{peak}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+learning_path.py — Prerequisite-aware learning-path planner
+Turns "I want to learn X, I have N hours a week until <deadline>" into an
+ordered list of courses that fits the time budget.
+
+The planner extracts a DAG across the catalogue once:
+  • explicit edges — a course's stated prerequisites name another course's title
+    (these are hard: the prerequisite is planned whenever the course is);
+  • level edges — within a focus area, Beginner → Intermediate → Advanced;
+  • foundation edges — Beginner courses covering the topics a course's
+    prerequisites mention (added to the plan only when time allows).
+
+A plan scores courses by relevance to the target, bundles each with its hard
+prerequisites, picks bundles with a 0/1 knapsack over the hour budget and
+orders the result topologically (ties: lower level, then higher relevance).
+Plans are cached per (target, weekly hours, weeks).
+
+Usage:
+    from learning_path import LearningPathPlanner
+    planner = LearningPathPlanner(df)
+    path = planner.plan("machine learning", weekly_hours=5, weeks=8)
+    for step in path["steps"]:
+        print(step["week_start"], step["title"], step["hours"])
+"""
+
+import calendar
+import heapq
+import math
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import query_terms, relevance_scores, searchable_text
+
+LEVEL_RANK = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+# Prerequisite phrases that carry no topic ("Pre-course Self Assessment")
+_PREREQ_NOISE = {"pre", "course", "self", "assessment", "basic", "understanding", "knowledge", "experience",
+                 "familiarity", "background", "fundamentals", "helpful", "required", "none", "should",
+                 "already", "before", "completing", "having", "general", "common", "also", "well"}
+_MIN_TITLE_CHARS = 12  # shorter titles ("Lists", "Calculus") are too generic to match in free text
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9+#]+", str(text).lower()))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REQUEST PARSING (chatbot)
+# ─────────────────────────────────────────────────────────────────────────────
+_HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:h|hrs?|hours?)\s*(?:a|per|/|each|every)\s*week", re.IGNORECASE)
+_WEEKS_RE = re.compile(r"(\d+)\s*(weeks?|months?)", re.IGNORECASE)
+_MONTHS = {m: i + 1 for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun",
+                                            "jul", "aug", "sep", "oct", "nov", "dec"])}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+# "by December", "by Dec 15", "before 15 March 2027", "until 2026-12-01", "by 12/15"
+_DEADLINE_RE = re.compile(
+    rf"\b(?:by|before|until|till)\s+(?:the\s+)?(?P<end>end\s+of\s+)?(?:"
+    rf"(?P<day1>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month1>{_MONTH})|"
+    rf"(?P<month2>{_MONTH})(?:\s+(?P<day2>\d{{1,2}})(?:st|nd|rd|th)?)?|"
+    rf"(?P<iso>\d{{4}}-\d{{1,2}}-\d{{1,2}})|"
+    rf"(?P<md>\d{{1,2}}/\d{{1,2}}))(?:,?\s+(?P<year>\d{{4}}))?\b",
+    re.IGNORECASE)
+_REQUEST_NOISE = re.compile(
+    r"\b(learning path|study plan|roadmap|plan|path|to|learn|become|get into|i want|i have|i'd like|in|within|"
+    r"for|over|the next|next|by|a|an|and|me|my|with|can|could|would|you|please|make|create|build|give|"
+    r"suggest|show|need|hours?|hrs?|weeks?|months?|per|week|\d+(\.\d+)?)\b",
+    re.IGNORECASE)
+
+
+def is_path_request(text: str) -> bool:
+    return bool(re.search(r"\b(learning path|study plan|roadmap|plan my|path to)\b", text, re.IGNORECASE)
+                or _HOURS_RE.search(text))
+
+
+def _deadline(m: re.Match, today: date) -> date | None:
+    """Date named by a _DEADLINE_RE match. A month alone means its first day
+    ("end of December": its last); a date without a year that has already
+    passed means next year's."""
+    try:
+        if m.group("iso"):
+            return date.fromisoformat("-".join(f"{int(p):02d}" for p in m.group("iso").split("-")))
+        if m.group("md"):
+            month, day = (int(p) for p in m.group("md").split("/"))
+        else:
+            month = _MONTHS[(m.group("month1") or m.group("month2"))[:3].lower()]
+            day = int(m.group("day1") or m.group("day2") or 0)
+        year = int(m.group("year") or today.year)
+        if not day:
+            day = calendar.monthrange(year, month)[1] if m.group("end") else 1
+        deadline = date(year, month, day)
+        if not m.group("year") and deadline <= today:
+            deadline = date(year + 1, month, day)
+        return deadline
+    except ValueError:  # "by 31 February"
+        return None
+
+
+def parse_path_request(text: str, today: date | None = None) -> tuple[str, float, int]:
+    """(target, weekly hours, weeks) from free text; missing parts use config defaults.
+    Weeks come from "in 3 months" / "over 6 weeks" or a deadline ("by December")."""
+    today = today or date.today()
+    hours = _HOURS_RE.search(text)
+    weekly = float(hours.group(1)) if hours else config.PATH_DEFAULT_WEEKLY_HOURS
+    text = _HOURS_RE.sub(" ", text)
+    weeks = config.PATH_DEFAULT_WEEKS
+    for amount, unit in _WEEKS_RE.findall(text):
+        weeks = int(amount) * (1 if unit.lower().startswith("week") else 4)
+    deadline = _DEADLINE_RE.search(text)
+    if deadline:
+        until = _deadline(deadline, today)
+        if until is not None:
+            weeks = (until - today).days // 7  # as the explorer's deadline picker counts
+        text = text[:deadline.start()] + " " + text[deadline.end():]
+    target = " ".join(_REQUEST_NOISE.sub(" ", text).split()).strip(" ,.?!")
+    return target, weekly, max(1, weeks)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PLANNER
+# ─────────────────────────────────────────────────────────────────────────────
+class LearningPathPlanner:
+    """Prerequisite/level DAG over one catalogue plus a per-request plan cache."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.text = searchable_text(df)
+        self.level = np.array([LEVEL_RANK.get(str(v).strip().lower(), -1) for v in df["level"]])
+        hours = pd.to_numeric(df["duration_hours"], errors="coerce").to_numpy(dtype=float)
+        self.estimated = ~(hours > 0)
+        self.hours = np.where(self.estimated, config.PATH_UNKNOWN_HOURS, hours)
+        self.requires = self._explicit_edges()       # course → hard prerequisites
+        self.after = defaultdict(set)                # course → courses ordered before it
+        for course, prereqs in self.requires.items():
+            self.after[course] |= prereqs
+        self._level_edges()
+        self.prereq_terms = [[t for t in query_terms(p) if t not in _PREREQ_NOISE]
+                             for p in df["prerequisites"].fillna("")]
+        self.beginner_ids = np.flatnonzero(self.level == 0)
+        self.beginner = df.iloc[self.beginner_ids]
+        self.beginner_text = {col: text.iloc[self.beginner_ids] for col, text in self.text.items()}
+        self.title_key = [_normalize(t) for t in df["title"].fillna("")]
+        self._plans: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _explicit_edges(self) -> dict[int, set[int]]:
+        """Prerequisite texts that name another course's title."""
+        titles = {}
+        by_token = defaultdict(set)
+        for i, title in enumerate(self.df["title"].fillna("")):
+            norm = _normalize(title)
+            if len(norm) >= _MIN_TITLE_CHARS:
+                titles[i] = norm
+                by_token[norm.split()[0]].add(i)
+        edges = defaultdict(set)
+        for i, prereq in enumerate(self.df["prerequisites"].fillna("")):
+            text = _normalize(prereq)
+            if not text:
+                continue
+            padded = f" {text} "
+            for token in set(text.split()):
+                for j in by_token.get(token, ()):
+                    if j != i and f" {titles[j]} " in padded:
+                        edges[i].add(j)
+        return edges
+
+    def _level_edges(self):
+        """Within a focus area, every course at one level follows the level below."""
+        for _, group in self.df.groupby("focus_area").groups.items():
+            ranked = defaultdict(list)
+            for i in group:
+                if self.level[i] >= 0:
+                    ranked[self.level[i]].append(i)
+            levels = sorted(ranked)
+            for lower, upper in zip(levels, levels[1:]):
+                for course in ranked[upper]:
+                    self.after[course].update(ranked[lower])
+
+    def _closure(self, course: int) -> set[int]:
+        """The course plus all of its hard prerequisites (cycle-safe)."""
+        seen, stack = set(), [course]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self.requires.get(node, ()))
+        return seen
+
+    def _foundations(self, courses: set[int], exclude: set[int]) -> dict[int, int]:
+        """Beginner courses on the topics the chosen courses' prerequisites mention → dependant."""
+        found = {}
+        for course in courses:
+            terms = self.prereq_terms[course]
+            if not terms:
+                continue
+            scores = relevance_scores(self.beginner, terms, self.beginner_text)
+            for j in np.argsort(-scores, kind="stable")[:config.PATH_FOUNDATIONS_PER_COURSE]:
+                candidate = int(self.beginner_ids[j])
+                if scores[j] > 0 and candidate not in exclude and candidate not in found:
+                    found[candidate] = course
+        return found
+
+    @staticmethod
+    def _knapsack(items: list[tuple[frozenset, float, float]], budget: float) -> list[int]:
+        """0/1 knapsack on half-hour units; returns indices of chosen items."""
+        capacity = int(budget * 2)
+        best = np.zeros(capacity + 1)
+        take = np.zeros((len(items), capacity + 1), dtype=bool)
+        for n, (_, cost, value) in enumerate(items):
+            w = int(math.ceil(cost * 2))
+            if w > capacity:
+                continue
+            candidate = np.concatenate([np.full(w, -np.inf), best[:capacity + 1 - w] + value])
+            take[n] = candidate > best
+            best = np.maximum(best, candidate)
+        chosen, c = [], int(best.argmax())
+        for n in range(len(items) - 1, -1, -1):
+            if take[n, c]:
+                chosen.append(n)
+                c -= int(math.ceil(items[n][1] * 2))
+        return chosen[::-1]
+
+    def _order(self, chosen: set[int], value: dict[int, float], foundation_of: dict[int, int]) -> list[int]:
+        """Topological order of the chosen courses (Kahn; ties by level, relevance, id)."""
+        after = {c: set(self.after.get(c, ())) for c in chosen}
+        for foundation, dependant in foundation_of.items():
+            after[dependant].add(foundation)
+        indegree = {c: 0 for c in chosen}
+        children = defaultdict(list)
+        for c in chosen:
+            for p in after[c]:
+                if p in chosen and p != c:
+                    indegree[c] += 1
+                    children[p].append(c)
+        key = lambda c: (self.level[c] if self.level[c] >= 0 else 1, -value.get(c, 0), c)
+        heap = [(key(c), c) for c, d in indegree.items() if d == 0]
+        heapq.heapify(heap)
+        order = []
+        while heap:
+            _, c = heapq.heappop(heap)
+            order.append(c)
+            for child in children[c]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(heap, (key(child), child))
+        # Anything left sits on a cycle in noisy data — append in tie-break order
+        placed = set(order)
+        order += sorted((c for c in chosen if c not in placed), key=key)
+        return order
+
+    def plan(self, target: str, weekly_hours: float, weeks: int) -> dict:
+        """Ordered, budgeted path towards `target` (cached per request)."""
+        terms = query_terms(target)
+        key = (tuple(sorted(set(terms))), round(float(weekly_hours), 1), int(weeks))
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        path = self._plan(target, terms, float(weekly_hours), int(weeks))
+        with self._lock:
+            self._plans[key] = path
+            while len(self._plans) > config.PATH_CACHE_ENTRIES:
+                self._plans.popitem(last=False)
+        return path
+
+    def _plan(self, target: str, terms: list[str], weekly_hours: float, weeks: int) -> dict:
+        budget = max(weekly_hours, 0.0) * max(weeks, 0)
+        path = {"target": target, "weekly_hours": weekly_hours, "weeks": weeks, "budget_hours": budget,
+                "total_hours": 0.0, "steps": [], "left_out": []}
+        if not terms or budget <= 0:
+            return path
+
+        scores = relevance_scores(self.df, terms, self.text)
+        # One entry per title: the same course may be listed under several focus areas
+        ranked, titles = [], set()
+        for i in np.argsort(-scores, kind="stable"):
+            if scores[i] <= 0 or len(ranked) == config.PATH_CANDIDATES:
+                break
+            if self.title_key[i] not in titles:
+                titles.add(self.title_key[i])
+                ranked.append(int(i))
+        if not ranked:
+            return path
+        top = scores[ranked[0]]
+        value = {i: float(scores[i] / top) for i in ranked}
+
+        # Items: each relevant course with its hard prerequisites, then optional foundations
+        items = []
+        for course in ranked:
+            bundle = frozenset(self._closure(course))
+            items.append((bundle, float(self.hours[list(bundle)].sum()), value[course]))
+        foundations = self._foundations(set(ranked), set(ranked))
+        for course, dependant in foundations.items():
+            value[course] = config.PATH_FOUNDATION_VALUE * value[dependant]
+            items.append((frozenset({course}), float(self.hours[course]), value[course]))
+
+        chosen = set()
+        for n in self._knapsack(items, budget):
+            chosen |= items[n][0]
+        # A foundation only makes sense before the course that asked for it
+        chosen -= {c for c, dependant in foundations.items() if dependant not in chosen}
+        foundation_of = {c: d for c, d in foundations.items() if c in chosen}
+
+        order = self._order(chosen, value, foundation_of)
+        elapsed = 0.0
+        for course in order:
+            row = self.df.loc[course]
+            hours = float(self.hours[course])
+            start, elapsed = elapsed, elapsed + hours
+            requires = sorted(self.requires.get(course, set()) & chosen)
+            if course in foundation_of:
+                reason = f"foundation for {self.df.at[foundation_of[course], 'title']}"
+            elif course in ranked:
+                reason = "matches your goal"
+            else:
+                reason = "prerequisite"
+            path["steps"].append({
+                "id": int(course),
+                "title": str(row["title"]),
+                "level": str(row["level"] or ""),
+                "platform": str(row["platform"] or ""),
+                "lms_link": "".join(row["lms_link"].split()) if isinstance(row["lms_link"], str) else "",
+                "hours": round(hours, 1),
+                "estimated": bool(self.estimated[course]),
+                "week_start": int(start // weekly_hours) + 1,
+                "week_end": max(int(math.ceil(elapsed / weekly_hours)), int(start // weekly_hours) + 1),
+                "requires": [int(r) for r in requires],
+                "reason": reason,
+            })
+        path["total_hours"] = round(elapsed, 1)
+        path["left_out"] = [str(self.df.at[c, "title"]) for c in ranked if c not in chosen]
+        return path
+
+
+def format_path(path: dict, links: bool = True) -> str:
+    """Markdown rendering of a plan (shared by the explorer and the assistant).
+
+    `links=False` leaves titles unlinked for callers that render their own link buttons.
+    """
+    if not path["steps"]:
+        if path["left_out"]:
+            return (f"None of the courses for **{path['target']}** fit in "
+                    f"{path['budget_hours']:g} hours — try more hours a week or a later deadline.")
+        return f"I couldn't find courses for **{path['target']}**. Try naming a skill or topic."
+
+    lines = [f"**{len(path['steps'])} courses · {path['total_hours']:g} of {path['budget_hours']:g} hours** "
+             f"({path['weekly_hours']:g} h/week for {path['weeks']} weeks)", ""]
+    for n, step in enumerate(path["steps"], 1):
+        weeks = (f"Week {step['week_start']}" if step["week_start"] == step["week_end"]
+                 else f"Weeks {step['week_start']}–{step['week_end']}")
+        title = (f"[{step['title']}]({step['lms_link']})" if links and step["lms_link"].startswith("http")
+                 else step["title"])
+        hours = f"~{step['hours']:g} h (estimated)" if step["estimated"] else f"{step['hours']:g} h"
+        level = f" · {step['level']}" if step["level"] else ""
+        lines.append(f"{n}. **{weeks}** — {title}{level} · {hours} · _{step['reason']}_")
+    if path["left_out"]:
+        lines += ["", "Didn't fit the budget: " + ", ".join(path["left_out"][:5])]
+    return "\n".join(lines)
@@ -0,0 +1,346 @@
+"""
+llm_client.py — Resilient Groq access for the Course Assistant
+Every chat completion goes through `complete()`, which enforces a per-stage
+latency budget, retries 429/5xx with jittered backoff and trips a shared
+circuit breaker so a struggling upstream never stalls a script thread.
+Identical concurrent calls (across all sessions) can be coalesced into a
+single upstream request, and every attempt is admitted by the shared
+rate-limit scheduler in llm_scheduler.py. Each stage runs on its own model
+(config.LLM_STAGE_MODELS) and escalates to the large model only when the
+small model's output fails the caller's validation.
+
+The Groq SDK, .env and the HTTP pool are only touched on the first call, so
+importing this module is cheap and a missing GROQ_API_KEY surfaces as
+LLMUnavailable (local fallbacks) instead of an import error.
+
+Usage:
+    from llm_client import complete, LLMUnavailable
+    try:
+        text = complete("keywords", messages, temperature=0, max_tokens=100, coalesce=True)
+    except LLMUnavailable:
+        ...  # local fallback
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable
+
+import config
+from event_log import log_event
+from llm_scheduler import estimate_tokens, scheduler
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer within the stage budget (or the breaker is open)."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GROQ CLIENT — one pooled keep-alive connection pool per process, built lazily
+# ─────────────────────────────────────────────────────────────────────────────
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared Groq client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from dotenv import load_dotenv
+                from groq import Groq
+
+                load_dotenv()
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=config.LLM_POOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=config.LLM_POOL_MAX_KEEPALIVE,
+                        keepalive_expiry=config.LLM_POOL_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                # Retries are handled below so they respect the stage budget.
+                _client = Groq(http_client=http_client, max_retries=0)
+    return _client
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CIRCUIT BREAKER
+# ─────────────────────────────────────────────────────────────────────────────
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open (one probe) → closed."""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self._failures  = 0
+        self._opened_at: float | None = None
+        self._probing   = False
+        self._prober: int | None = None
+        self._lock      = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.cooldown:
+                self._probing = True  # let exactly one request test the water
+                self._prober  = threading.get_ident()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures  = 0
+            self._opened_at = None
+            self._probing   = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._probing   = False
+
+    def release(self):
+        """End this thread's probe if it finished without a verdict (throttled, or an
+        unexpected exception), so the next request can probe instead."""
+        with self._lock:
+            if self._probing and self._prober == threading.get_ident():
+                self._probing = False
+
+
+_breaker = CircuitBreaker(config.LLM_BREAKER_THRESHOLD, config.LLM_BREAKER_COOLDOWN)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PATH STATISTICS
+# ─────────────────────────────────────────────────────────────────────────────
+_stats: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+_stats_lock = threading.Lock()
+
+
+def _bump(stage: str, path: str, n: int = 1):
+    with _stats_lock:
+        _stats[stage][path] += n
+
+
+def record_fallback(stage: str):
+    """Callers report when they served a stage from local logic instead of the LLM."""
+    _bump(stage, "fallback")
+
+
+def stats() -> dict:
+    """Snapshot of how often each path was taken, per stage.
+
+    Paths: ok (upstream answered), retry, timeout, error, short_circuit
+    (breaker open, upstream skipped), throttled (no rate-limit slot within
+    the budget), escalated (small-model output failed validation),
+    coalesced (shared another session's in-flight call) and fallback
+    (served locally).
+    """
+    with _stats_lock:
+        stages = {stage: dict(paths) for stage, paths in _stats.items()}
+    return {"breaker": _breaker.state, "stages": stages}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RETRY HELPERS
+# ─────────────────────────────────────────────────────────────────────────────
+def _is_retryable(exc: Exception) -> bool:
+    from groq import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, APIConnectionError)
+
+
+def _retry_after(exc: Exception) -> float:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _backoff(attempt: int, retry_after: float) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    ceiling = min(config.LLM_BACKOFF_CAP, config.LLM_BACKOFF_BASE * (2 ** attempt))
+    return max(random.uniform(0, ceiling), retry_after)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SINGLE-FLIGHT — identical concurrent calls share one upstream request
+# ─────────────────────────────────────────────────────────────────────────────
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result: str | None = None
+        self.error:  LLMUnavailable | None = None
+
+
+_inflight: dict[tuple, _Flight] = {}
+_inflight_lock = threading.Lock()
+
+
+def _flight_key(stage: str, messages: list[dict], temperature: float, max_tokens: int) -> tuple:
+    """Normalized prompt: case-folded, whitespace-collapsed message contents."""
+    prompt = tuple(
+        (m.get("role", ""), " ".join(str(m.get("content", "")).casefold().split()))
+        for m in messages
+    )
+    return (stage, temperature, max_tokens, prompt)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# COMPLETION
+# ─────────────────────────────────────────────────────────────────────────────
+def complete(stage: str, messages: list[dict], temperature: float = 0.0,
+             max_tokens: int = 256, coalesce: bool = False,
+             priority: str | None = None,
+             validate: Callable[[str], bool] | None = None) -> str:
+    """Run one chat completion for `stage` within its latency budget.
+
+    Returns the stripped message content. Raises LLMUnavailable when the
+    breaker is open, the budget runs out, or the error is not retryable.
+    With `coalesce=True`, a call whose normalized prompt is already in flight
+    waits for that call and receives its result (or its failure).
+    `priority` overrides the stage's scheduler priority from config.
+    `validate` checks the stage model's output; a rejected answer is retried
+    once on the large model.
+    """
+    started = time.perf_counter()
+    outcome = "unavailable"
+    try:
+        text = _complete_coalesced(stage, messages, temperature, max_tokens, coalesce, priority, validate)
+        outcome = "ok"
+        return text
+    finally:
+        log_event("llm", stage=stage, outcome=outcome,
+                  latency_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def _complete_coalesced(stage: str, messages: list[dict], temperature: float, max_tokens: int,
+                        coalesce: bool, priority: str | None, validate: Callable[[str], bool] | None) -> str:
+    priority = priority or config.LLM_STAGE_PRIORITIES.get(stage, "background")
+    if not coalesce:
+        return _tiered(stage, messages, temperature, max_tokens, priority, validate)
+
+    key = _flight_key(stage, messages, temperature, max_tokens)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        _bump(stage, "coalesced")
+        budget = config.LLM_STAGE_BUDGETS.get(stage, config.LLM_DEFAULT_BUDGET)
+        if not flight.done.wait(budget):
+            raise LLMUnavailable(f"{stage}: coalesced call did not finish in time")
+        if flight.error is not None:
+            raise LLMUnavailable(str(flight.error)) from flight.error
+        return flight.result
+
+    try:
+        flight.result = _tiered(stage, messages, temperature, max_tokens, priority, validate)
+        return flight.result
+    except Exception as exc:
+        # Any failure, not just a timeout, must reach the followers as an error
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+def _tiered(stage: str, messages: list[dict], temperature: float, max_tokens: int,
+           priority: str, validate: Callable[[str], bool] | None) -> str:
+    model = config.LLM_STAGE_MODELS.get(stage, config.LLM_MODEL)
+    # One budget for the whole stage: an escalation only gets what the first call left
+    deadline = time.monotonic() + config.LLM_STAGE_BUDGETS.get(stage, config.LLM_DEFAULT_BUDGET)
+    text = _complete(stage, messages, temperature, max_tokens, priority, model, deadline)
+    if validate is None or model == config.LLM_MODEL or validate(text):
+        return text
+    _bump(stage, "escalated")
+    if time.monotonic() >= deadline:
+        _bump(stage, "timeout")
+        raise LLMUnavailable(f"{stage}: no budget left to escalate")
+    return _complete(stage, messages, temperature, max_tokens, priority, config.LLM_MODEL, deadline)
+
+
+def _complete(stage: str, messages: list[dict], temperature: float, max_tokens: int,
+              priority: str, model: str, deadline: float) -> str:
+    if not _breaker.allow():
+        _bump(stage, "short_circuit")
+        raise LLMUnavailable(f"{stage}: circuit open")
+    try:
+        return _call_upstream(stage, messages, temperature, max_tokens, priority, model, deadline)
+    finally:
+        _breaker.release()
+
+
+def _call_upstream(stage: str, messages: list[dict], temperature: float, max_tokens: int,
+                   priority: str, model: str, deadline: float) -> str:
+    try:
+        client = get_client()
+    except Exception as exc:  # groq missing, GROQ_API_KEY unset, …
+        _bump(stage, "error")
+        _breaker.record_failure()
+        raise LLMUnavailable(f"{stage}: client unavailable ({exc})") from exc
+    from groq import APIStatusError, APITimeoutError, GroqError
+
+    estimated = estimate_tokens(messages, max_tokens)
+    attempt   = 0
+
+    while True:
+        if not scheduler.acquire(priority, estimated, timeout=deadline - time.monotonic()):
+            _bump(stage, "throttled")
+            raise LLMUnavailable(f"{stage}: no rate-limit slot within budget")
+        remaining = deadline - time.monotonic()
+        try:
+            completion = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=remaining,
+            )
+        except GroqError as exc:
+            if isinstance(exc, APITimeoutError):
+                _bump(stage, "timeout")
+            retry_after = _retry_after(exc)
+            if isinstance(exc, APIStatusError) and exc.status_code == 429:
+                scheduler.pause(retry_after or config.LLM_BACKOFF_BASE)
+            if _is_retryable(exc) and attempt < config.LLM_MAX_RETRIES:
+                delay = _backoff(attempt, retry_after)
+                if time.monotonic() + delay < deadline:
+                    _bump(stage, "retry")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+            _bump(stage, "error")
+            _breaker.record_failure()
+            raise LLMUnavailable(f"{stage}: {exc}") from exc
+
+        usage = getattr(completion, "usage", None)
+        scheduler.settle(estimated, getattr(usage, "total_tokens", None))
+        _breaker.record_success()
+        _bump(stage, "ok")
+        return (completion.choices[0].message.content or "").strip()
@@ -0,0 +1,149 @@
+"""
+llm_scheduler.py — Process-wide Groq rate-limit scheduler
+Two token buckets (requests/min and tokens/min) sit in front of every
+chat completion. Callers queue by priority — interactive > routing >
+background — and the head of the queue is admitted as soon as both buckets
+can cover it, so throughput stays at the provider limit without tripping it.
+
+Usage:
+    from llm_scheduler import scheduler, estimate_tokens
+    if scheduler.acquire("interactive", estimate_tokens(messages, 800), timeout=5):
+        ...  # call upstream, then scheduler.settle(estimated, actual)
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+import config
+
+PRIORITIES = {"interactive": 0, "routing": 1, "background": 2}
+
+
+class TokenBucket:
+    """Continuous-refill token bucket. Not thread-safe; the Scheduler lock guards it."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate     = rate
+        self.capacity = capacity
+        self._level   = capacity
+        self._stamp   = time.monotonic()
+
+    def _refill(self, now: float):
+        self._level = min(self.capacity, self._level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def level(self, now: float) -> float:
+        self._refill(now)
+        return self._level
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than capacity are clamped)."""
+        amount = min(amount, self.capacity)
+        deficit = amount - self.level(now)
+        return 0.0 if deficit <= 0 else deficit / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self._level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Refund (positive) or charge (negative) after the real cost is known."""
+        self._level = min(self.capacity, self._level + delta)
+
+
+class Scheduler:
+    """Priority queue in front of a request bucket and a token bucket."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, burst_seconds: float):
+        burst = burst_seconds / 60
+        self._requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute * burst))
+        self._tokens   = TokenBucket(tokens_per_minute / 60, max(1.0, tokens_per_minute * burst))
+        self._paused_until = 0.0
+        self._queue: list[list] = []  # [priority, seq, tokens, cancelled]
+        self._seq  = itertools.count()
+        self._cond = threading.Condition()
+
+    # ── Queue helpers (call with the lock held) ───────────────────────────────
+    def _head(self) -> list | None:
+        while self._queue and self._queue[0][3]:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _wait_for(self, tokens: float, now: float) -> float:
+        return max(
+            self._requests.wait_time(1, now),
+            self._tokens.wait_time(tokens, now),
+            self._paused_until - now,
+            0.0,
+        )
+
+    # ── Public API ────────────────────────────────────────────────────────────
+    def acquire(self, priority: str, tokens: int, timeout: float) -> bool:
+        """Block until admitted (True) or until `timeout` seconds pass (False)."""
+        entry = [PRIORITIES.get(priority, PRIORITIES["background"]), next(self._seq), tokens, False]
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            while True:
+                now = time.monotonic()
+                if self._head() is entry:
+                    wait = self._wait_for(tokens, now)
+                    if wait == 0.0:
+                        heapq.heappop(self._queue)
+                        self._requests.take(1, now)
+                        self._tokens.take(tokens, now)
+                        self._cond.notify_all()
+                        return True
+                else:
+                    wait = deadline - now
+                if now >= deadline:
+                    entry[3] = True  # lazily dropped by _head()
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(min(wait, deadline - now))
+
+    def settle(self, estimated: int, actual: int | None):
+        """Correct the token bucket once the provider reports real usage."""
+        if actual is None:
+            return
+        with self._cond:
+            self._tokens.adjust(estimated - actual)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold every caller back, e.g. after a 429 with Retry-After."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def pressure(self) -> dict:
+        """Back-pressure signal for the UI: queue depth, estimated wait and a level."""
+        with self._cond:
+            now = time.monotonic()
+            waiting = [e for e in self._queue if not e[3]]
+            queued_tokens = sum(e[2] for e in waiting)
+            est_wait = max(
+                (len(waiting) - self._requests.level(now)) / self._requests.rate,
+                (queued_tokens - self._tokens.level(now)) / self._tokens.rate,
+                self._paused_until - now,
+                0.0,
+            )
+            by_priority = {name: sum(1 for e in waiting if e[0] == rank)
+                           for name, rank in PRIORITIES.items()}
+        level = "ok" if est_wait < 1 else "busy" if est_wait < 5 else "saturated"
+        return {"level": level, "queued": len(waiting), "queued_by_priority": by_priority,
+                "est_wait": round(est_wait, 1)}
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int) -> int:
+    """Rough prompt size (~4 chars per token) plus the completion allowance."""
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + max_tokens
+
+
+scheduler = Scheduler(
+    config.LLM_RATE_LIMIT_RPM,
+    config.LLM_RATE_LIMIT_TPM,
+    config.LLM_RATE_LIMIT_BURST_SECONDS,
+)
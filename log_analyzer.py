@@ -0,0 +1,415 @@
+"""
+log_analyzer.py — Streaming report over the analytics event log
+Reads the events written by event_log.py (rotated JSONL files and/or the
+SQLite sink) as one generator pipeline, one event at a time, and keeps only
+fixed-size summaries. Memory stays constant however many days of logs are read:
+
+  • top queries and top zero-result queries — Space-Saving heavy hitters
+  • zero-result rate per facet selection (domains=Cybersecurity|levels=Advanced),
+    bounded with Space-Saving like the query lists
+  • p50 / p95 / p99 latency per pipeline stage — t-digest
+      search:<backend>, chat:<intent>, llm:<stage>, path_plan
+  • distinct sessions and distinct queries — HyperLogLog
+
+Every summary has merge(), so logs can be analysed in shards (per file,
+per server) and the results combined. The report lists the catalogue gaps
+the curation team should look at first: frequent queries that return nothing.
+
+Usage:
+    python log_analyzer.py                          # everything under logs/
+    python log_analyzer.py logs/events-2026*.jsonl --since 2026-09-01
+    python log_analyzer.py --json > report.json
+"""
+
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator
+
+import config
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SKETCHES
+# ─────────────────────────────────────────────────────────────────────────────
+class TDigest:
+    """Merging t-digest (k1 scale function): accurate tails, bounded centroids."""
+
+    def __init__(self, compression: float = config.ANALYZER_TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self._buffer: list[tuple[float, float]] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self):
+        points = sorted([*zip(self.means, self.weights), *self._buffer])
+        self._buffer = []
+        if not points:
+            return
+        total = sum(w for _, w in points)
+        means, weights = [points[0][0]], [points[0][1]]
+        done = 0.0
+        limit = self._q(self._k(0.0) + 1) * total
+        for mean, weight in points[1:]:
+            if done + weights[-1] + weight <= limit:
+                weights[-1] += weight
+                means[-1] += (mean - means[-1]) * weight / weights[-1]
+            else:
+                done += weights[-1]
+                limit = self._q(self._k(done / total) + 1) * total
+                means.append(mean)
+                weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> float | None:
+        self._compress()
+        if not self.weights:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+        # Interpolate between centroid centres (each sits at its weight's midpoint)
+        target = q * self.count
+        centres, cumulative = [], 0.0
+        for weight in self.weights:
+            centres.append(cumulative + weight / 2)
+            cumulative += weight
+        if target <= centres[0]:
+            return self.min + (self.means[0] - self.min) * target / centres[0] if centres[0] else self.min
+        if target >= centres[-1]:
+            tail = self.count - centres[-1]
+            return self.means[-1] + (self.max - self.means[-1]) * (target - centres[-1]) / tail if tail else self.max
+        i = bisect.bisect_right(centres, target)
+        lo, hi = centres[i - 1], centres[i]
+        return self.means[i - 1] + (self.means[i] - self.means[i - 1]) * (target - lo) / (hi - lo)
+
+    def merge(self, other: "TDigest"):
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress()
+
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision one-byte registers."""
+
+    def __init__(self, precision: int = config.ANALYZER_HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, item: str):
+        h = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - self.p)
+        rest = (h << self.p) & ((1 << 64) - 1)
+        rank = 65 - rest.bit_length() if rest else 65 - self.p
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            return round(self.m * math.log(self.m / zeros))  # small-range correction
+        return round(raw)
+
+    def merge(self, other: "HyperLogLog"):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+
+class SpaceSaving:
+    """Approximate top-k counts over a stream in `capacity` counters."""
+
+    def __init__(self, capacity: int = config.ANALYZER_HEAVY_HITTERS):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counts or len(self.counts) < self.capacity:
+            self.counts[item] = self.counts.get(item, 0) + count
+            return
+        # Replace the smallest counter; the newcomer inherits its count as error
+        smallest = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(smallest)
+        self.counts[item] = floor + count
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+    def merge(self, other: "SpaceSaving"):
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        if len(self.counts) > self.capacity:
+            self.counts = dict(self.top(self.capacity))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EVENT STREAM
+# ─────────────────────────────────────────────────────────────────────────────
+def default_paths(directory: str = config.EVENTS_DIR) -> list[str]:
+    paths = sorted(glob.glob(os.path.join(directory, "events-*.jsonl")), key=os.path.getmtime)
+    sqlite_path = os.path.join(directory, "events.sqlite")
+    return paths + ([sqlite_path] if os.path.exists(sqlite_path) else [])
+
+
+def iter_events(paths: Iterable[str]) -> Iterator[dict]:
+    """Events from JSONL and SQLite logs, one at a time; malformed lines are skipped."""
+    for path in paths:
+        if path.endswith(".sqlite"):
+            con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                for (data,) in con.execute("SELECT data FROM events ORDER BY ts"):
+                    yield json.loads(data)
+            finally:
+                con.close()
+            continue
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def since(events: Iterable[dict], start_ts: float | None) -> Iterator[dict]:
+    return (e for e in events if start_ts is None or e.get("ts", 0) >= start_ts)
+
+
+def _normalize_query(text) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def _facet_value(value) -> str:
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2 and all(isinstance(v, (int, float)) for v in value):
+            return f"{value[0]:g}-{value[1]:g}"  # duration range
+        return ",".join(map(str, value))
+    return str(value)
+
+
+def _facet_combination(facets: dict) -> str:
+    """Facet values in use, e.g. "domains=Cybersecurity|levels=Advanced"."""
+    if not facets:
+        return "(none)"
+    return "|".join(f"{name}={_facet_value(facets[name])}" for name in sorted(facets))
+
+
+def _stage(event: dict) -> str | None:
+    kind = event.get("type")
+    if kind == "search":
+        return f"search:{event.get('backend', 'pandas')}"
+    if kind == "chat":
+        return f"chat:{event.get('intent', 'unknown')}"
+    if kind == "llm":
+        return f"llm:{event.get('stage', 'unknown')}"
+    if kind == "path_plan":
+        return "path_plan"
+    return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ANALYZER
+# ─────────────────────────────────────────────────────────────────────────────
+class LogAnalyzer:
+    """Fixed-size summaries of an event stream; mergeable across shards."""
+
+    def __init__(self):
+        self.events = 0
+        self.by_type: dict[str, int] = {}
+        self.searches = 0
+        self.zero_results = 0
+        self.queries = SpaceSaving()
+        self.zero_queries = SpaceSaving()
+        self.viewed = SpaceSaving()             # "View Details" opened
+        self.clicked = SpaceSaving()            # course links followed
+        self.facet_searches = SpaceSaving()     # facet selection → searches
+        self.facet_zero = SpaceSaving()         # facet selection → zero-result searches
+        self.latency: dict[str, TDigest] = {}
+        self.llm_unavailable: dict[str, int] = {}
+        self.sessions = HyperLogLog()
+        self.distinct_queries = HyperLogLog()
+        self.first_ts = math.inf
+        self.last_ts = -math.inf
+
+    def add(self, event: dict):
+        kind = event.get("type", "unknown")
+        self.events += 1
+        self.by_type[kind] = self.by_type.get(kind, 0) + 1
+        ts = event.get("ts")
+        if isinstance(ts, (int, float)):
+            self.first_ts, self.last_ts = min(self.first_ts, ts), max(self.last_ts, ts)
+        if event.get("session"):
+            self.sessions.add(event["session"])
+
+        stage = _stage(event)
+        if stage and isinstance(event.get("latency_ms"), (int, float)):
+            self.latency.setdefault(stage, TDigest()).add(float(event["latency_ms"]))
+
+        if kind == "search":
+            self._add_query(event.get("query"), event.get("results"), event.get("facets") or {})
+        elif kind == "chat" and event.get("intent") == "course_search":
+            self._add_query(event.get("question"), event.get("results"), None)
+        elif kind in ("course_details", "course_view") and event.get("title"):  # course_view: older logs
+            self.viewed.add(str(event["title"]))
+        elif kind == "course_click" and event.get("title"):
+            self.clicked.add(str(event["title"]))
+        elif kind == "llm" and event.get("outcome") != "ok":
+            stage_name = event.get("stage", "unknown")
+            self.llm_unavailable[stage_name] = self.llm_unavailable.get(stage_name, 0) + 1
+
+    def _add_query(self, text, results, facets: dict | None):
+        query = _normalize_query(text)
+        zero = results == 0
+        if facets is not None:  # sidebar searches (chat turns carry no facets)
+            self.searches += 1
+            self.zero_results += zero
+            combination = _facet_combination(facets)
+            self.facet_searches.add(combination)
+            if zero:
+                self.facet_zero.add(combination)
+        if query:
+            self.queries.add(query)
+            self.distinct_queries.add(query)
+            if zero:
+                self.zero_queries.add(query)
+
+    def consume(self, events: Iterable[dict]) -> "LogAnalyzer":
+        for event in events:
+            self.add(event)
+        return self
+
+    def merge(self, other: "LogAnalyzer") -> "LogAnalyzer":
+        self.events += other.events
+        for kind, n in other.by_type.items():
+            self.by_type[kind] = self.by_type.get(kind, 0) + n
+        self.searches += other.searches
+        self.zero_results += other.zero_results
+        for mine, theirs in [(self.queries, other.queries), (self.zero_queries, other.zero_queries),
+                             (self.viewed, other.viewed), (self.clicked, other.clicked),
+                             (self.sessions, other.sessions),
+                             (self.distinct_queries, other.distinct_queries),
+                             (self.facet_searches, other.facet_searches), (self.facet_zero, other.facet_zero)]:
+            mine.merge(theirs)
+        for stage, digest in other.latency.items():
+            self.latency.setdefault(stage, TDigest()).merge(digest)
+        for stage, n in other.llm_unavailable.items():
+            self.llm_unavailable[stage] = self.llm_unavailable.get(stage, 0) + n
+        self.first_ts, self.last_ts = min(self.first_ts, other.first_ts), max(self.last_ts, other.last_ts)
+        return self
+
+    def _facet_gaps(self, top_k: int) -> list[dict]:
+        rows = []
+        for combination, zero in self.facet_zero.top(top_k):
+            # Both counts are Space-Saving estimates; a selection evicted from the
+            # search counters still searched at least as often as it came up empty
+            searches = max(self.facet_searches.counts.get(combination, 0), zero)
+            rows.append({"facets": combination, "searches": searches, "zero_results": zero,
+                         "rate": zero / searches})
+        return rows
+
+    def report(self, top_k: int = config.ANALYZER_TOP_K) -> dict:
+        def stamp(ts):
+            return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if math.isfinite(ts) else None
+
+        return {
+            "period": {"from": stamp(self.first_ts), "to": stamp(self.last_ts)},
+            "events": self.events,
+            "events_by_type": dict(sorted(self.by_type.items())),
+            "distinct_sessions": self.sessions.estimate(),
+            "distinct_queries": self.distinct_queries.estimate(),
+            "searches": self.searches,
+            "zero_result_rate": self.zero_results / self.searches if self.searches else None,
+            "top_queries": self.queries.top(top_k),
+            "catalogue_gaps": self.zero_queries.top(top_k),
+            "most_viewed": self.viewed.top(top_k),
+            "most_clicked": self.clicked.top(top_k),
+            "zero_results_by_facets": self._facet_gaps(top_k),
+            "latency_ms": {
+                stage: {"count": int(d.count), "p50": d.quantile(0.5), "p95": d.quantile(0.95),
+                        "p99": d.quantile(0.99)}
+                for stage, d in sorted(self.latency.items())},
+            "llm_unavailable": dict(sorted(self.llm_unavailable.items())),
+        }
+
+
+def _md_cell(text: str) -> str:
+    return text.replace("|", "\\|")
+
+
+def format_report(report: dict) -> str:
+    """Markdown version of LogAnalyzer.report() for the curation team."""
+    lines = ["# Course Explorer usage report",
+             f"{report['period']['from']} → {report['period']['to']} · {report['events']} events · "
+             f"~{report['distinct_sessions']} sessions · ~{report['distinct_queries']} distinct queries", ""]
+    rate = report["zero_result_rate"]
+    lines.append(f"**Searches:** {report['searches']} · zero results: "
+                 f"{'n/a' if rate is None else f'{rate:.1%}'}")
+
+    lines += ["", "## Catalogue gaps (queries that returned nothing)"]
+    lines += [f"{i}. `{q}` — {n}×" for i, (q, n) in enumerate(report["catalogue_gaps"], 1)] or ["_none_"]
+    lines += ["", "## Top queries"]
+    lines += [f"{i}. `{q}` — {n}×" for i, (q, n) in enumerate(report["top_queries"], 1)] or ["_none_"]
+    lines += ["", "## Most viewed courses (details opened)"]
+    lines += [f"{i}. {t} — {n}×" for i, (t, n) in enumerate(report["most_viewed"], 1)] or ["_none_"]
+    lines += ["", "## Most opened courses (links followed)"]
+    lines += [f"{i}. {t} — {n}×" for i, (t, n) in enumerate(report["most_clicked"], 1)] or ["_none_"]
+
+    lines += ["", "## Zero results by filter selection", "| Filters | Searches | Zero results | Rate |",
+              "|---|---:|---:|---:|"]
+    lines += [f"| {_md_cell(r['facets'])} | {r['searches']} | {r['zero_results']} | {r['rate']:.1%} |"
+              for r in report["zero_results_by_facets"]]
+
+    lines += ["", "## Latency per stage (ms)", "| Stage | Count | p50 | p95 | p99 |", "|---|---:|---:|---:|---:|"]
+    lines += [f"| {stage} | {s['count']} | {s['p50']:.1f} | {s['p95']:.1f} | {s['p99']:.1f} |"
+              for stage, s in report["latency_ms"].items()]
+    if report["llm_unavailable"]:
+        lines += ["", "LLM calls served by local fallback: " +
+                  ", ".join(f"{stage} {n}" for stage, n in report["llm_unavailable"].items())]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize the analytics event log.")
+    parser.add_argument("paths", nargs="*", help=f"JSONL/SQLite event logs (default: {config.EVENTS_DIR}/)")
+    parser.add_argument("--since", help="only events on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--top", type=int, default=config.ANALYZER_TOP_K, help="rows per top list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or default_paths()
+    if not paths:
+        print(f"No event logs found in {config.EVENTS_DIR}/", file=sys.stderr)
+        return 1
+    start_ts = datetime.strptime(args.since, "%Y-%m-%d").timestamp() if args.since else None
+    report = LogAnalyzer().consume(since(iter_events(paths), start_ts)).report(args.top)
+    print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
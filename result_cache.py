@@ -0,0 +1,126 @@
+"""
+result_cache.py — Process-wide cache of filtered, sorted course selections
+TAs tend to run the same filter combinations, so the row ids of a selection
+(already in display order) and its stats/insight aggregates are computed
+once per canonical filter state and shared by every session. Entries are
+evicted least-recently-used once the entry or memory bound is exceeded.
+
+Usage:
+    from result_cache import compute_selection, result_cache, selection_key
+    key = selection_key(filters, sort_by, df.attrs["version"])
+    result = result_cache.get_or_compute(key, lambda: compute_selection(df, filters, sort_by, sort_index))
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import SortIndex, filter_ids, relevance_scores, selection_aggregates
+
+
+class CachedSelection:
+    """Row ids in display order plus the aggregates the results region shows."""
+    __slots__ = ("ids", "aggregates")
+
+    def __init__(self, ids: np.ndarray, aggregates: dict):
+        self.ids = ids
+        self.aggregates = aggregates
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + sys.getsizeof(self.aggregates) + 256  # rough per-entry overhead
+
+
+def compute_selection(df: pd.DataFrame, filters: dict, sort_by: str, sort_index: SortIndex) -> CachedSelection:
+    """Filter, order and aggregate one selection (the result-cache miss path)."""
+    ids = filter_ids(df, filters)
+    # Fixed orders are a gather over the presorted catalogue permutations;
+    # relevance depends on the query, so it is scored per subset.
+    if sort_by == "Relevance":
+        if filters["search"]:
+            scores = relevance_scores(df.loc[ids], filters["search"].split())
+            ids = ids[(-scores).argsort(kind="stable")]
+    else:
+        ids = sort_index.order(ids, sort_by)
+    return CachedSelection(ids, selection_aggregates(df.loc[ids]))
+
+
+def selection_key(filters: dict, sort_by: str, version: str) -> str:
+    """Stable hash of a canonical filter state (see catalogue.canonical_filters)."""
+    payload = json.dumps({"filters": filters, "sort": sort_by, "version": version},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU bounded by entry count and approximate bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self._entries: OrderedDict[str, CachedSelection] = OrderedDict()
+        self._bytes  = 0
+        self._hits   = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock   = threading.Lock()
+
+    def get(self, key: str) -> CachedSelection | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedSelection):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], CachedSelection]) -> CachedSelection:
+        """Cached entry for `key`; computed outside the lock on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            entry = compute()
+            self.put(key, entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries":   len(self._entries),
+                "bytes":     self._bytes,
+                "hits":      self._hits,
+                "misses":    self._misses,
+                "evictions": self._evictions,
+                "hit_rate":  self._hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(
+    config.RESULT_CACHE_MAX_ENTRIES,
+    config.RESULT_CACHE_MAX_MB * 1024 * 1024,
+)
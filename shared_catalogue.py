@@ -0,0 +1,188 @@
+"""
+shared_catalogue.py — One catalogue snapshot shared by every server process
+When several Streamlit (or API) processes run behind a load balancer, only
+the first to start a catalogue version parses, federates, normalizes and
+indexes it. That process publishes the result as memory-mapped files; the
+other processes attach to them read-only:
+
+  .snapshots/shared/<version>/
+      catalogue.arrow       normalized frame, Arrow IPC (uncompressed, mmap-able)
+      sort_*.npy            SortIndex permutations
+      similar_*.npy         similar-courses kNN graph (CSR arrays, vocabulary, IDF)
+      manifest.json         version, row count, federation report
+
+The index arrays are opened with np.load(mmap_mode="r"), and the frame's
+numeric columns (id, duration_hours, updated_at) are read-only views over the
+mapped Arrow buffers: they are written without Arrow nulls (NaN and NaT are
+kept as values), so pandas can use the buffers as they are. The OS page cache
+holds a single copy of these for every process. Text and skill-tag columns
+become Python objects in each process, but that is a copy from mapped memory,
+not a CSV parse. A file lock makes sure a version is published once, and the
+publishing process attaches to the files like the others.
+
+Usage:
+    from shared_catalogue import load_shared
+    df, sort_index, graph = load_shared()      # attach, or build + publish first
+
+    python shared_catalogue.py                  # publish the current version ahead of a deploy
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import SORT_KEYS, SortIndex, file_version, load_catalogue
+from similar_courses import SimilarityGraph, load_or_build_graph
+
+_GRAPH_ARRAYS = ["keys", "indptr", "indices", "scores", "vocab", "idf"]
+
+
+def available() -> bool:
+    return config.SHARED_CATALOGUE and importlib.util.find_spec("pyarrow") is not None
+
+
+def shared_dir(source: str = config.DATA_FILE) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(source)), config.INGEST_SNAPSHOT_DIR, "shared")
+
+
+def catalogue_version() -> str:
+    """Version the catalogue would have if loaded now (hashes the source files only)."""
+    if config.FEDERATION_SOURCES:
+        from federation import federated_version
+        return federated_version(config.FEDERATION_SOURCES)
+    return file_version(config.DATA_FILE)
+
+
+def _load_fresh() -> pd.DataFrame:
+    if config.FEDERATION_SOURCES:
+        from federation import load_federated
+        return load_federated(config.FEDERATION_SOURCES)
+    return load_catalogue(config.DATA_FILE)
+
+
+def _sort_file(key: tuple[str, bool]) -> str:
+    return f"sort_{key[0]}_{'desc' if key[1] else 'asc'}.npy"
+
+
+@contextmanager
+def _publish_lock(root: str):
+    """Exclusive across processes where fcntl exists; elsewhere publishing races are
+    resolved by the atomic directory rename in publish()."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "w") as fh:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLISH / ATTACH
+# ─────────────────────────────────────────────────────────────────────────────
+def publish(df: pd.DataFrame, sort_index: SortIndex, graph: SimilarityGraph, root: str) -> str:
+    """Write one catalogue version under `root`; returns its directory."""
+    import pyarrow as pa
+
+    from ingest import _arrow_schema
+
+    version = df.attrs["version"]
+    target = os.path.join(root, version)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    schema = _arrow_schema(df)
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    # Missing numbers as NaN / NaT values rather than Arrow nulls: pandas has to
+    # copy a column with a validity bitmap to fill in the gaps
+    table = table.set_column(schema.get_field_index("duration_hours"), "duration_hours",
+                             pa.array(df["duration_hours"].to_numpy(dtype=float), from_pandas=False))
+    table = table.set_column(schema.get_field_index("updated_at"), "updated_at",
+                             pa.array(df["updated_at"].to_numpy("datetime64[ns]").view("int64"))
+                             .view(pa.timestamp("ns")))
+    with pa.OSFile(os.path.join(tmp, "catalogue.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+    for key, perm in sort_index.permutations.items():
+        np.save(os.path.join(tmp, _sort_file(key)), np.ascontiguousarray(perm))
+    for name in _GRAPH_ARRAYS:
+        np.save(os.path.join(tmp, f"similar_{name}.npy"), np.asarray(getattr(graph, name)))
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump({"version": version, "rows": len(df), "federation": df.attrs.get("federation")}, fh)
+
+    try:
+        os.replace(tmp, target)
+    except OSError:  # another process published the same version first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def attach(path: str) -> tuple[pd.DataFrame, SortIndex, SimilarityGraph]:
+    """Read-only view of a published version."""
+    import pyarrow as pa
+
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+
+    table = pa.ipc.open_file(pa.memory_map(os.path.join(path, "catalogue.arrow"), "r")).read_all()
+    # split_blocks keeps each null-free numeric column a view over its mapped
+    # buffer; columns are then replaced one at a time so no block is consolidated
+    df = table.to_pandas(split_blocks=True)
+    for col in [f.name for f in table.schema if pa.types.is_string(f.type)]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    df["skill_tags"] = [list(tags) if tags is not None else [] for tags in df["skill_tags"]]
+    df.attrs["version"] = manifest["version"]
+    if manifest.get("federation"):
+        df.attrs["federation"] = manifest["federation"]
+
+    perms = {key: np.load(os.path.join(path, _sort_file(key)), mmap_mode="r") for key in set(SORT_KEYS.values())}
+    sort_index = SortIndex.from_permutations(manifest["rows"], perms)
+    graph = SimilarityGraph(*(np.load(os.path.join(path, f"similar_{name}.npy"), mmap_mode="r")
+                              for name in _GRAPH_ARRAYS))
+    return df, sort_index, graph
+
+
+def _prune(root: str, keep: str):
+    """Drop all but the newest SHARED_KEEP_VERSIONS versions. Processes still
+    mapping a removed version keep their pages until they move on."""
+    versions = [os.path.join(root, d) for d in os.listdir(root)
+                if os.path.isfile(os.path.join(root, d, "manifest.json"))]
+    versions.sort(key=os.path.getmtime, reverse=True)
+    for old in versions[config.SHARED_KEEP_VERSIONS:]:
+        if os.path.basename(old) != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def load_shared(root: str | None = None) -> tuple[pd.DataFrame, SortIndex, SimilarityGraph]:
+    """Attach to the current catalogue version, publishing it first if nobody has."""
+    root = root or shared_dir()
+    version = catalogue_version()
+    path = os.path.join(root, version)
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        with _publish_lock(root):
+            if not os.path.exists(os.path.join(path, "manifest.json")):
+                df = _load_fresh()
+                path = publish(df, SortIndex(df), load_or_build_graph(df), root)
+                _prune(root, keep=version)
+    return attach(path)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    df, _, _ = load_shared()
+    print(f"✅ Catalogue {df.attrs['version']} ({len(df)} courses) shared from {shared_dir()} "
+          f"in {time.perf_counter() - start:.2f}s")
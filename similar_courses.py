@@ -0,0 +1,279 @@
+"""
+similar_courses.py — Precomputed "more like this" graph between courses
+Each course is a TF-IDF vector over its title (weighted), learning outcomes
+and skill area; similarity is the cosine of those vectors blended with facet
+overlap (domain, focus area, level, format, platform). The top-k neighbours
+of every course are stored as a CSR adjacency (indptr / indices / scores),
+so a card's "Similar courses" list is one array slice.
+
+The graph is persisted next to the catalogue and updated incrementally: rows
+are matched by content hash, only new or changed courses (and courses whose
+neighbours disappeared) are searched against the whole catalogue, and the
+rest only against the new rows. The vocabulary and IDF weights are frozen
+between full rebuilds, which happen once more than
+config.SIMILAR_REBUILD_FRACTION of the catalogue has changed.
+
+Usage:
+    from similar_courses import load_or_build_graph
+    graph = load_or_build_graph(df)
+    for course_id, score in graph.neighbours(42):
+        ...
+
+    python similar_courses.py       # (re)build the graph for config.DATA_FILE
+"""
+
+import hashlib
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import query_terms
+
+TEXT_COLS = ["title", "full_description", "priority_skills"]
+FACET_COLS = ["domain", "focus_area", "level", "format", "platform"]
+TITLE_WEIGHT = 2
+_BLOCK_ROWS = 256
+
+
+def course_keys(df: pd.DataFrame) -> np.ndarray:
+    """Content hash per row — the identity used to reuse work across rebuilds."""
+    cols = [c for c in TEXT_COLS + FACET_COLS if c in df.columns]
+    text = df[cols].fillna("").astype(str).agg("\x1f".join, axis=1)
+    return np.array([hashlib.sha1(t.encode("utf-8")).hexdigest()[:16] for t in text], dtype="<U16")
+
+
+def _tokens(row) -> list[str]:
+    return (query_terms(row["title"]) * TITLE_WEIGHT
+            + query_terms(row["full_description"]) + query_terms(row["priority_skills"]))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TF-IDF (CSR, numpy only)
+# ─────────────────────────────────────────────────────────────────────────────
+def fit_vocabulary(docs: list[list[str]], max_features: int = config.SIMILAR_MAX_FEATURES):
+    """Most document-frequent terms (seen in ≥ 2 courses) and their smoothed IDF."""
+    df_counts = Counter(term for doc in docs for term in set(doc))
+    terms = [t for t, c in df_counts.most_common(max_features) if c >= 2]
+    terms.sort()
+    idf = np.array([np.log((1 + len(docs)) / (1 + df_counts[t])) + 1 for t in terms], dtype=np.float32)
+    return np.array(terms, dtype=str), idf
+
+
+def tfidf_rows(docs: list[list[str]], vocab: np.ndarray, idf: np.ndarray):
+    """L2-normalized sublinear TF-IDF rows as (indptr, indices, data)."""
+    column = {t: i for i, t in enumerate(vocab)}
+    indptr, indices, data = [0], [], []
+    for doc in docs:
+        counts = Counter(column[t] for t in doc if t in column)
+        cols = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        vals = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * idf[cols]
+        norm = np.linalg.norm(vals)
+        order = np.argsort(cols)
+        indices.append(cols[order])
+        data.append(vals[order] / norm if norm else vals[order])
+        indptr.append(indptr[-1] + len(counts))
+    return (np.array(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.empty(0, np.int32),
+            np.concatenate(data) if data else np.empty(0, np.float32))
+
+
+def _dense(csr, rows: np.ndarray, width: int) -> np.ndarray:
+    indptr, indices, data = csr
+    out = np.zeros((len(rows), width), dtype=np.float32)
+    for r, i in enumerate(rows):
+        lo, hi = indptr[i], indptr[i + 1]
+        out[r, indices[lo:hi]] = data[lo:hi]
+    return out
+
+
+class _Vectors:
+    """TF-IDF + facet codes for one catalogue, with blockwise similarity."""
+
+    def __init__(self, df: pd.DataFrame, vocab: np.ndarray, idf: np.ndarray):
+        docs = [_tokens(row) for row in df[TEXT_COLS].fillna("").astype(str).to_dict(orient="records")]
+        self.width = len(vocab)
+        self.csr = tfidf_rows(docs, vocab, idf)
+        self.n = len(df)
+        # Facet codes; empty values get a unique negative code so they never match
+        codes = []
+        for col in FACET_COLS:
+            values = df[col].fillna("").astype(str).str.strip().str.lower() if col in df.columns \
+                else pd.Series([""] * len(df))
+            c = pd.factorize(values)[0].astype(np.int64)
+            c[values.to_numpy() == ""] = -1 - np.arange(int((values == "").sum()))
+            codes.append(c)
+        self.facets = np.stack(codes, axis=1) if codes else np.zeros((len(df), 0), np.int64)
+
+    def similarity(self, rows: np.ndarray, against: np.ndarray) -> np.ndarray:
+        """(len(rows), len(against)) blended similarity."""
+        a = _dense(self.csr, rows, self.width)
+        b = _dense(self.csr, against, self.width)
+        cosine = a @ b.T
+        facet = (self.facets[rows][:, None, :] == self.facets[against][None, :, :]).mean(axis=2)
+        w = config.SIMILAR_FACET_WEIGHT
+        return (1 - w) * cosine + w * facet
+
+
+def _top_k(sims: np.ndarray, candidates: np.ndarray, k: int):
+    """Per row: best `k` candidates by similarity, descending (ties by id)."""
+    k = min(k, sims.shape[1])
+    if k == 0:
+        return np.empty((len(sims), 0), np.int64), np.empty((len(sims), 0), np.float32)
+    part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    part_sims = np.take_along_axis(sims, part, axis=1)
+    order = np.lexsort((candidates[part], -part_sims), axis=1)
+    best = np.take_along_axis(part, order, axis=1)
+    return candidates[best], np.take_along_axis(sims, best, axis=1).astype(np.float32)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GRAPH
+# ─────────────────────────────────────────────────────────────────────────────
+class SimilarityGraph:
+    """Top-k neighbour lists in CSR form, plus what's needed to update them."""
+
+    def __init__(self, keys, indptr, indices, scores, vocab, idf):
+        self.keys = keys
+        self.indptr = indptr
+        self.indices = indices
+        self.scores = scores
+        self.vocab = vocab
+        self.idf = idf
+
+    def neighbours(self, course_id: int, limit: int | None = None) -> list[tuple[int, float]]:
+        lo, hi = self.indptr[course_id], self.indptr[course_id + 1]
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return list(zip(self.indices[lo:hi].tolist(), self.scores[lo:hi].tolist()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.scores.nbytes
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, keys=self.keys, indptr=self.indptr, indices=self.indices,
+                            scores=self.scores, vocab=self.vocab, idf=self.idf)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarityGraph":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(z["keys"], z["indptr"], z["indices"], z["scores"], z["vocab"], z["idf"])
+
+
+def _from_lists(keys, vocab, idf, ids: np.ndarray, sims: np.ndarray) -> SimilarityGraph:
+    keep = sims > 0
+    counts = keep.sum(axis=1)
+    indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return SimilarityGraph(keys, indptr, ids[keep].astype(np.int32), sims[keep].astype(np.float32),
+                           vocab, idf)
+
+
+def build_graph(df: pd.DataFrame, k: int = config.SIMILAR_K) -> SimilarityGraph:
+    """Full build: fit the vocabulary and search every course against every other."""
+    docs = [_tokens(row) for row in df[TEXT_COLS].fillna("").astype(str).to_dict(orient="records")]
+    vocab, idf = fit_vocabulary(docs)
+    vectors = _Vectors(df, vocab, idf)
+    everyone = np.arange(vectors.n)
+    ids = np.zeros((vectors.n, min(k, max(vectors.n - 1, 0))), np.int64)
+    sims = np.zeros(ids.shape, np.float32)
+    for lo in range(0, vectors.n, _BLOCK_ROWS):
+        rows = everyone[lo:lo + _BLOCK_ROWS]
+        block = vectors.similarity(rows, everyone)
+        block[np.arange(len(rows)), rows] = -np.inf  # not your own neighbour
+        ids[lo:lo + len(rows)], sims[lo:lo + len(rows)] = _top_k(block, everyone, ids.shape[1])
+    return _from_lists(course_keys(df), vocab, idf, ids, sims)
+
+
+def update_graph(previous: SimilarityGraph, df: pd.DataFrame, k: int = config.SIMILAR_K) -> SimilarityGraph:
+    """Incremental rebuild against the current catalogue (see module docstring)."""
+    keys = course_keys(df)
+    old_pos = {key: i for i, key in enumerate(previous.keys)}
+    new_rows = np.array([i for i, key in enumerate(keys) if key not in old_pos], dtype=np.int64)
+    if previous.keys.size == 0 or len(new_rows) + len(set(old_pos) - set(keys)) \
+            > config.SIMILAR_REBUILD_FRACTION * max(len(keys), 1):
+        return build_graph(df, k)
+
+    # Previous neighbour lists, remapped to current row ids (-1 = removed course)
+    remap = np.full(len(previous.keys), -1, np.int64)
+    for i, key in enumerate(keys):
+        if key in old_pos:
+            remap[old_pos[key]] = i
+    k = min(k, max(len(keys) - 1, 0))
+    ids = np.full((len(keys), k), -1, np.int64)
+    sims = np.full((len(keys), k), -np.inf, np.float32)
+    dirty = np.zeros(len(keys), bool)
+    dirty[new_rows] = True
+    for i, key in enumerate(keys):
+        if dirty[i]:
+            continue
+        lo, hi = previous.indptr[old_pos[key]], previous.indptr[old_pos[key] + 1]
+        mapped = remap[previous.indices[lo:hi]]
+        if (mapped < 0).any() or hi - lo < min(k, len(previous.keys) - 1):
+            dirty[i] = True  # lost a neighbour: search again from scratch
+            continue
+        n = min(k, len(mapped))
+        ids[i, :n], sims[i, :n] = mapped[:n], previous.scores[lo:lo + n]
+
+    vectors = _Vectors(df, previous.vocab, previous.idf)
+    everyone = np.arange(len(keys))
+    dirty_rows = np.flatnonzero(dirty)
+    for lo in range(0, len(dirty_rows), _BLOCK_ROWS):
+        rows = dirty_rows[lo:lo + _BLOCK_ROWS]
+        block = vectors.similarity(rows, everyone)
+        block[np.arange(len(rows)), rows] = -np.inf
+        ids[rows], sims[rows] = _top_k(block, everyone, k)
+
+    # Clean rows only need to consider the new courses
+    clean_rows = np.flatnonzero(~dirty)
+    if len(new_rows) and len(clean_rows):
+        for lo in range(0, len(clean_rows), _BLOCK_ROWS):
+            rows = clean_rows[lo:lo + _BLOCK_ROWS]
+            block = np.concatenate([sims[rows], vectors.similarity(rows, new_rows)], axis=1)
+            pool = np.concatenate([ids[rows], np.broadcast_to(new_rows, (len(rows), len(new_rows)))], axis=1)
+            best = np.argsort(-block, axis=1, kind="stable")[:, :k]
+            ids[rows] = np.take_along_axis(pool, best, axis=1)
+            sims[rows] = np.take_along_axis(block, best, axis=1)
+
+    return _from_lists(keys, previous.vocab, previous.idf, ids, sims)
+
+
+def graph_path(source: str = config.DATA_FILE) -> str:
+    snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(source)), config.INGEST_SNAPSHOT_DIR)
+    return os.path.join(snapshot_dir, "similar_courses.npz")
+
+
+def load_or_build_graph(df: pd.DataFrame, path: str | None = None) -> SimilarityGraph:
+    """Graph for `df`: reuse the saved one if current, else update or rebuild it and save."""
+    path = path or graph_path()
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = SimilarityGraph.load(path)
+        except (OSError, ValueError, KeyError):
+            previous = None
+    if previous is not None and np.array_equal(previous.keys, course_keys(df)):
+        return previous
+    graph = update_graph(previous, df) if previous is not None else build_graph(df)
+    try:
+        graph.save(path)
+    except OSError:
+        pass  # read-only deploy: keep the in-memory graph
+    return graph
+
+
+if __name__ == "__main__":
+    import time
+
+    from catalogue import load_catalogue
+
+    df = load_catalogue(config.DATA_FILE)
+    start = time.perf_counter()
+    graph = load_or_build_graph(df)
+    print(f"✅ {len(graph.keys)} courses, {len(graph.indices)} edges ({graph.nbytes / 1024:.0f} KiB) "
+          f"in {time.perf_counter() - start:.2f}s → {graph_path()}")
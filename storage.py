@@ -0,0 +1,446 @@
+"""
+storage.py — Pluggable catalogue storage backends
+The explorer's result path — sidebar filters, the search box, sorting, the
+stats/insights aggregates, paging, and the assistant's keyword pre-filter —
+goes through a backend so it can run on an embedded database instead of the
+in-memory DataFrame:
+
+  • "pandas"  (default) — the DataFrame, presorted SortIndex and boolean masks
+  • "sqlite"  — stdlib SQLite with an FTS5 full-text index (bm25 ranking)
+  • "duckdb"  — DuckDB columnar tables for fast analytical scans (optional dependency)
+
+The SQL backends are built once per catalogue version into a database file
+next to the source (config.INGEST_SNAPSHOT_DIR) — from a DataFrame or
+straight from ingest.iter_normalized_chunks — and queried with every filter
+pushed down; only the page of rows being shown is materialized.
+
+Usage:
+    from storage import open_backend
+    backend = open_backend("sqlite", df)
+    selection = backend.select(filters, "Title (A-Z)")       # ids + aggregates
+    page = backend.rows(selection.ids[:48])
+"""
+
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+import config
+from catalogue import (FACET_COLS, RELEVANCE_COLUMNS, SORT_KEYS, SortIndex, _collation_key, build_facets,
+                       relevance_scores, searchable_text)
+from result_cache import CachedSelection, compute_selection
+
+FTS_COLUMNS = ["title", "short_description", "full_description", "domain", "focus_area", "priority_skills"]
+FTS_WEIGHTS = [3.0, 1.0, 1.0, 1.0, 1.0, 1.0]
+BACKENDS = ["pandas", "sqlite", "duckdb"]
+
+
+def available_backends() -> list[str]:
+    return [b for b in BACKENDS if b != "duckdb" or importlib.util.find_spec("duckdb") is not None]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PANDAS (default)
+# ─────────────────────────────────────────────────────────────────────────────
+class PandasBackend:
+    """The in-memory DataFrame — the behaviour the explorer has always had."""
+    name = "pandas"
+
+    def __init__(self, df: pd.DataFrame, sort_index: SortIndex | None = None):
+        self.df = df
+        self.version = df.attrs.get("version", "")
+        self.sort_index = sort_index or SortIndex(df)
+        self._text = searchable_text(df)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def select(self, filters: dict, sort_by: str) -> CachedSelection:
+        return compute_selection(self.df, filters, sort_by, self.sort_index)
+
+    def rows(self, ids: np.ndarray) -> pd.DataFrame:
+        return self.df.loc[ids]
+
+    def facets(self) -> dict:
+        return build_facets(self.df)
+
+    def pre_filter(self, keywords: list[str], limit: int) -> pd.DataFrame:
+        scores = relevance_scores(self.df, keywords, self._text)
+        order = (-scores).argsort(kind="stable")
+        matched = self.df.iloc[order[scores[order] > 0]]
+        return (matched if not matched.empty else self.df).head(limit)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SQL (shared by SQLite and DuckDB)
+# ─────────────────────────────────────────────────────────────────────────────
+_NUMERIC_COLUMNS = ("id", "duration_hours", "updated_at")
+
+
+def _to_records(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Normalized catalogue chunk → database column types (every other column is text)."""
+    out = chunk.reset_index(drop=True).copy()
+    text_cols = [c for c in out.columns if c not in _NUMERIC_COLUMNS + ("skill_tags",)]
+    out[text_cols] = out[text_cols].astype(object).where(out[text_cols].notna(), None)
+    out["id"] = out["id"].astype("int64")
+    out["duration_hours"] = pd.to_numeric(out["duration_hours"], errors="coerce")
+    out["updated_at"] = out["updated_at"].map(lambda ts: ts.timestamp() if pd.notna(ts) else None).astype(float)
+    out["skill_tags"] = out["skill_tags"].map(lambda tags: json.dumps(list(tags or []), ensure_ascii=False))
+    out["title_key"] = out["title"].map(_collation_key)
+    return out
+
+
+def _from_records(rows: pd.DataFrame) -> pd.DataFrame:
+    """Database rows → the DataFrame shape the explorer renders."""
+    rows = rows.drop(columns=["title_key"], errors="ignore")
+    text_cols = [c for c in rows.columns if c not in _NUMERIC_COLUMNS + ("skill_tags",)]
+    rows[text_cols] = rows[text_cols].astype(object).where(rows[text_cols].notna(), np.nan)
+    rows["updated_at"] = pd.to_datetime(rows["updated_at"], unit="s")
+    rows["skill_tags"] = rows["skill_tags"].map(lambda s: json.loads(s) if s else [])
+    return rows.set_index("id", drop=False).rename_axis(None)
+
+
+class _SQLBackend:
+    """Filter/sort/aggregate pushdown; subclasses supply the dialect specifics."""
+    name = ""
+    placeholder = "?"
+
+    def __init__(self, db_path: str, version: str):
+        self.db_path = db_path
+        self.version = version
+        self._local = threading.local()
+        self._columns = [r[0] for r in self._query("SELECT * FROM courses LIMIT 0", describe=True)]
+        self._size = self._query("SELECT COUNT(*) FROM courses")[0][0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    # Subclass hooks -----------------------------------------------------------
+    def _connection(self):
+        raise NotImplementedError
+
+    def _search_clause(self, search: str) -> tuple[str, list]:
+        """WHERE fragment (and params) matching the search box text."""
+        raise NotImplementedError
+
+    def _relevance(self, search: str) -> tuple[str, list]:
+        """ORDER BY expression (and params) ranking the best match first."""
+        raise NotImplementedError
+
+    def _keyword_query(self, keywords: list[str], limit: int) -> tuple[str, list]:
+        raise NotImplementedError
+
+    # Shared -------------------------------------------------------------------
+    def _query(self, sql: str, params: list | tuple = (), describe: bool = False):
+        cursor = self._connection().cursor()
+        cursor.execute(sql, list(params))
+        if describe:
+            return cursor.description
+        return cursor.fetchall()
+
+    def _frame(self, sql: str, params: list) -> pd.DataFrame:
+        return pd.DataFrame(self._query(sql, params), columns=self._columns)
+
+    def _where(self, filters: dict) -> tuple[str, list]:
+        clauses, params = [], []
+        if filters["search"]:
+            clause, search_params = self._search_clause(filters["search"])
+            clauses.append(clause)
+            params += search_params
+        for col, key in [("domain", "domains"), ("focus_area", "focus"), ("level", "levels"),
+                         ("journey_stage", "journey"), ("platform", "platforms")]:
+            if filters[key]:
+                clauses.append(f"{col} IN ({', '.join(self.placeholder for _ in filters[key])})")
+                params += list(filters[key])
+        if filters["formats"]:
+            clauses.append(f"lower(format) IN ({', '.join(self.placeholder for _ in filters['formats'])})")
+            params += list(filters["formats"])
+        if filters["duration"] is not None:
+            # Rows without a parsed duration stay in, as in the pandas path
+            clauses.append(f"(duration_hours IS NULL OR duration_hours BETWEEN {self.placeholder} "
+                           f"AND {self.placeholder})")
+            params += list(filters["duration"])
+        if not filters["show_no_link"]:
+            clauses.append("(lms_link IS NOT NULL AND trim(lms_link) <> '')")
+        return (" AND ".join(clauses) or "1=1"), params
+
+    def _order_by(self, filters: dict, sort_by: str) -> tuple[str, list]:
+        """ORDER BY matching SortIndex: missing values last, ties in catalogue order."""
+        key = SORT_KEYS.get(sort_by)
+        if key is None:
+            if sort_by == "Relevance" and filters["search"]:
+                expr, params = self._relevance(filters["search"])
+                return f"{expr}, id", params
+            return "id", []
+        column = {"duration": "duration_hours", "title": "title_key", "recency": "updated_at"}[key[0]]
+        direction = "DESC" if key[1] else "ASC"
+        if column == "title_key":
+            return f"title_key {direction}, id", []
+        return f"{column} IS NULL, {column} {direction}, id", []
+
+    def select(self, filters: dict, sort_by: str) -> CachedSelection:
+        where, params = self._where(filters)
+        order, order_params = self._order_by(filters, sort_by)
+        ids = np.array([r[0] for r in self._query(f"SELECT id FROM courses WHERE {where} ORDER BY {order}",
+                                                  params + order_params)], dtype=np.int64)
+
+        def top(col: str, limit: int) -> list:
+            return [r[0] for r in self._query(
+                f"SELECT {col} FROM courses WHERE {where} AND {col} IS NOT NULL "
+                f"GROUP BY {col} ORDER BY COUNT(*) DESC, {col} LIMIT {limit}", params)]
+
+        avg = self._query(f"SELECT AVG(duration_hours) FROM courses WHERE {where}", params)[0][0]
+        platform, level = top("platform", 1), top("level", 1)
+        return CachedSelection(ids, {
+            "count":           len(ids),
+            "top_focus_areas": [r[0] for r in self._query(
+                f"SELECT focus_area FROM courses WHERE {where} AND focus_area IS NOT NULL "
+                f"GROUP BY focus_area ORDER BY COUNT(*) DESC, MIN(id) LIMIT 5", params)],
+            "avg_duration":    None if avg is None else float(avg),
+            "top_platform":    platform[0] if platform else "N/A",
+            "top_level":       level[0] if level else "N/A",
+        })
+
+    def rows(self, ids: np.ndarray) -> pd.DataFrame:
+        """Rows for `ids`, in that order (fetch a page at a time)."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return _from_records(self._frame("SELECT * FROM courses LIMIT 0", []))
+        frames = []
+        for lo in range(0, len(ids), 500):  # stay under bound-parameter limits
+            batch = ids[lo:lo + 500]
+            frames.append(self._frame(
+                f"SELECT * FROM courses WHERE id IN ({', '.join(self.placeholder for _ in batch)})", batch))
+        return _from_records(pd.concat(frames)).loc[ids]
+
+    def facets(self) -> dict:
+        facets = {col: sorted(r[0] for r in self._query(
+            f"SELECT DISTINCT {col} FROM courses WHERE {col} IS NOT NULL AND {col} <> ''")) for col in FACET_COLS}
+        lo, hi = self._query("SELECT MIN(duration_hours), MAX(duration_hours) FROM courses")[0]
+        facets["duration_range"] = (float(lo), float(hi)) if lo is not None else None
+        return facets
+
+    def pre_filter(self, keywords: list[str], limit: int) -> pd.DataFrame:
+        sql, params = self._keyword_query(keywords, limit)
+        matched = self._frame(sql, params) if keywords else self._frame("SELECT * FROM courses LIMIT 0", [])
+        if matched.empty:
+            matched = self._frame(f"SELECT * FROM courses ORDER BY id LIMIT {int(limit)}", [])
+        return _from_records(matched)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SQLITE + FTS5
+# ─────────────────────────────────────────────────────────────────────────────
+# The search box matches title and descriptions, as in catalogue.filter_ids;
+# bm25 weighs title hits 3× like catalogue.relevance_scores
+_SEARCH_COLUMNS = "{title short_description full_description} : "
+_SEARCH_TEXT = ["title", "short_description", "full_description"]
+_FTS_WEIGHTS = ", ".join(str(w) for w in FTS_WEIGHTS)
+
+
+def _fts_phrase(text: str) -> str:
+    """Search box text → FTS5 phrase query with a prefix match on the last word."""
+    words = re.findall(r"\w+", text.lower())
+    return f'"{" ".join(words)}" *' if words else ""
+
+
+def _has_symbols(text: str) -> bool:
+    """unicode61 drops symbols ("c++" indexes as "c"), so such searches skip FTS5."""
+    return re.search(r"[^\w\s]", text) is not None
+
+
+def _sqlite_contains(col: str) -> str:
+    return f"instr(lower(coalesce({col}, '')), ?) > 0"
+
+
+class SQLiteBackend(_SQLBackend):
+    name = "sqlite"
+
+    def _connection(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.con = con
+        return con
+
+    def _search_clause(self, search: str):
+        if _has_symbols(search):  # substring match, as in catalogue.filter_ids
+            return (f"({' OR '.join(_sqlite_contains(c) for c in _SEARCH_TEXT)})",
+                    [search] * len(_SEARCH_TEXT))
+        phrase = _fts_phrase(search)
+        if not phrase:
+            return "0", []
+        return "id IN (SELECT rowid FROM courses_fts WHERE courses_fts MATCH ?)", [_SEARCH_COLUMNS + phrase]
+
+    def _relevance(self, search: str):
+        if _has_symbols(search):
+            expr, params = _substring_score(search.split(), _sqlite_contains)
+            return f"-({expr})", params
+        return (f"(SELECT bm25(courses_fts, {_FTS_WEIGHTS}) FROM courses_fts "
+                f"WHERE courses_fts MATCH ? AND courses_fts.rowid = courses.id)",
+                [_SEARCH_COLUMNS + _fts_phrase(search)])
+
+    def _keyword_query(self, keywords: list[str], limit: int):
+        terms = " OR ".join(f'"{w}" *' for kw in keywords for w in re.findall(r"\w+", kw.lower()))
+        return (f"SELECT courses.* FROM courses_fts JOIN courses ON courses.id = courses_fts.rowid "
+                f"WHERE courses_fts MATCH ? ORDER BY bm25(courses_fts, {_FTS_WEIGHTS}), courses.id "
+                f"LIMIT {int(limit)}",
+                [terms or '""'])
+
+    @staticmethod
+    def build(chunks: Iterable[pd.DataFrame], db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        tmp_path = f"{db_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        con = sqlite3.connect(tmp_path)
+        try:
+            created = False
+            for chunk in chunks:
+                records = _to_records(chunk)
+                if not created:
+                    cols = ", ".join(f"{_quote(c)} {_sqlite_type(c)}" for c in records.columns)
+                    con.execute(f"CREATE TABLE courses ({cols})")
+                    created = True
+                con.executemany(f"INSERT INTO courses VALUES ({', '.join('?' for _ in records.columns)})",
+                                records.itertuples(index=False, name=None))
+            if not created:
+                raise ValueError("catalogue has no rows")
+            for col in ["domain", "focus_area", "level", "journey_stage", "platform", "title_key",
+                        "duration_hours", "updated_at"]:
+                con.execute(f"CREATE INDEX idx_{col} ON courses ({col})")
+            con.execute(f"CREATE VIRTUAL TABLE courses_fts USING fts5({', '.join(FTS_COLUMNS)}, "
+                        f"content='courses', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+            con.execute("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+            con.commit()
+        finally:
+            con.close()
+        os.replace(tmp_path, db_path)
+
+
+def _quote(name: str) -> str:
+    """SQL identifier for a column name (source columns may contain spaces or quotes)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sqlite_type(column: str) -> str:
+    return {"id": "INTEGER PRIMARY KEY", "duration_hours": "REAL", "updated_at": "REAL"}.get(column, "TEXT")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DUCKDB
+# ─────────────────────────────────────────────────────────────────────────────
+class DuckDBBackend(_SQLBackend):
+    """Columnar scans; search matches substrings like the pandas path."""
+    name = "duckdb"
+
+    def __init__(self, db_path: str, version: str):
+        import duckdb
+
+        # One database handle per process; each thread queries through its own cursor
+        self._root = duckdb.connect(db_path, read_only=True)
+        super().__init__(db_path, version)
+
+    def _connection(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = self._root.cursor()
+        return con
+
+    def _search_clause(self, search: str):
+        return (f"({' OR '.join(_duckdb_contains(c) for c in _SEARCH_TEXT)})", [search] * len(_SEARCH_TEXT))
+
+    def _relevance(self, search: str):
+        expr, params = _substring_score(search.split(), _duckdb_contains)
+        return f"-({expr})", params
+
+    def _keyword_query(self, keywords: list[str], limit: int):
+        score, params = _substring_score([kw.lower() for kw in keywords], _duckdb_contains)
+        return (f"SELECT * EXCLUDE (score) FROM (SELECT *, {score} AS score FROM courses) "
+                f"WHERE score > 0 ORDER BY score DESC, id LIMIT {int(limit)}", params)
+
+    @staticmethod
+    def build(chunks: Iterable[pd.DataFrame], db_path: str):
+        import duckdb
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        tmp_path = f"{db_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        con = duckdb.connect(tmp_path)
+        try:
+            created = False
+            for chunk in chunks:
+                records = _to_records(chunk)  # noqa: F841 — read by DuckDB's replacement scan
+                if not created:
+                    con.execute("CREATE TABLE courses AS SELECT * FROM records")
+                    created = True
+                else:
+                    con.execute("INSERT INTO courses SELECT * FROM records")
+            if not created:
+                raise ValueError("catalogue has no rows")
+            con.execute("CHECKPOINT")
+        finally:
+            con.close()
+        os.replace(tmp_path, db_path)
+
+
+def _duckdb_contains(col: str) -> str:
+    return f"contains(lower(coalesce({col}, '')), ?)"
+
+
+def _substring_score(terms: list[str], contains) -> tuple[str, list]:
+    """SQL twin of catalogue.relevance_scores: weighted count of (column, term) substring hits.
+    `contains(col)` is the dialect's one-parameter substring test."""
+    parts, params = [], []
+    for col in RELEVANCE_COLUMNS:
+        for term in terms:
+            parts.append(f"{3 if col == 'title' else 1} * CAST({contains(col)} AS INTEGER)")
+            params.append(term)
+    return " + ".join(parts) or "0", params
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FACTORY
+# ─────────────────────────────────────────────────────────────────────────────
+_SQL_BACKENDS = {"sqlite": (SQLiteBackend, ".sqlite"), "duckdb": (DuckDBBackend, ".duckdb")}
+
+
+def database_path(kind: str, version: str, source: str = config.DATA_FILE) -> str:
+    snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(source)), config.INGEST_SNAPSHOT_DIR)
+    return os.path.join(snapshot_dir, f"catalogue-{version}{_SQL_BACKENDS[kind][1]}")
+
+
+def open_backend(kind: str = config.STORAGE_BACKEND, df: pd.DataFrame | None = None,
+                 source: str | None = None, sort_index: SortIndex | None = None):
+    """Backend of `kind` over a loaded catalogue `df` or, for SQL kinds, a CSV `source`.
+
+    With only `source`, the database is built by streaming the CSV through
+    ingest.iter_normalized_chunks, so the catalogue never has to fit in memory.
+    """
+    if kind == "pandas":
+        if df is None:
+            raise ValueError("the pandas backend needs a loaded catalogue")
+        return PandasBackend(df, sort_index)
+    if kind not in _SQL_BACKENDS:
+        raise ValueError(f"unknown storage backend {kind!r} (choose from {BACKENDS})")
+
+    cls, _ = _SQL_BACKENDS[kind]
+    if df is not None:
+        version, chunks = df.attrs["version"], lambda: [df]
+    else:
+        from catalogue import file_version
+        from ingest import iter_normalized_chunks
+        version = file_version(source)
+        chunks = lambda: iter_normalized_chunks(source)
+    path = database_path(kind, version, source or config.DATA_FILE)
+    if not os.path.exists(path):
+        cls.build(chunks(), path)
+    return cls(path, version)
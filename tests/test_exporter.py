@@ -0,0 +1,24 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import config
+import exporter
+
+
+def test_jsonl_export_is_valid_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "EXPORT_CHUNK_ROWS", 3)
+    df = pd.DataFrame({
+        "title": [f"Course {i}" for i in range(10)],
+        "duration_hours": np.arange(10, dtype=float),
+    })
+
+    path = exporter.build_export(df, df.index.to_numpy(), "jsonl-chunks", "JSON Lines")
+
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    assert len(lines) == 10
+    records = [json.loads(line) for line in lines]
+    assert [r["title"] for r in records] == list(df["title"])
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from catalogue import RAW_COLS
+from federation import federate
+
+
+def _source(name, rows):
+    frame = pd.DataFrame([{col: pd.NA for col in RAW_COLS} | row for row in rows], columns=list(RAW_COLS))
+    frame["_source"] = name
+    frame["_source_row"] = frame.index
+    return frame
+
+
+OUTCOMES = "probability distributions sampling hypothesis testing regression inference for analysts"
+
+
+def test_chained_duplicates_do_not_merge_distinct_courses():
+    # x matches A by URL and B by text: it may fold into one of them, never join them
+    primary = _source("curation", [
+        {"Resource title": "Statistical Reasoning", "URL": "https://a.example/stats-reasoning",
+         "Stated learning outcomes": "reasoning about uncertainty in everyday decisions"},
+        {"Resource title": "Probability and Statistics", "URL": "https://b.example/prob-stats",
+         "Stated learning outcomes": OUTCOMES},
+    ])
+    backup = _source("backup", [
+        {"Resource title": "Probability and Statistics", "URL": "https://a.example/stats-reasoning",
+         "Stated learning outcomes": OUTCOMES, "Length (mins)": "90"},
+        {"Resource title": "Probability and Statistics", "URL": "https://b.example/prob-stats/",
+         "Stated learning outcomes": OUTCOMES, "Indicated level": "Beginner"},
+    ])
+    merged, report = federate([primary, backup])
+
+    assert report["output_rows"] == 2
+    a, b = merged.set_index("Resource title").loc[["Statistical Reasoning", "Probability and Statistics"]].to_dict("records")
+    assert a["sources"] == "curation:0; backup:0"
+    assert b["sources"] == "curation:1; backup:1"
+    assert a["Length (mins)"] == "90"
+    assert pd.isna(b["Length (mins)"])
+    assert b["Indicated level"] == "Beginner"
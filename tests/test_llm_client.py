@@ -0,0 +1,31 @@
+import threading
+
+import pytest
+
+import llm_client
+from llm_client import LLMUnavailable
+
+
+def test_coalesced_followers_raise_when_the_leader_fails(monkeypatch):
+    leading, following = threading.Event(), threading.Event()
+
+    def failing_tiered(*args):
+        leading.set()
+        following.wait(5)
+        raise RuntimeError("malformed response")
+
+    def bump(stage, path, n=1):
+        if path == "coalesced":
+            following.set()
+
+    monkeypatch.setattr(llm_client, "_tiered", failing_tiered)
+    monkeypatch.setattr(llm_client, "_bump", bump)
+    messages = [{"role": "user", "content": "rank these"}]
+    call = lambda: llm_client._complete_coalesced("ranking", messages, 0.0, 64, True, None, None)
+
+    leader = threading.Thread(target=lambda: pytest.raises(RuntimeError, call))
+    leader.start()
+    assert leading.wait(5)
+    with pytest.raises(LLMUnavailable, match="malformed response"):
+        call()
+    leader.join(5)
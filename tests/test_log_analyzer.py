@@ -0,0 +1,19 @@
+from log_analyzer import LogAnalyzer
+
+
+def _search(results, **facets):
+    return {"type": "search", "query": "q", "results": results, "facets": facets}
+
+
+def test_zero_results_are_keyed_on_facet_values():
+    shard = LogAnalyzer().consume([
+        _search(0, levels=["Advanced"], domains=["Cybersecurity"]),
+        _search(4, domains=["Cybersecurity"], levels=["Advanced"]),
+        _search(0, domains=["Data Science"], levels=["Advanced"]),
+    ])
+    other = LogAnalyzer().consume([_search(0, domains=["Cybersecurity"], levels=["Advanced"])])
+    rows = {r["facets"]: r for r in shard.merge(other).report()["zero_results_by_facets"]}
+
+    assert rows["domains=Cybersecurity|levels=Advanced"] == {
+        "facets": "domains=Cybersecurity|levels=Advanced", "searches": 3, "zero_results": 2, "rate": 2 / 3}
+    assert rows["domains=Data Science|levels=Advanced"]["rate"] == 1.0
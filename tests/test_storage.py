@@ -0,0 +1,68 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+import config
+from catalogue import canonical_filters, load_catalogue
+from storage import open_backend
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), config.DATA_FILE)
+
+SEARCHES = ["", "python", "data science", "c++", "c#", "security"]
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    patch = pytest.MonkeyPatch()
+    patch.setattr(config, "INGEST_SNAPSHOT_DIR", str(tmp_path_factory.mktemp("snapshots")))
+    df = load_catalogue(SOURCE)
+    found = {
+        "pandas": open_backend("pandas", df),
+        # Built straight from the CSV, raw columns such as "Faculty comments" included
+        "sqlite": open_backend("sqlite", source=SOURCE),
+    }
+    if importlib.util.find_spec("duckdb") is not None:
+        found["duckdb"] = open_backend("duckdb", df)
+    yield found
+    patch.undo()
+
+
+def _selections(backends):
+    df = backends["pandas"].df
+    domain = df["domain"].value_counts().index[0]
+    yield canonical_filters()
+    yield canonical_filters(levels=["Beginner"], show_no_link=False)
+    yield canonical_filters("data", domains=[domain], duration=(1.0, 10.0),
+                            duration_range=backends["pandas"].facets()["duration_range"])
+    for search in SEARCHES:
+        yield canonical_filters(search)
+
+
+@pytest.mark.parametrize("sort_by", config.SORT_OPTIONS)
+def test_select_matches_pandas(backends, sort_by):
+    for filters in _selections(backends):
+        expected = backends["pandas"].select(filters, sort_by)
+        for name, backend in backends.items():
+            got = backend.select(filters, sort_by)
+            label = f"{name}: {filters}"
+            if name == "sqlite" and filters["search"].replace(" ", "").isalnum():
+                # FTS5 matches whole words and word prefixes, not any substring
+                # ("security" misses "cybersecurity"), and ranks by bm25
+                assert set(got.ids) <= set(expected.ids), label
+                continue
+            np.testing.assert_array_equal(got.ids, expected.ids, err_msg=label)
+            aggregates, reference = got.aggregates, expected.aggregates
+            assert aggregates["count"] == reference["count"], label
+            assert aggregates["top_platform"] == reference["top_platform"], label
+            assert aggregates["top_level"] == reference["top_level"], label
+            assert aggregates["avg_duration"] == pytest.approx(reference["avg_duration"]), label
+
+
+def test_symbol_search_matches_substrings(backends):
+    filters = canonical_filters("c++")
+    expected = backends["pandas"].select(filters, "Title (A-Z)").ids
+    assert 0 < len(expected) < 10
+    for backend in backends.values():
+        np.testing.assert_array_equal(backend.select(filters, "Title (A-Z)").ids, expected)
@@ -0,0 +1,75 @@
+import itertools
+
+import pandas as pd
+
+from tutor_assignment import _NOT_PREFERRED_PENALTY, _UNASSIGNED_COST, _quality, assign_tutors
+from tutor_availability import parse_availability
+from tutor_index import TutorIndex
+
+
+def _tutors(rows):
+    tutors = pd.DataFrame(rows, columns=["tutor_id", "tutor_name", "expertise_tags", "capacity"])
+    tutors["availability_summary"] = ""
+    tutors["booking_link"] = ""
+    tutors["expertise_list"] = tutors["expertise_tags"].apply(lambda tags: [t.strip() for t in tags.split(",")])
+    tutors["availability"] = tutors["availability_summary"].apply(parse_availability)
+    return tutors
+
+
+TUTORS = _tutors([
+    ("1", "Ada", "Data Science, Statistics", "2"),
+    ("2", "Ben", "Cybersecurity", "1"),
+    ("3", "Cy", "Data Analytics, Networking", "2"),
+])
+
+ROSTER = pd.DataFrame({
+    "student": ["s1", "s2", "s3", "s4", "s5", "s6"],
+    "focus_areas": [["Data Science"], ["Statistics", "Data Science"], ["Data Science", "Statistics"],
+                    ["Cybersecurity"], ["Networking", "Cybersecurity"], ["Data Analytics"]],
+    "preferred_tutors": [[], ["Cy"], [], ["2"], [], []],
+})
+
+
+def _cost(index, roster, tutor_ids):
+    """Objective of an assignment, as the flow network prices it (None: infeasible)."""
+    total = 0
+    for areas, prefs, tutor_id in zip(roster["focus_areas"], roster["preferred_tutors"], tutor_ids):
+        if not tutor_id:
+            total += _UNASSIGNED_COST
+            continue
+        quality = _quality(index, tuple(sorted(areas))).get(tutor_id)
+        if quality is None:
+            return None
+        names = dict(zip(TUTORS["tutor_id"], TUTORS["tutor_name"]))
+        preferred = tutor_id in prefs or names[tutor_id] in prefs
+        total += round(100 * (1 - quality[0])) + (0 if preferred else _NOT_PREFERRED_PENALTY)
+    return total
+
+
+def test_assignment_respects_capacity_and_is_optimal():
+    index = TutorIndex(TUTORS)
+    result = assign_tutors(ROSTER, TUTORS, index, default_capacity=1)
+
+    capacity = dict(zip(TUTORS["tutor_id"], TUTORS["capacity"].astype(int)))
+    load = result.loc[result["status"] == "assigned", "tutor_id"].value_counts()
+    assert all(load.get(tutor_id, 0) <= cap for tutor_id, cap in capacity.items())
+
+    best = None
+    for choice in itertools.product(["", *capacity], repeat=len(ROSTER)):
+        if any(choice.count(tutor_id) > cap for tutor_id, cap in capacity.items()):
+            continue
+        cost = _cost(index, ROSTER, choice)
+        if cost is not None and (best is None or cost < best):
+            best = cost
+    assert _cost(index, ROSTER, list(result["tutor_id"])) == best
+    assert (result["status"] == "assigned").sum() == sum(capacity.values())
+
+
+def test_focus_area_order_does_not_split_groups():
+    index = TutorIndex(TUTORS)
+    roster = pd.DataFrame({"student": ["a", "b"],
+                           "focus_areas": [["Statistics", "Networking"], ["Networking", "Statistics"]],
+                           "preferred_tutors": [[], []]})
+    result = assign_tutors(roster, TUTORS, index)
+    assert list(result["status"]) == ["assigned", "assigned"]
+    assert set(result["matched_focus"]) <= {"Statistics", "Networking"}
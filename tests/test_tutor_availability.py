@@ -0,0 +1,37 @@
+import os
+
+from tutor_availability import AvailabilityIndex, format_window, parse_availability, parse_time_window
+from tutor_index import TutorIndex, read_tutors
+
+TUTORS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tutors.csv")
+
+AVAILABILITY = {
+    "1": parse_availability("Available Mon-Fri 2-6pm EST"),
+    "2": parse_availability("Available Tue/Thu 3-7pm EST"),
+    "3": parse_availability("Available Mon/Wed/Fri 4-8pm EST"),
+}
+
+
+def test_day_only_query_matches_any_time_that_day():
+    window = parse_time_window("tutor for Networking on Wednesday")
+    assert window == (2, None, None)
+    assert format_window(*window) == "Wed (any time)"
+    assert AvailabilityIndex(AVAILABILITY).available(*window) == {"1", "3"}
+
+
+def test_day_only_query_through_tutor_index():
+    index = TutorIndex(read_tutors(TUTORS_CSV), [])
+    found = index.find("Networking", parse_time_window("tutor for Networking on Wednesday"))
+    assert {tutor_id for tutor_id, _ in found} == {"3", "4"}
+
+
+def test_weekday_abbreviation_inside_a_word_is_not_a_day():
+    assert parse_time_window("common questions about the course") is None
+    assert parse_time_window("I followed the Python track") is None
+    assert parse_time_window("a saturated market at 5") is None
+
+
+def test_timed_window_still_requires_the_whole_window():
+    index = AvailabilityIndex(AVAILABILITY)
+    assert index.available(*parse_time_window("Tuesday 3-5pm")) == {"1", "2"}
+    assert index.available(*parse_time_window("Wed 5-7pm")) == {"3"}
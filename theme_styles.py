@@ -1,32 +1,133 @@
 """
 Theme styles for Course Explorer
-Provides dark and light theme CSS
+One static stylesheet built on CSS custom properties; dark and light are
+just variable sets selected by the `data-theme` attribute on <html>.
+The stylesheet is injected into the page once per session (keyed by its
+hash) and the theme toggle flips the attribute client-side, so switching
+themes never re-renders anything on the server.
 """
+import hashlib
+import json
 
-def get_theme_css(theme='dark'):
-    """Returns CSS based on selected theme"""
-    
-    if theme == 'light':
-        return """
-<style>
-/* ── Fonts ── */
+# ─────────────────────────────────────────────────────────────────────────────
+# PALETTES
+# ─────────────────────────────────────────────────────────────────────────────
+PALETTES = {
+    "dark": {
+        "bg":                 "#0f1117",
+        "text":               "#e4e4e7",
+        "sidebar-bg":         "#161b22",
+        "sidebar-border":     "#21262d",
+        "header-bg":          "linear-gradient(135deg, #1e293b 0%, #0f172a 100%)",
+        "header-border":      "#334155",
+        "accent-gradient":    "linear-gradient(90deg, #6ee7b7, #3b82f6)",
+        "muted":              "#94a3b8",
+        "stat-bg":            "linear-gradient(135deg, #1f2937 0%, #111827 100%)",
+        "stat-border":        "#374151",
+        "stat-shadow":        "rgba(0,0,0,.3)",
+        "stat-label":         "#9ca3af",
+        "card-bg":            "linear-gradient(135deg, #1e293b 0%, #0f172a 100%)",
+        "card-border":        "#334155",
+        "card-glow":          "rgba(99,102,241,.25)",
+        "card-title":         "#f1f5f9",
+        "card-description":   "#cbd5e1",
+        "badge-domain-bg":    "#1d4ed8", "badge-domain-fg":   "#bfdbfe",
+        "badge-level-bg":     "#065f46", "badge-level-fg":    "#a7f3d0",
+        "badge-format-bg":    "#6d28d9", "badge-format-fg":   "#ddd6fe",
+        "badge-skill-bg":     "#92400e", "badge-skill-fg":    "#fde68a",
+        "badge-skill-border": "#78350f",
+        "badge-journey-bg":   "#be185d", "badge-journey-fg":  "#fce7f3",
+        "badge-platform-bg":  "#0e7490", "badge-platform-fg": "#a5f3fc",
+        "filter-bg":          "#1a1f2e",
+        "info-fg":            "#93c5fd",
+        "toggle-bg":          "#1e293b",
+        "toggle-border":      "#334155",
+        "toggle-shadow":      "rgba(0,0,0,.3)",
+        "toggle-shadow-hover": "rgba(0,0,0,.5)",
+        "button-gradient":    "linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%)",
+        "button-hover-shadow": "0 8px 24px rgba(99, 102, 241, 0.4)",
+        "chat-text":          "#ffffff",
+        "chat-card-bg":       "#1a1d2e",
+        "chat-card-border":   "#374151",
+        "chat-level-bg":      "#1e3a5f", "chat-level-fg":     "#93c5fd",
+        "chat-duration-bg":   "#1e2e22", "chat-duration-fg":  "#86efac",
+        "chat-format-bg":     "#2d1b4e", "chat-format-fg":    "#c4b5fd",
+        "chat-platform-bg":   "#1c2538", "chat-platform-fg":  "#7dd3fc",
+    },
+    "light": {
+        "bg":                 "#f8fafc",
+        "text":               "#1e293b",
+        "sidebar-bg":         "#ffffff",
+        "sidebar-border":     "#e2e8f0",
+        "header-bg":          "linear-gradient(135deg, #e0e7ff 0%, #dbeafe 100%)",
+        "header-border":      "#c7d2fe",
+        "accent-gradient":    "linear-gradient(90deg, #059669, #2563eb)",
+        "muted":              "#64748b",
+        "stat-bg":            "linear-gradient(135deg, #ffffff 0%, #f1f5f9 100%)",
+        "stat-border":        "#e2e8f0",
+        "stat-shadow":        "rgba(0,0,0,.1)",
+        "stat-label":         "#64748b",
+        "card-bg":            "linear-gradient(135deg, #ffffff 0%, #f8fafc 100%)",
+        "card-border":        "#e2e8f0",
+        "card-glow":          "rgba(99,102,241,.15)",
+        "card-title":         "#0f172a",
+        "card-description":   "#475569",
+        "badge-domain-bg":    "#dbeafe", "badge-domain-fg":   "#1e40af",
+        "badge-level-bg":     "#d1fae5", "badge-level-fg":    "#065f46",
+        "badge-format-bg":    "#e9d5ff", "badge-format-fg":   "#6b21a8",
+        "badge-skill-bg":     "#fef3c7", "badge-skill-fg":    "#92400e",
+        "badge-skill-border": "#fbbf24",
+        "badge-journey-bg":   "#fce7f3", "badge-journey-fg":  "#9f1239",
+        "badge-platform-bg":  "#cffafe", "badge-platform-fg": "#0e7490",
+        "filter-bg":          "#f1f5f9",
+        "info-fg":            "#1e40af",
+        "toggle-bg":          "#ffffff",
+        "toggle-border":      "#e2e8f0",
+        "toggle-shadow":      "rgba(0,0,0,.1)",
+        "toggle-shadow-hover": "rgba(0,0,0,.15)",
+        "button-gradient":    "linear-gradient(135deg, #3b82f6 0%, #6366f1 100%)",
+        "button-hover-shadow": "0 8px 24px rgba(59, 130, 246, 0.3)",
+        "chat-text":          "#1e293b",
+        "chat-card-bg":       "#f1f5f9",
+        "chat-card-border":   "#e2e8f0",
+        "chat-level-bg":      "#dbeafe", "chat-level-fg":     "#1d4ed8",
+        "chat-duration-bg":   "#dcfce7", "chat-duration-fg":  "#166534",
+        "chat-format-bg":     "#f3e8ff", "chat-format-fg":    "#7c3aed",
+        "chat-platform-bg":   "#e0f2fe", "chat-platform-fg":  "#0369a1",
+    },
+}
+
+DEFAULT_THEME = "dark"
+
+
+def _variables(theme: str) -> str:
+    return "\n".join(f"    --{name}: {value};" for name, value in PALETTES[theme].items())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STYLESHEET (theme-independent rules)
+# ─────────────────────────────────────────────────────────────────────────────
+_FONTS = """/* ── Fonts ── */
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+"""
+
+_RULES = """
 html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
 
 /* ── Global background ── */
-.stApp { background: #f8fafc; color: #1e293b; }
+.stApp { background: var(--bg); color: var(--text); }
 
 /* ── Sidebar ── */
 section[data-testid="stSidebar"] {
-    background: #ffffff;
-    border-right: 1px solid #e2e8f0;
+    background: var(--sidebar-bg);
+    border-right: 1px solid var(--sidebar-border);
 }
 section[data-testid="stSidebar"] h2,
 section[data-testid="stSidebar"] label,
 section[data-testid="stSidebar"] p {
-    color: #1e293b !important;
+    color: var(--text) !important;
 }
-section[data-testid="stSidebar"] .block-container { 
+section[data-testid="stSidebar"] .block-container {
     padding-top: 1.5rem;
     padding-bottom: 2rem;
 }
@@ -54,8 +155,8 @@ section[data-testid="stSidebar"] > div:first-child {
 
 /* ── Header ── */
 .main-header {
-    background: linear-gradient(135deg, #e0e7ff 0%, #dbeafe 100%);
-    border: 1px solid #c7d2fe;
+    background: var(--header-bg);
+    border: 1px solid var(--header-border);
     border-radius: 16px;
     padding: 1.5rem 2rem;
     margin-bottom: 1.5rem;
@@ -63,13 +164,13 @@ section[data-testid="stSidebar"] > div:first-child {
 .main-header h1 {
     font-size: 2rem;
     font-weight: 700;
-    background: linear-gradient(90deg, #059669, #2563eb);
+    background: var(--accent-gradient);
     -webkit-background-clip: text;
     -webkit-text-fill-color: transparent;
     margin: 0;
 }
 .main-header .subtitle {
-    color: #64748b;
+    color: var(--muted);
     font-size: 0.9rem;
     margin-top: 0.5rem;
 }
@@ -78,8 +179,8 @@ section[data-testid="stSidebar"] > div:first-child {
 .stat-row { display: flex; gap: 1rem; margin-bottom: 1.5rem; flex-wrap: wrap; }
 .stat-card {
     flex: 1; min-width: 140px;
-    background: linear-gradient(135deg, #ffffff 0%, #f1f5f9 100%);
-    border: 1px solid #e2e8f0;
+    background: var(--stat-bg);
+    border: 1px solid var(--stat-border);
     border-radius: 12px;
     padding: 1rem 1.25rem;
     text-align: center;
@@ -87,19 +188,19 @@ section[data-testid="stSidebar"] > div:first-child {
 }
 .stat-card:hover {
     transform: translateY(-2px);
-    box-shadow: 0 4px 12px rgba(0,0,0,.1);
+    box-shadow: 0 4px 12px var(--stat-shadow);
 }
 .stat-card .stat-value {
     font-size: 2rem; font-weight: 700;
-    background: linear-gradient(90deg, #059669, #2563eb);
+    background: var(--accent-gradient);
     -webkit-background-clip: text; -webkit-text-fill-color: transparent;
 }
-.stat-card .stat-label { font-size: 0.75rem; color: #64748b; margin-top: 2px; }
+.stat-card .stat-label { font-size: 0.75rem; color: var(--stat-label); margin-top: 2px; }
 
 /* ── Course card ── */
 .course-card {
-    background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);
-    border: 1px solid #e2e8f0;
+    background: var(--card-bg);
+    border: 1px solid var(--card-border);
     border-radius: 16px;
     padding: 1.25rem 1.4rem 1rem;
     height: 100%;
@@ -109,15 +210,15 @@ section[data-testid="stSidebar"] > div:first-child {
 }
 .course-card:hover {
     border-color: #6366f1;
-    box-shadow: 0 0 20px rgba(99,102,241,.15);
+    box-shadow: 0 0 20px var(--card-glow);
     transform: translateY(-4px);
 }
 .course-card .card-title {
-    font-size: 1rem; font-weight: 600; color: #0f172a;
+    font-size: 1rem; font-weight: 600; color: var(--card-title);
     margin-bottom: .5rem; line-height: 1.3;
 }
 .course-card .card-meta {
-    font-size: 0.78rem; color: #64748b; margin-bottom: .6rem;
+    font-size: 0.78rem; color: var(--muted); margin-bottom: .6rem;
 }
 
 /* ── Badges ── */
@@ -133,16 +234,16 @@ section[data-testid="stSidebar"] > div:first-child {
 .badge:hover {
     transform: scale(1.05);
 }
-.badge-domain  { background:#dbeafe; color:#1e40af; }
-.badge-level   { background:#d1fae5; color:#065f46; }
-.badge-format  { background:#e9d5ff; color:#6b21a8; }
-.badge-skill   { background:#fef3c7; color:#92400e; border:1px solid #fbbf24; }
-.badge-journey { background:#fce7f3; color:#9f1239; }
-.badge-platform { background:#cffafe; color:#0e7490; }
+.badge-domain  { background:var(--badge-domain-bg); color:var(--badge-domain-fg); }
+.badge-level   { background:var(--badge-level-bg); color:var(--badge-level-fg); }
+.badge-format  { background:var(--badge-format-bg); color:var(--badge-format-fg); }
+.badge-skill   { background:var(--badge-skill-bg); color:var(--badge-skill-fg); border:1px solid var(--badge-skill-border); }
+.badge-journey { background:var(--badge-journey-bg); color:var(--badge-journey-fg); }
+.badge-platform { background:var(--badge-platform-bg); color:var(--badge-platform-fg); }
 
 /* ── Description text ── */
 .card-description {
-    font-size: 0.82rem; color: #475569; line-height: 1.55;
+    font-size: 0.82rem; color: var(--card-description); line-height: 1.55;
     margin: .5rem 0 .9rem;
     display: -webkit-box; -webkit-line-clamp: 3;
     -webkit-box-orient: vertical; overflow: hidden;
@@ -156,7 +257,7 @@ details summary { font-size: .85rem !important; }
 
 /* ── Filter section ── */
 .filter-section {
-    background: #f1f5f9;
+    background: var(--filter-bg);
     border-radius: 8px;
     padding: 1rem;
     margin-bottom: 1rem;
@@ -168,7 +269,7 @@ details summary { font-size: .85rem !important; }
     border-left: 3px solid #3b82f6;
     padding: 0.75rem 1rem;
     border-radius: 4px;
-    color: #1e40af;
+    color: var(--info-fg);
     font-size: 0.85rem;
     margin: 1rem 0;
 }
@@ -179,8 +280,8 @@ details summary { font-size: .85rem !important; }
     top: 1rem;
     right: 1rem;
     z-index: 999;
-    background: #ffffff;
-    border: 1px solid #e2e8f0;
+    background: var(--toggle-bg);
+    border: 1px solid var(--toggle-border);
     border-radius: 50%;
     width: 48px;
     height: 48px;
@@ -188,209 +289,110 @@ details summary { font-size: .85rem !important; }
     align-items: center;
     justify-content: center;
     cursor: pointer;
-    box-shadow: 0 2px 8px rgba(0,0,0,.1);
+    box-shadow: 0 2px 8px var(--toggle-shadow);
     transition: all .2s;
 }
 .theme-toggle:hover {
     transform: scale(1.1);
-    box-shadow: 0 4px 12px rgba(0,0,0,.15);
+    box-shadow: 0 4px 12px var(--toggle-shadow-hover);
 }
 
-/* ── Responsive adjustments ── */
-@media (max-width: 768px) {
-    .stat-card { min-width: 100%; }
-    .main-header h1 { font-size: 1.5rem; }
+/* ── Primary buttons (header tutor toggle, View Details) ── */
+.stButton > button[kind="primary"] {
+    background: var(--button-gradient) !important;
+    border: none !important;
+    border-radius: 12px !important;
+    padding: 0.75rem 1.5rem !important;
+    font-weight: 600 !important;
+    font-size: 0.95rem !important;
+    letter-spacing: 0.3px !important;
+    transition: all 0.3s ease !important;
+    box-shadow: 0 4px 12px rgba(99, 102, 241, 0.2) !important;
+}
+.stButton > button[kind="primary"]:hover {
+    transform: translateY(-2px) !important;
+    box-shadow: var(--button-hover-shadow) !important;
 }
-</style>
-"""
-    else:  # dark theme
-        return """
-<style>
-/* ── Fonts ── */
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
 
-/* ── Global background ── */
-.stApp { background: #0f1117; color: #e4e4e7; }
+/* ── Tutor booking ── */
+.stLinkButton > a {
+    background: var(--button-gradient) !important;
+    color: white !important;
+    border: none !important;
+    border-radius: 10px !important;
+    padding: 0.65rem 1.25rem !important;
+    font-weight: 600 !important;
+    font-size: 0.9rem !important;
+    text-decoration: none !important;
+    display: inline-block !important;
+    width: 100% !important;
+    text-align: center !important;
+    transition: all 0.3s ease !important;
+    box-shadow: 0 3px 10px rgba(99, 102, 241, 0.2) !important;
+}
+.stLinkButton > a:hover {
+    transform: translateY(-2px) !important;
+    box-shadow: var(--button-hover-shadow) !important;
+}
+.tutor-card { transition: all 0.3s ease !important; }
+.tutor-card:hover { transform: translateY(-6px) !important; }
+.tutor-label { font-size: 0.8rem; color: var(--muted); }
 
-/* ── Sidebar ── */
-section[data-testid="stSidebar"] {
-    background: #161b22;
-    border-right: 1px solid #21262d;
-}
-section[data-testid="stSidebar"] h2,
-section[data-testid="stSidebar"] label,
-section[data-testid="stSidebar"] p {
-    color: #e4e4e7 !important;
-}
-section[data-testid="stSidebar"] .block-container { 
-    padding-top: 1.5rem;
-    padding-bottom: 2rem;
-}
-section[data-testid="stSidebar"] [data-testid="stVerticalBlock"] {
-    gap: 0.5rem;
-}
-section[data-testid="stSidebar"] .stMultiSelect {
-    margin-bottom: 0.75rem;
-}
-section[data-testid="stSidebar"] .stMultiSelect label {
-    font-size: 0.85rem;
-    margin-bottom: 0.25rem;
-}
-[data-baseweb="popover"] {
-    max-height: 400px !important;
-}
-[data-baseweb="popover"] > div {
-    max-height: 400px !important;
-    overflow-y: auto !important;
-}
-section[data-testid="stSidebar"] > div:first-child {
-    overflow-y: auto;
-    max-height: 100vh;
-}
-
-/* ── Header ── */
-.main-header {
-    background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%);
-    border: 1px solid #334155;
-    border-radius: 16px;
-    padding: 1.5rem 2rem;
-    margin-bottom: 1.5rem;
-}
-.main-header h1 {
-    font-size: 2rem;
-    font-weight: 700;
-    background: linear-gradient(90deg, #6ee7b7, #3b82f6);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    margin: 0;
-}
-.main-header .subtitle {
-    color: #94a3b8;
-    font-size: 0.9rem;
-    margin-top: 0.5rem;
-}
-
-/* ── Stat cards row ── */
-.stat-row { display: flex; gap: 1rem; margin-bottom: 1.5rem; flex-wrap: wrap; }
-.stat-card {
-    flex: 1; min-width: 140px;
-    background: linear-gradient(135deg, #1f2937 0%, #111827 100%);
-    border: 1px solid #374151;
+/* ── Course Assistant ── */
+.stChatMessage p, .stChatMessage span, .stChatMessage div {
+    color: var(--chat-text) !important;
+}
+.chat-title { margin: 0; color: var(--chat-text); }
+.stChatMessage .course-card {
+    background: var(--chat-card-bg);
+    border: 1px solid var(--chat-card-border);
     border-radius: 12px;
-    padding: 1rem 1.25rem;
-    text-align: center;
-    transition: transform .2s, box-shadow .2s;
-}
-.stat-card:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 4px 12px rgba(0,0,0,.3);
-}
-.stat-card .stat-value {
-    font-size: 2rem; font-weight: 700;
-    background: linear-gradient(90deg, #6ee7b7, #3b82f6);
-    -webkit-background-clip: text; -webkit-text-fill-color: transparent;
+    padding: 16px;
+    margin: 8px 0;
+    height: auto;
+    transition: border-color 0.2s;
 }
-.stat-card .stat-label { font-size: 0.75rem; color: #9ca3af; margin-top: 2px; }
-
-/* ── Course card ── */
-.course-card {
-    background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%);
-    border: 1px solid #334155;
-    border-radius: 16px;
-    padding: 1.25rem 1.4rem 1rem;
-    height: 100%;
-    transition: all .25s ease;
-    position: relative;
-    cursor: pointer;
-}
-.course-card:hover {
+.stChatMessage .course-card:hover {
     border-color: #6366f1;
-    box-shadow: 0 0 20px rgba(99,102,241,.25);
-    transform: translateY(-4px);
+    box-shadow: none;
+    transform: none;
 }
-.course-card .card-title {
-    font-size: 1rem; font-weight: 600; color: #f1f5f9;
-    margin-bottom: .5rem; line-height: 1.3;
+.stChatMessage .course-card h4 {
+    color: var(--chat-text) !important;
+    margin: 0 0 8px 0;
+    font-size: 1rem;
 }
-.course-card .card-meta {
-    font-size: 0.78rem; color: #94a3b8; margin-bottom: .6rem;
+.stChatMessage .course-card .badges {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 6px;
+    margin-bottom: 8px;
 }
-
-/* ── Badges ── */
-.badge {
+.stChatMessage .course-card .badge {
     display: inline-block;
-    padding: 3px 10px; border-radius: 999px;
-    font-size: 0.7rem; font-weight: 600;
-    margin: 2px 2px 4px 0;
-    white-space: nowrap;
-    letter-spacing: .4px;
-    transition: transform .2s;
-}
-.badge:hover {
-    transform: scale(1.05);
-}
-.badge-domain  { background:#1d4ed8; color:#bfdbfe; }
-.badge-level   { background:#065f46; color:#a7f3d0; }
-.badge-format  { background:#6d28d9; color:#ddd6fe; }
-.badge-skill   { background:#92400e; color:#fde68a; border:1px solid #78350f; }
-.badge-journey { background:#be185d; color:#fce7f3; }
-.badge-platform { background:#0e7490; color:#a5f3fc; }
-
-/* ── Description text ── */
-.card-description {
-    font-size: 0.82rem; color: #cbd5e1; line-height: 1.55;
-    margin: .5rem 0 .9rem;
-    display: -webkit-box; -webkit-line-clamp: 3;
-    -webkit-box-orient: vertical; overflow: hidden;
-}
-
-/* ── Duration / format line ── */
-.card-sub { font-size: 0.75rem; color: #64748b; margin-bottom: .75rem; }
-
-/* ── Expander tweak ── */
-details summary { font-size: .85rem !important; }
-
-/* ── Filter section ── */
-.filter-section {
-    background: #1a1f2e;
-    border-radius: 8px;
-    padding: 1rem;
-    margin-bottom: 1rem;
-}
-
-/* ── Alert boxes ── */
-.info-box {
-    background: rgba(59, 130, 246, 0.1);
-    border-left: 3px solid #3b82f6;
-    padding: 0.75rem 1rem;
-    border-radius: 4px;
-    color: #93c5fd;
+    padding: 2px 10px;
+    border-radius: 20px;
+    font-size: 0.75rem;
+    font-weight: 500;
+}
+.stChatMessage .badge-level { background: var(--chat-level-bg); color: var(--chat-level-fg); }
+.stChatMessage .badge-duration { background: var(--chat-duration-bg); color: var(--chat-duration-fg); }
+.stChatMessage .badge-format { background: var(--chat-format-bg); color: var(--chat-format-fg); }
+.stChatMessage .badge-platform { background: var(--chat-platform-bg); color: var(--chat-platform-fg); }
+.stChatMessage .course-card .reason {
+    color: var(--muted);
     font-size: 0.85rem;
-    margin: 1rem 0;
+    font-style: italic;
+    margin: 8px 0;
 }
-
-/* ── Theme Toggle Button ── */
-.theme-toggle {
-    position: fixed;
-    top: 1rem;
-    right: 1rem;
-    z-index: 999;
-    background: #1e293b;
-    border: 1px solid #334155;
-    border-radius: 50%;
-    width: 48px;
-    height: 48px;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    cursor: pointer;
-    box-shadow: 0 2px 8px rgba(0,0,0,.3);
-    transition: all .2s;
+.stChatMessage .course-card a {
+    color: #6366f1;
+    text-decoration: none;
+    font-weight: 600;
 }
-.theme-toggle:hover {
-    transform: scale(1.1);
-    box-shadow: 0 4px 12px rgba(0,0,0,.5);
+.stChatMessage .course-card a:hover {
+    color: #8b5cf6;
+    text-decoration: underline;
 }
 
 /* ── Responsive adjustments ── */
@@ -398,5 +400,73 @@ details summary { font-size: .85rem !important; }
     .stat-card { min-width: 100%; }
     .main-header h1 { font-size: 1.5rem; }
 }
+"""
+
+STYLESHEET = (
+    _FONTS  # @import must come before every other rule
+    + f':root, :root[data-theme="dark"] {{\n{_variables("dark")}\n}}\n'
+    f':root[data-theme="light"] {{\n{_variables("light")}\n}}\n'
+    + _RULES
+)
+STYLESHEET_HASH = hashlib.sha1(STYLESHEET.encode("utf-8")).hexdigest()[:12]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLIENT-SIDE INJECTION & TOGGLE
+# ─────────────────────────────────────────────────────────────────────────────
+# Both snippets run inside st.components.v1.html iframes and reach the app
+# document through window.parent (same origin).
+
+def get_theme_bootstrap_html(default_theme: str = DEFAULT_THEME) -> str:
+    """Script that injects the stylesheet once (keyed by hash) and applies the saved theme."""
+    return f"""
+<script>
+(function () {{
+  const doc = window.parent.document;
+  const styleId = "ce-theme-{STYLESHEET_HASH}";
+  if (!doc.getElementById(styleId)) {{
+    doc.querySelectorAll("style[id^='ce-theme-']").forEach((el) => el.remove());
+    const style = doc.createElement("style");
+    style.id = styleId;
+    style.textContent = {json.dumps(STYLESHEET)};
+    doc.head.appendChild(style);
+  }}
+  const root = doc.documentElement;
+  if (!root.dataset.theme) {{
+    root.dataset.theme = window.parent.localStorage.getItem("ce-theme") || "{default_theme}";
+  }}
+}})();
+</script>
+"""
+
+
+def get_theme_toggle_html() -> str:
+    """Sidebar toggle that flips the root `data-theme` attribute without a rerun."""
+    return """
+<style>
+  body { margin: 0; font-family: 'Inter', sans-serif; }
+  button {
+    display: flex; align-items: center; gap: .5rem; width: 100%;
+    padding: .4rem .75rem; border-radius: 8px; cursor: pointer;
+    border: 1px solid #64748b; background: transparent; font-size: .85rem;
+  }
 </style>
+<button id="theme-toggle" title="Toggle theme">🌓 <span id="theme-label"></span></button>
+<script>
+(function () {
+  const root = window.parent.document.documentElement;
+  const button = document.getElementById("theme-toggle");
+  function paint() {
+    const light = root.dataset.theme === "light";
+    document.getElementById("theme-label").textContent = light ? "Light Mode" : "Dark Mode";
+    button.style.color = light ? "#1e293b" : "#e4e4e7";
+  }
+  button.addEventListener("click", function () {
+    root.dataset.theme = root.dataset.theme === "light" ? "dark" : "light";
+    window.parent.localStorage.setItem("ce-theme", root.dataset.theme);
+    paint();
+  });
+  paint();
+})();
+</script>
 """
@@ -0,0 +1,290 @@
+"""
+tutor_assignment.py — Capacity-aware bulk tutor assignment
+Matches a term roster of students (focus areas + optional tutor
+preferences) to peer tutors in one optimization: expertise match quality
+from the TutorIndex, per-tutor capacity limits, and as many students
+placed as capacity allows. Solved as a min-cost flow.
+
+Students with the same set of focus areas are collapsed into one supply
+node, whatever order they listed them in. Each group links only to its
+best-matching tutors (TUTOR_ASSIGN_CANDIDATES, widened until they can hold
+twice the group). Preferences do not split a group: a group gets one extra,
+cheaper edge per preferred tutor, sized by how many members asked for that
+tutor. The network grows with the number of distinct focus-area sets, not
+with students.
+
+Roster CSV columns (case-insensitive):
+    student / student_id / student_name   required
+    focus_areas                           required, ';' or ',' separated
+    preferred_tutors                      optional, tutor ids or names, ';' or ',' separated
+
+Usage:
+    python tutor_assignment.py roster.csv -o assignments.csv [--capacity 15]
+"""
+
+import argparse
+import heapq
+import re
+import sys
+from collections import defaultdict
+
+import pandas as pd
+
+import config
+from tutor_index import TutorIndex, read_tutors
+
+_STUDENT_COLUMNS = ["student", "student_id", "student_name"]
+
+# Costs are integers: 100 × (1 − match quality), plus a penalty when the tutor
+# is not one the student asked for.
+# Leaving a student unassigned costs more than any real match.
+_NOT_PREFERRED_PENALTY = 20
+_UNASSIGNED_COST = 1000
+
+
+class RosterError(ValueError):
+    """The roster file is missing required columns."""
+
+
+def _split(cell) -> list[str]:
+    return [p.strip() for p in re.split(r"[;,]", str(cell)) if p.strip()] if pd.notna(cell) else []
+
+
+def read_roster(source) -> pd.DataFrame:
+    """Roster CSV (path or file-like) → columns student, focus_areas (list), preferred_tutors (list)."""
+    roster = pd.read_csv(source, dtype=str)
+    roster.columns = [c.strip().lower().replace(" ", "_") for c in roster.columns]
+    student_col = next((c for c in _STUDENT_COLUMNS if c in roster.columns), None)
+    if student_col is None or "focus_areas" not in roster.columns:
+        raise RosterError("Roster needs a student column and a focus_areas column.")
+    return pd.DataFrame({
+        "student": roster[student_col].fillna("").str.strip(),
+        "focus_areas": roster["focus_areas"].apply(_split),
+        "preferred_tutors": (roster["preferred_tutors"].apply(_split)
+                             if "preferred_tutors" in roster.columns else [[] for _ in range(len(roster))]),
+    })
+
+
+def tutor_capacities(tutors: pd.DataFrame, default: int) -> dict[str, int]:
+    """Per-tutor capacity from an optional `capacity` column, else `default`."""
+    caps = {}
+    for _, tutor in tutors.iterrows():
+        raw = str(tutor.get("capacity", "")).strip()
+        caps[tutor["tutor_id"]] = int(float(raw)) if raw and raw.replace(".", "", 1).isdigit() else default
+    return caps
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MIN-COST FLOW (successive shortest paths, Dijkstra with potentials)
+# ─────────────────────────────────────────────────────────────────────────────
+class _FlowGraph:
+    def __init__(self, n: int):
+        self.n = n
+        self.adj: list[list[int]] = [[] for _ in range(n)]
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        """Add u→v (and its residual twin); returns the forward edge id."""
+        for a, b, c, w in ((u, v, cap, cost), (v, u, 0, -cost)):
+            self.adj[a].append(len(self.to))
+            self.to.append(b)
+            self.cap.append(c)
+            self.cost.append(w)
+        return len(self.to) - 2
+
+    def flow(self, edge: int) -> int:
+        return self.cap[edge ^ 1]
+
+    def min_cost_flow(self, s: int, t: int, demand: int) -> int:
+        """Push up to `demand` units from s to t at minimum cost; returns units sent.
+
+        Edge costs must be non-negative (true for every network built here),
+        so zero initial potentials are valid. Each Dijkstra stops once t is
+        settled; capping the potential update at dist[t] keeps reduced costs
+        non-negative for the nodes it did not reach.
+        """
+        potential = [0] * self.n
+        sent = 0
+        while sent < demand:
+            dist = [float("inf")] * self.n
+            prev_edge = [-1] * self.n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == t:
+                    break
+                for e in self.adj[u]:
+                    if self.cap[e] <= 0:
+                        continue
+                    v = self.to[e]
+                    nd = d + self.cost[e] + potential[u] - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+            if dist[t] == float("inf"):
+                break
+            reach = dist[t]
+            for v in range(self.n):
+                potential[v] += min(dist[v], reach)
+
+            # Bottleneck along the path — groups let one augmentation move many students
+            push, v = demand - sent, t
+            while v != s:
+                e = prev_edge[v]
+                push = min(push, self.cap[e])
+                v = self.to[e ^ 1]
+            v = t
+            while v != s:
+                e = prev_edge[v]
+                self.cap[e] -= push
+                self.cap[e ^ 1] += push
+                v = self.to[e ^ 1]
+            sent += push
+        return sent
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ASSIGNMENT
+# ─────────────────────────────────────────────────────────────────────────────
+def _quality(index: TutorIndex, focus_areas: tuple[str, ...]) -> dict[str, tuple[float, str]]:
+    """tutor_id → (match quality, focus area it matched): the best match over the areas."""
+    best: dict[str, tuple[float, str]] = {}
+    for focus in focus_areas:
+        for tutor_id, q in index.match(focus):
+            if q > best.get(tutor_id, (0.0, ""))[0]:
+                best[tutor_id] = (q, focus)
+    return best
+
+
+def _candidates(quality: dict[str, tuple[float, str]], capacities: dict[str, int], size: int,
+                preferred: set[str]) -> list[str]:
+    """Best-matching tutors for a group of `size`: at least TUTOR_ASSIGN_CANDIDATES,
+    and enough capacity for twice the group. Tutors tied with the last one picked
+    stay in (cutting between equal matches would only concentrate groups on the
+    same tutors), and preferred tutors are always included."""
+    ranked = sorted((tid for tid, (q, _) in quality.items() if q > 0 and capacities.get(tid, 0) > 0),
+                    key=lambda tid: (-quality[tid][0], tid))
+    picked, room = [], 0
+    for tutor_id in ranked:
+        if (len(picked) >= config.TUTOR_ASSIGN_CANDIDATES and room >= 2 * size
+                and quality[tutor_id][0] < quality[picked[-1]][0]):
+            break
+        picked.append(tutor_id)
+        room += capacities[tutor_id]
+    return picked + [tid for tid in ranked[len(picked):] if tid in preferred]
+
+
+def assign_tutors(roster: pd.DataFrame, tutors: pd.DataFrame, index: TutorIndex,
+                  default_capacity: int | None = None) -> pd.DataFrame:
+    """Optimal capacity-respecting assignment; one output row per roster row."""
+    default_capacity = default_capacity or config.TUTOR_DEFAULT_CAPACITY
+    capacities = tutor_capacities(tutors, default_capacity)
+    names = dict(zip(tutors["tutor_id"], tutors["tutor_name"]))
+    by_name = {str(name).strip().casefold(): tid for tid, name in names.items()}
+
+    # Collapse students asking for the same set of focus areas into request groups
+    groups: dict[tuple, list[int]] = defaultdict(list)
+    preferred: list[set[str]] = []
+    for pos, (areas, prefs) in enumerate(zip(roster["focus_areas"], roster["preferred_tutors"])):
+        groups[tuple(sorted(set(areas)))].append(pos)
+        preferred.append({by_name.get(p.casefold(), p) for p in prefs})
+    group_keys = list(groups)
+
+    tutor_ids = list(capacities)
+    tutor_node = {tutor_id: ti for ti, tutor_id in enumerate(tutor_ids)}
+    S, T = 0, 1
+    U = 2                                  # "unassigned" overflow node
+    g0 = 3
+    t0 = g0 + len(group_keys)
+    graph = _FlowGraph(t0 + len(tutor_ids))
+
+    # Per group: (edge, tutor_id, focus, quality, preferred-edge?)
+    group_edges: list[list[tuple[int, str, str, float, bool]]] = []
+    for gi, areas in enumerate(group_keys):
+        members = groups[areas]
+        graph.add_edge(S, g0 + gi, len(members), 0)
+        wanted = defaultdict(int)          # tutor_id → members who asked for them
+        for pos in members:
+            for tutor_id in preferred[pos]:
+                wanted[tutor_id] += 1
+        quality = _quality(index, areas)
+        edges = []
+        for tutor_id in _candidates(quality, capacities, len(members), set(wanted)):
+            q, focus = quality[tutor_id]
+            cost = round(100 * (1 - q))
+            node = t0 + tutor_node[tutor_id]
+            edges.append((graph.add_edge(g0 + gi, node, len(members), cost + _NOT_PREFERRED_PENALTY),
+                          tutor_id, focus, q, False))
+            if wanted.get(tutor_id):
+                edges.append((graph.add_edge(g0 + gi, node, wanted[tutor_id], cost), tutor_id, focus, q, True))
+        graph.add_edge(g0 + gi, U, len(members), _UNASSIGNED_COST)
+        group_edges.append(edges)
+    for ti, tutor_id in enumerate(tutor_ids):
+        graph.add_edge(t0 + ti, T, capacities[tutor_id], 0)
+    graph.add_edge(U, T, len(roster), 0)
+
+    graph.min_cost_flow(S, T, len(roster))
+
+    # Hand each group's flow back out in roster order: preferred-edge units to
+    # the members who asked for that tutor, then the rest best match first
+    out = [None] * len(roster)
+    for gi, key in enumerate(group_keys):
+        waiting = list(groups[key])
+        for edge, tutor_id, focus, q, is_pref in sorted(group_edges[gi], key=lambda item: (not item[4], -item[3])):
+            for _ in range(graph.flow(edge)):
+                pos = next((p for p in waiting if tutor_id in preferred[p]), waiting[0]) if is_pref else waiting[0]
+                waiting.remove(pos)
+                out[pos] = {"tutor_id": tutor_id, "tutor_name": names.get(tutor_id, ""),
+                            "matched_focus": focus, "match_score": round(q, 2), "status": "assigned"}
+        for pos in waiting:
+            out[pos] = {"tutor_id": "", "tutor_name": "", "matched_focus": "", "match_score": 0.0,
+                        "status": "no capacity" if group_edges[gi] else "no matching tutor"}
+
+    result = pd.DataFrame(out, index=roster.index)
+    result.insert(0, "student", roster["student"])
+    result.insert(1, "focus_areas", roster["focus_areas"].apply("; ".join))
+    return result
+
+
+def load_summary(assignments: pd.DataFrame, tutors: pd.DataFrame, default_capacity: int) -> pd.DataFrame:
+    """Assigned students vs. capacity per tutor."""
+    counts = assignments.loc[assignments["status"] == "assigned", "tutor_id"].value_counts()
+    caps = tutor_capacities(tutors, default_capacity)
+    return pd.DataFrame({
+        "tutor_id":   list(caps),
+        "tutor_name": [dict(zip(tutors["tutor_id"], tutors["tutor_name"])).get(t, "") for t in caps],
+        "assigned":   [int(counts.get(t, 0)) for t in caps],
+        "capacity":   list(caps.values()),
+    })
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Assign a student roster to peer tutors.")
+    parser.add_argument("roster", help="Roster CSV (student, focus_areas[, preferred_tutors])")
+    parser.add_argument("-o", "--output", default="assignments.csv")
+    parser.add_argument("--tutors", default="tutors.csv")
+    parser.add_argument("--capacity", type=int, default=config.TUTOR_DEFAULT_CAPACITY,
+                        help="Students per tutor when tutors.csv has no capacity column")
+    args = parser.parse_args(argv)
+
+    tutors = read_tutors(args.tutors)
+    try:
+        roster = read_roster(args.roster)
+    except RosterError as exc:
+        print(f"❌ {exc}")
+        return 1
+    assignments = assign_tutors(roster, tutors, TutorIndex(tutors), args.capacity)
+    assignments.to_csv(args.output, index=False)
+    placed = int((assignments["status"] == "assigned").sum())
+    print(f"✅ Assigned {placed}/{len(assignments)} students → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
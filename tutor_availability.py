@@ -0,0 +1,174 @@
+"""
+tutor_availability.py — Structured tutor availability and time-slot search
+Free-text availability ("Available Mon-Fri 2-6pm EST", "Tue/Thu 3-7pm")
+is parsed into weekly intervals (weekday, start minute, end minute). Per
+weekday, the interval endpoints split the day into elementary slots, each
+holding the set of tutors free for the whole slot; a window query is a
+binary search for the slots it spans plus a set intersection.
+
+Usage:
+    from tutor_availability import AvailabilityIndex, parse_availability, parse_time_window
+    index = AvailabilityIndex({"1": parse_availability("Mon-Fri 2-6pm EST")})
+    index.available(*parse_time_window("Tuesday 3-5pm"))   # → {"1"}
+    index.available(*parse_time_window("on Wednesday"))    # any time that day → {"1"}
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+_DAY_ALIASES = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "weds": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+_DAY_GROUPS = {"weekdays": range(0, 5), "weekends": range(5, 7), "weekend": range(5, 7),
+               "daily": range(0, 7), "everyday": range(0, 7)}
+
+_DAY = r"\b(?:" + "|".join(sorted(_DAY_ALIASES, key=len, reverse=True)) + r")\b\.?"
+_DAY_SPEC = rf"(?:{_DAY}(?:\s*(?:-|–|to|/|,|&|and)\s*{_DAY})*|weekdays|weekends?|daily|every\s*day)"
+_TIME = r"\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)?"
+_RANGE = rf"(?P<start>{_TIME})\s*(?:-|–|to)\s*(?P<end>{_TIME})"
+_SEGMENT = re.compile(rf"(?P<days>{_DAY_SPEC})\s*,?\s*(?:from\s+)?{_RANGE}", re.IGNORECASE)
+
+# Named parts of the day for chat queries ("Tuesday afternoon")
+_DAY_PARTS = {"morning": (9 * 60, 12 * 60), "afternoon": (12 * 60, 17 * 60),
+              "evening": (17 * 60, 21 * 60)}
+
+Interval = tuple[int, int, int]  # (weekday 0=Mon, start minute, end minute)
+Window = tuple[int, int | None, int | None]  # start/end None: any time that day
+
+
+def _parse_days(spec: str) -> list[int]:
+    spec = spec.lower().replace("every day", "everyday")
+    for group, days in _DAY_GROUPS.items():
+        if group in spec:
+            return list(days)
+    tokens = re.findall(r"[a-z]+|-|–|to", spec)
+    days: list[int] = []
+    pending_range = False
+    for tok in tokens:
+        if tok in ("-", "–", "to"):
+            pending_range = True
+            continue
+        day = _DAY_ALIASES.get(tok)
+        if day is None:
+            continue
+        if pending_range and days:
+            start = days[-1]
+            days.extend((start + i) % 7 for i in range(1, (day - start) % 7 + 1))
+        else:
+            days.append(day)
+        pending_range = False
+    return sorted(set(days))
+
+
+def _parse_clock(text: str, meridiem: str | None) -> tuple[int, str | None]:
+    """'3', '3:30pm', '15:00' → minutes since midnight (and the meridiem seen)."""
+    m = re.match(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?", text.strip().lower())
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    own = m.group(3).replace(".", "") if m.group(3) else None
+    mer = own or meridiem
+    if mer == "pm" and hour < 12:
+        hour += 12
+    elif mer == "am" and hour == 12:
+        hour = 0
+    return hour * 60 + minute, own
+
+
+def _parse_range(start: str, end: str) -> tuple[int, int] | None:
+    end_min, end_mer = _parse_clock(end, None)
+    start_min, start_mer = _parse_clock(start, end_mer)
+    if start_mer is None and end_mer == "pm" and start_min > end_min:
+        start_min -= 12 * 60  # "11-1pm" → 11am-1pm
+    if end_min == 0:
+        end_min = 24 * 60     # "8pm-12am" → until midnight
+    if not (0 <= start_min < end_min <= 24 * 60):
+        return None
+    return start_min, end_min
+
+
+def parse_availability(text: str) -> list[Interval]:
+    """Free-text availability → sorted weekly intervals (unparseable text → [])."""
+    intervals = set()
+    for m in _SEGMENT.finditer(str(text or "")):
+        span = _parse_range(m.group("start"), m.group("end"))
+        if span is None:
+            continue
+        for day in _parse_days(m.group("days")):
+            intervals.add((day, *span))
+    return sorted(intervals)
+
+
+def parse_time_window(text: str) -> Window | None:
+    """Chat-style window: "Tuesday 3-5pm", "thu 14:00-16:00", "Friday afternoon".
+    A day without a time ("on Wednesday") → (day, None, None)."""
+    text = str(text or "")
+    day_match = re.search(_DAY, text, re.IGNORECASE)
+    if not day_match:
+        return None
+    day = _DAY_ALIASES[day_match.group(0).rstrip(".").lower()]
+    rng = re.search(_RANGE, text[day_match.end():], re.IGNORECASE) or re.search(_RANGE, text, re.IGNORECASE)
+    if rng:
+        span = _parse_range(rng.group("start"), rng.group("end"))
+        if span:
+            return day, *span
+    at = re.search(r"\bat\s+(" + _TIME + r")", text, re.IGNORECASE)
+    if at:
+        start, _ = _parse_clock(at.group(1), "pm" if int(re.match(r"\d+", at.group(1)).group()) < 8 else None)
+        return day, start, min(start + 60, 24 * 60)
+    for part, span in _DAY_PARTS.items():
+        if part in text.lower():
+            return day, *span
+    return day, None, None
+
+
+def format_window(day: int, start: int | None, end: int | None) -> str:
+    if start is None or end is None:
+        return f"{DAYS[day]} (any time)"
+
+    def clock(minutes: int) -> str:
+        h, m = divmod(minutes, 60)
+        suffix = "am" if h < 12 or h == 24 else "pm"
+        h = h % 12 or 12
+        return f"{h}:{m:02d}{suffix}" if m else f"{h}{suffix}"
+    return f"{DAYS[day]} {clock(start)}–{clock(end)}"
+
+
+class AvailabilityIndex:
+    """Per-weekday elementary-slot index over tutor availability intervals."""
+
+    def __init__(self, availability: dict[str, list[Interval]]):
+        self._bounds: list[list[int]] = []       # per day: sorted slot boundaries
+        self._slots: list[list[frozenset]] = []  # per day: tutors free for all of slot i
+        for day in range(7):
+            spans = [(tid, s, e) for tid, ivs in availability.items() for d, s, e in ivs if d == day]
+            bounds = sorted({b for _, s, e in spans for b in (s, e)})
+            slots = [frozenset(tid for tid, s, e in spans if s <= lo and e >= hi)
+                     for lo, hi in zip(bounds, bounds[1:])]
+            self._bounds.append(bounds)
+            self._slots.append(slots)
+
+    def available(self, day: int, start: int | None, end: int | None, whole: bool = True) -> set[str]:
+        """Tutors free for the whole window (or, with whole=False, any part of it).
+        Without start/end, tutors free at any time that day."""
+        bounds, slots = self._bounds[day], self._slots[day]
+        if start is None or end is None:
+            return set().union(*slots)
+        if not slots or start >= end:
+            return set()
+        if whole and (start < bounds[0] or end > bounds[-1]):
+            return set()
+        first = max(bisect_right(bounds, start) - 1, 0)
+        last = min(bisect_left(bounds, end), len(bounds) - 1)
+        spanned = slots[first:last]
+        if not spanned:
+            return set()
+        if whole:
+            result = set(spanned[0])
+            for slot in spanned[1:]:
+                result &= slot
+                if not result:
+                    break
+            return result
+        return set().union(*spanned)
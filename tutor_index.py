@@ -0,0 +1,156 @@
+"""
+tutor_index.py — Inverted expertise index for peer-tutor matching
+Tutor expertise tags are normalized into an inverted index (term → tutor
+ids, token → terms), and every catalogue focus area is matched against it
+once, so picking a focus area in the booking flow is a dict lookup. Tags
+phrased differently from the focus area ("Software" vs "Software
+Development", "AI and ML" vs "AI & ML") still match through substring,
+token-overlap and fuzzy scores.
+
+Availability text is parsed into weekly intervals (tutor_availability.py),
+so `find()` answers combined (focus area, time window) queries.
+
+Usage:
+    from tutor_index import TutorIndex, read_tutors
+    index = TutorIndex(read_tutors("tutors.csv"), focus_areas)
+    for tutor_id, score in index.match("Data Science"): ...
+"""
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+import config
+from tutor_availability import AvailabilityIndex, Window, parse_availability
+
+_STOPWORDS = {"and", "the", "of", "for", "to", "in", "a", "an", "with"}
+
+
+def normalize_term(text: str) -> str:
+    """Case-fold, spell out '&', drop punctuation and collapse whitespace."""
+    s = str(text).casefold().replace("&", " and ")
+    s = re.sub(r"[^\w\s]", " ", s)
+    return " ".join(s.split())
+
+
+def term_tokens(term: str) -> set[str]:
+    """Content tokens of a normalized term, with a naive plural strip."""
+    return {t[:-1] if len(t) > 3 and t.endswith("s") else t
+            for t in term.split() if t not in _STOPWORDS}
+
+
+def match_score(query: str, term: str) -> float:
+    """Similarity of two normalized terms in [0, 1]."""
+    if query == term:
+        return 1.0
+    if f" {query} " in f" {term} " or f" {term} " in f" {query} ":  # whole-word containment
+        return 0.9
+    q_tokens, t_tokens = term_tokens(query), term_tokens(term)
+    overlap = len(q_tokens & t_tokens) / len(q_tokens | t_tokens) if q_tokens and t_tokens else 0.0
+    return max(overlap, SequenceMatcher(None, query, term).ratio() * 0.8)
+
+
+TUTOR_COLUMNS = ["tutor_id", "tutor_name", "expertise_tags", "availability_summary", "booking_link"]
+
+
+def read_tutors(path: str = "tutors.csv") -> pd.DataFrame:
+    """Tutor table with parsed `expertise_list`; empty (same columns) if the file is missing."""
+    try:
+        tutors = pd.read_csv(path, dtype=str)
+        tutors = tutors.fillna("")
+        tutors["tutor_id"] = tutors["tutor_id"].str.strip()
+        # Parse expertise tags into lists
+        tutors["expertise_list"] = tutors["expertise_tags"].apply(
+            lambda x: [tag.strip() for tag in str(x).split(",") if tag.strip()]
+        )
+        # Weekly (weekday, start, end) intervals parsed from the free text
+        tutors["availability"] = tutors["availability_summary"].apply(parse_availability)
+        return tutors
+    except FileNotFoundError:
+        return pd.DataFrame(columns=TUTOR_COLUMNS + ["expertise_list", "availability"])
+
+
+class TutorIndex:
+    """Normalized expertise terms → tutor ids, plus a precomputed focus-area table
+    and a weekday interval index over availability."""
+
+    def __init__(self, tutors: pd.DataFrame, focus_areas: list[str] = ()):
+        self.threshold = config.TUTOR_MATCH_THRESHOLD
+        self.availability = AvailabilityIndex(dict(zip(tutors["tutor_id"], tutors["availability"])))
+        self.tutor_ids: list[str] = list(tutors["tutor_id"])
+        self.profiles: dict[str, dict] = {
+            row["tutor_id"]: {"name": row["tutor_name"], "availability": row["availability_summary"],
+                              "booking_link": row["booking_link"]}
+            for _, row in tutors.iterrows()
+        }
+        self.by_term: dict[str, list[str]] = defaultdict(list)
+        self.by_token: dict[str, set[str]] = defaultdict(set)
+        for tutor_id, tags in zip(tutors["tutor_id"], tutors["expertise_list"]):
+            for tag in tags:
+                term = normalize_term(tag)
+                if not term:
+                    continue
+                if tutor_id not in self.by_term[term]:
+                    self.by_term[term].append(tutor_id)
+                for token in term_tokens(term):
+                    self.by_token[token].add(term)
+        self.by_term = dict(self.by_term)
+        self.by_token = dict(self.by_token)
+        self.focus_table: dict[str, list[tuple[str, float]]] = {
+            focus: self._rank(focus) for focus in focus_areas
+        }
+
+    def _candidates(self, query: str) -> set[str]:
+        """Terms sharing a token with the query (or containing it), via the index."""
+        terms = set()
+        for token in term_tokens(query):
+            terms |= self.by_token.get(token, set())
+        if query in self.by_term:
+            terms.add(query)
+        if not terms:
+            # No shared token: fall back to a fuzzy pass over all terms
+            terms = set(self.by_term)
+        return terms
+
+    def _rank(self, focus: str) -> list[tuple[str, float]]:
+        query = normalize_term(focus)
+        best: dict[str, float] = {}
+        for term in self._candidates(query):
+            score = match_score(query, term)
+            if score < self.threshold:
+                continue
+            for tutor_id in self.by_term[term]:
+                best[tutor_id] = max(best.get(tutor_id, 0.0), score)
+        return sorted(best.items(), key=lambda item: -item[1])
+
+    def match(self, focus: str) -> list[tuple[str, float]]:
+        """(tutor_id, score) pairs for a focus area, best match first."""
+        ranked = self.focus_table.get(focus)
+        if ranked is None:
+            ranked = self.focus_table[focus] = self._rank(focus)
+        return ranked
+
+    def find(self, focus: str | None, window: Window | None,
+             whole: bool = True) -> list[tuple[str, float]]:
+        """Tutors matching a focus area (any, if None) who are free in `window`
+        ((weekday, start minute, end minute); None means any time, and a
+        window without start/end means any time that weekday)."""
+        if focus:
+            ranked = self.match(focus)
+        else:
+            ranked = [(tutor_id, 1.0) for tutor_id in self.tutor_ids]
+        if window is None:
+            return ranked
+        free = self.availability.available(*window, whole=whole)
+        return [(tutor_id, score) for tutor_id, score in ranked if tutor_id in free]
+
+    def focus_in_text(self, text: str) -> str | None:
+        """First indexed focus area or expertise term mentioned in free text (longest wins)."""
+        padded = f" {normalize_term(text)} "
+        names = sorted(list(self.focus_table) + list(self.by_term), key=len, reverse=True)
+        for name in names:
+            if f" {normalize_term(name)} " in padded:
+                return name
+        return None